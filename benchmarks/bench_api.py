@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Sunshine API / polling path benchmarks against the mock server
+
+Measures, offline:
+  - latency of each SunshineHost API call (sync keep-alive client)
+  - latency of the concurrent stats + sessions fetch (asyncio client)
+  - monitor data cycle (MetricsCollector) time and CPU cost with 1..64 guests
+
+The mock runs in its own process so CPU figures only cover the client.
+
+    python3 benchmarks/bench_api.py
+    python3 benchmarks/bench_api.py --json results.json
+    python3 benchmarks/bench_api.py --baseline results.json   # exit 1 on regression
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'usr' / 'share' / 'big-remote-play'))
+
+from host.sunshine_manager import SunshineHost
+from host.sunshine_async import AsyncSunshineAPI, SunshineAPILoop
+from host.collector import MetricsCollector
+
+AUTH = ('bench', 'bench')
+
+
+def summarize(samples: list) -> dict:
+    s = sorted(samples)
+    return {
+        'n': len(s),
+        'mean_ms': statistics.fmean(s) * 1000,
+        'p50_ms': s[len(s) // 2] * 1000,
+        'p95_ms': s[min(len(s) - 1, int(len(s) * 0.95))] * 1000,
+        'max_ms': s[-1] * 1000,
+    }
+
+
+class MockProcess:
+    """mock_sunshine.py in a child process"""
+
+    def __init__(self, **args):
+        cmd = [sys.executable, str(Path(__file__).parent / 'mock_sunshine.py'), '--port', '0', '--auth', ':'.join(AUTH)]
+        for k, v in args.items():
+            cmd += [f"--{k.replace('_', '-')}", str(v)]
+        self.proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True)
+        line = self.proc.stdout.readline()
+        if not line:
+            raise RuntimeError("mock server failed to start")
+        self.port = int(line.rsplit(':', 1)[1])
+
+    def configure(self, host: SunshineHost, **values):
+        host.api.post('/mock/config', values)
+
+    def stop(self):
+        self.proc.terminate()
+        self.proc.wait()
+
+
+def bench_sync_calls(host: SunshineHost, iterations: int) -> dict:
+    calls = {
+        'get_performance_stats': lambda: host.get_performance_stats(AUTH),
+        'get_active_sessions': lambda: host.get_active_sessions(AUTH),
+        'send_pin': lambda: host.send_pin('123456', 'bench', auth=AUTH),
+        'terminate_session': lambda: host.terminate_session('session-0', auth=AUTH),
+    }
+    results = {}
+    for name, call in calls.items():
+        call() # Warm-up (connection setup)
+        samples = []
+        for _ in range(iterations):
+            t = time.perf_counter()
+            call()
+            samples.append(time.perf_counter() - t)
+        results[name] = summarize(samples)
+    return results
+
+
+def bench_async_fetch(host: SunshineHost, iterations: int) -> dict:
+    loop = SunshineAPILoop(AsyncSunshineAPI(host.api.host, host.api.port, ssl_context=host.api.ssl_context))
+    try:
+        loop.run(loop.api.fetch_stats_and_sessions(AUTH))
+        samples = []
+        for _ in range(iterations):
+            t = time.perf_counter()
+            loop.run(loop.api.fetch_stats_and_sessions(AUTH, timeout=2.0), default=({}, []))
+            samples.append(time.perf_counter() - t)
+        return summarize(samples)
+    finally:
+        loop.close()
+
+
+def bench_monitor_cycle(mock: MockProcess, host: SunshineHost, guests: list, iterations: int) -> dict:
+    results = {}
+    for n in guests:
+        mock.configure(host, sessions=n)
+        collector = MetricsCollector(host, auth=AUTH)
+        collector.collect() # Warm-up
+        samples = []
+        cpu = time.process_time()
+        for _ in range(iterations):
+            t = time.perf_counter()
+            collector.collect()
+            samples.append(time.perf_counter() - t)
+        cpu = time.process_time() - cpu
+        collector.close()
+        r = summarize(samples)
+        r['cpu_ms_per_cycle'] = cpu / iterations * 1000
+        results[str(n)] = r
+        print(f"  {n:3d} guests: p50 {r['p50_ms']:8.2f} ms  p95 {r['p95_ms']:8.2f} ms  cpu {r['cpu_ms_per_cycle']:7.2f} ms/cycle")
+    return results
+
+
+def print_table(title: str, results: dict):
+    print(title)
+    for name, r in results.items():
+        print(f"  {name:24s} mean {r['mean_ms']:7.2f}  p50 {r['p50_ms']:7.2f}  p95 {r['p95_ms']:7.2f}  max {r['max_ms']:7.2f} ms")
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """p95 values that got worse than baseline by more than tolerance"""
+    regressions = []
+    def walk(cur, base, path):
+        for k, v in cur.items():
+            if k not in base: continue
+            if isinstance(v, dict):
+                walk(v, base[k], path + [k])
+            elif k in ('p95_ms', 'cpu_ms_per_cycle') and base[k] > 0 and v > base[k] * (1 + tolerance):
+                regressions.append(f"{'/'.join(path + [k])}: {base[k]:.2f} -> {v:.2f}")
+    walk(results, baseline, [])
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sunshine API benchmarks (mock server)")
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--guests', default='1,2,4,8,16,32,64')
+    parser.add_argument('--latency', type=float, default=0.0, help="mock latency per request (ms)")
+    parser.add_argument('--json', help="write results to this file")
+    parser.add_argument('--baseline', help="compare with a previous --json file")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed slowdown vs baseline (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    guests = [int(g) for g in args.guests.split(',') if g]
+    mock = MockProcess(latency=args.latency)
+    tmp = tempfile.TemporaryDirectory(prefix='bench-sunshine-')
+    # The API listens on base port + 1
+    host = SunshineHost(Path(tmp.name), port=mock.port - 1)
+    try:
+        mock.configure(host, sessions=1)
+        results = {'sync': bench_sync_calls(host, args.iterations)}
+        print_table("Sync API calls", results['sync'])
+        results['async'] = {'fetch_stats_and_sessions': bench_async_fetch(host, args.iterations)}
+        print_table("Async API", results['async'])
+        print("Monitor cycle")
+        results['cycle'] = bench_monitor_cycle(mock, host, guests, max(5, args.iterations // 5))
+    finally:
+        host.api.close()
+        mock.stop()
+        tmp.cleanup()
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for r in regressions:
+            print(f"REGRESSION {r}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
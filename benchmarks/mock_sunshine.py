@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Sunshine REST API
+
+Serves /api/pin, /api/stats, /api/sessions, /api/clients/list and
+/api/users over HTTPS (self-signed, generated with openssl) with
+configurable latency, error rate and number of streaming sessions, so the
+host code can be exercised without a real Sunshine.
+
+    python3 benchmarks/mock_sunshine.py --port 47990 --sessions 4 --latency 5
+
+The behaviour can be changed while running with POST /mock/config, e.g.
+{"sessions": 16, "latency_ms": 20, "error_rate": 0.1}; GET /mock/config
+returns it along with request counters.
+"""
+
+import argparse
+import json
+import random
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+from base64 import b64decode
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Accepted /api/pin lengths
+PIN_LENGTHS = (4, 6)
+
+
+def generate_certificate(directory: Path) -> tuple[Path, Path]:
+    """Self-signed certificate like the one Sunshine creates on first run"""
+    cert, key = directory / 'cert.pem', directory / 'pkey.pem'
+    subprocess.run([
+        'openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+        '-subj', '/CN=Sunshine Gamestream Host', '-keyout', str(key), '-out', str(cert)
+    ], check=True, capture_output=True)
+    return cert, key
+
+
+class MockConfig:
+    """Runtime behaviour of the mock server."""
+
+    FIELDS = ('latency_ms', 'jitter_ms', 'error_rate', 'sessions', 'legacy', 'auth', 'fps', 'bitrate')
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, sessions=0, legacy=False, auth=None, fps=60.0, bitrate=20000):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.sessions = sessions
+        # Older Sunshine: no /api/sessions (404), clients in /api/clients/list
+        self.legacy = legacy
+        # "user:password" required on every /api call, None to accept anything
+        self.auth = auth
+        self.fps = fps
+        self.bitrate = bitrate
+        self.requests = {}
+        self.lock = threading.Lock()
+
+    def update(self, values: dict):
+        with self.lock:
+            for k, v in values.items():
+                if k in self.FIELDS: setattr(self, k, v)
+
+    def as_dict(self) -> dict:
+        with self.lock:
+            d = {k: getattr(self, k) for k in self.FIELDS}
+            d['requests'] = dict(self.requests)
+        return d
+
+    def count(self, path: str):
+        with self.lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+
+    def session_list(self) -> list:
+        return [{
+            'id': f"session-{i}",
+            'name': f"Guest {i}",
+            'ip': f"127.0.{i // 250}.{i % 250 + 2}",
+            'clientAddress': f"127.0.{i // 250}.{i % 250 + 2}",
+        } for i in range(int(self.sessions))]
+
+
+class MockSunshineHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1' # Keep-alive, like Sunshine
+    server_version = 'MockSunshine'
+    # Headers and body in one segment, otherwise Nagle + delayed ACK adds ~40ms per response
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+    def _send(self, status: int, payload=None):
+        body = json.dumps(payload).encode() if payload is not None else b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length: return {}
+        try: return json.loads(self.rfile.read(length))
+        except ValueError: return None
+
+    def _authorized(self) -> bool:
+        auth = self.server.config.auth
+        if not auth: return True
+        header = self.headers.get('Authorization', '')
+        if not header.startswith('Basic '): return False
+        try: return b64decode(header[6:]).decode() == auth
+        except Exception: return False
+
+    def _handle(self, method: str):
+        cfg = self.server.config
+        path = self.path.split('?', 1)[0]
+        payload = self._read_json() if method in ('POST', 'DELETE') else {}
+
+        if path == '/mock/config':
+            if method == 'POST' and payload: cfg.update(payload)
+            return self._send(200, cfg.as_dict())
+
+        cfg.count(path)
+        delay = max(0.0, cfg.latency_ms + random.uniform(-cfg.jitter_ms, cfg.jitter_ms)) / 1000.0
+        if delay: time.sleep(delay)
+        if cfg.error_rate and random.random() < cfg.error_rate:
+            return self._send(500, {'status': False, 'error': 'mock error'})
+        if payload is None:
+            return self._send(400, {'status': False, 'error': 'invalid json'})
+
+        # Creating the first user doesn't need credentials
+        if not (method == 'POST' and path == '/api/users') and not self._authorized():
+            return self._send(401, {'status': False, 'error': 'unauthorized'})
+
+        if method == 'GET' and path == '/api/stats':
+            n = int(cfg.sessions)
+            return self._send(200, {
+                'fps': cfg.fps if n else 0,
+                'bitrate': cfg.bitrate * n,
+                'average_latency': round(random.uniform(2.0, 8.0), 2) if n else 0,
+                'sessions': n,
+            })
+        if method == 'GET' and path == '/api/sessions':
+            if cfg.legacy: return self._send(404)
+            return self._send(200, {'sessions': cfg.session_list()})
+        if method == 'GET' and path == '/api/clients/list':
+            clients = [dict(s, connected=True) for s in cfg.session_list()]
+            return self._send(200, {'status': True, 'clients': clients})
+        if method == 'DELETE' and path.startswith('/api/sessions/'):
+            with cfg.lock:
+                cfg.sessions = max(0, int(cfg.sessions) - 1)
+            return self._send(200, {'status': True})
+        if method == 'POST' and path == '/api/pin':
+            pin = str(payload.get('pin', ''))
+            # Moonlight's 4 digit pairing PIN or HostView's 6 digit pin_code
+            ok = pin.isdigit() and len(pin) in PIN_LENGTHS
+            return self._send(200, {'status': ok})
+        if method == 'POST' and path == '/api/users':
+            if not payload.get('usernameInput') or payload.get('passwordInput') != payload.get('confirmPasswordInput'):
+                return self._send(400, {'status': False, 'error': 'invalid user'})
+            cfg.update({'auth': f"{payload['usernameInput']}:{payload['passwordInput']}"})
+            return self._send(200, {'status': True})
+        return self._send(404, {'status': False, 'error': 'not found'})
+
+    def do_GET(self): self._handle('GET')
+    def do_POST(self): self._handle('POST')
+    def do_DELETE(self): self._handle('DELETE')
+
+
+class MockSunshine:
+    """
+    Mock server running in a background thread.
+
+        with MockSunshine(sessions=4) as mock:
+            host = SunshineHost(tmpdir, port=mock.port - 1)
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, cert: Path = None, key: Path = None, verbose: bool = False, **config):
+        self.config = MockConfig(**config)
+        self._tmp = None
+        if cert is None or key is None:
+            self._tmp = tempfile.TemporaryDirectory(prefix='mock-sunshine-')
+            cert, key = generate_certificate(Path(self._tmp.name))
+        self.server = ThreadingHTTPServer((host, port), MockSunshineHandler)
+        self.server.daemon_threads = True
+        self.server.config = self.config
+        self.server.verbose = verbose
+        ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        ctx.load_cert_chain(str(cert), str(key))
+        self.server.socket = ctx.wrap_socket(self.server.socket, server_side=True)
+        self._thread = None
+
+    @property
+    def port(self) -> int:
+        return self.server.server_address[1]
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name='MockSunshine', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        if self._tmp: self._tmp.cleanup()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Sunshine API server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=47990, help="0 picks a free port")
+    parser.add_argument('--latency', type=float, default=0.0, help="added latency per request (ms)")
+    parser.add_argument('--jitter', type=float, default=0.0, help="random +/- latency (ms)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of requests answered with HTTP 500")
+    parser.add_argument('--sessions', type=int, default=0, help="number of active streaming sessions")
+    parser.add_argument('--legacy', action='store_true', help="behave like old Sunshine (no /api/sessions)")
+    parser.add_argument('--auth', default=None, help="required credentials as user:password")
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    mock = MockSunshine(args.host, args.port, verbose=args.verbose, latency_ms=args.latency, jitter_ms=args.jitter,
+                        error_rate=args.error_rate, sessions=args.sessions, legacy=args.legacy, auth=args.auth)
+    print(f"Mock Sunshine listening on https://{args.host}:{mock.port}", flush=True)
+    try:
+        mock.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        mock.server.server_close()
+        if mock._tmp: mock._tmp.cleanup()
+
+
+if __name__ == '__main__':
+    main()
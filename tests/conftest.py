@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The application is not an installed package: import its modules like main.py does
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'usr', 'share', 'big-remote-play')
+sys.path.insert(0, os.path.abspath(APP_DIR))
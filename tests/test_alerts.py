@@ -0,0 +1,91 @@
+from utils.alerts import AlertEngine, AlertRule, metric_values
+
+
+def rule(**kw):
+    spec = {'name': "High latency", 'metric': 'latency', 'op': '>', 'threshold': 40, 'for': 10}
+    spec.update(kw)
+    return AlertEngine([spec])
+
+
+def states(events):
+    return [(e.state, e.subject) for e in events]
+
+
+def test_fires_only_after_hold():
+    engine = rule()
+    assert engine.evaluate({'latency': {None: 50}}, now=0) == []
+    assert engine.evaluate({'latency': {None: 50}}, now=9.9) == []
+    events = engine.evaluate({'latency': {None: 50}}, now=10)
+    assert states(events) == [('firing', None)]
+    assert events[0].value == 50 and events[0].threshold == 40
+    # Firing once, not on every sample
+    assert engine.evaluate({'latency': {None: 60}}, now=20) == []
+    assert engine.firing() == [("High latency", None)]
+
+
+def test_breach_interrupted_restarts_hold():
+    engine = rule()
+    engine.evaluate({'latency': {None: 50}}, now=0)
+    engine.evaluate({'latency': {None: 30}}, now=5)
+    assert engine.evaluate({'latency': {None: 50}}, now=10) == []
+    assert states(engine.evaluate({'latency': {None: 50}}, now=20)) == [('firing', None)]
+
+
+def test_hysteresis_keeps_firing_until_clear_level():
+    engine = rule(**{'for': 0})
+    assert states(engine.evaluate({'latency': {None: 41}}, now=0)) == [('firing', None)]
+    # Below the threshold but above the default clear level (40 - 10 %)
+    assert engine.evaluate({'latency': {None: 37}}, now=1) == []
+    assert states(engine.evaluate({'latency': {None: 35}}, now=2)) == [('resolved', None)]
+
+
+def test_clear_for_and_explicit_clear():
+    engine = rule(**{'for': 0, 'clear': 20, 'clear_for': 5})
+    engine.evaluate({'latency': {None: 50}}, now=0)
+    assert engine.evaluate({'latency': {None: 25}}, now=1) == []
+    assert engine.evaluate({'latency': {None: 15}}, now=2) == []
+    assert engine.evaluate({'latency': {None: 15}}, now=6.9) == []
+    assert states(engine.evaluate({'latency': {None: 15}}, now=7)) == [('resolved', None)]
+
+
+def test_relative_threshold_needs_context():
+    engine = AlertEngine([{'name': "Low FPS", 'metric': 'fps', 'op': '<', 'threshold': 0.8, 'of': 'target_fps'}])
+    assert engine.evaluate({'fps': {None: 10}}, {}, now=0) == []
+    events = engine.evaluate({'fps': {None: 40}}, {'target_fps': 60}, now=1)
+    assert states(events) == [('firing', None)]
+    assert events[0].threshold == 48
+    # Losing the context value resolves it
+    assert states(engine.evaluate({'fps': {None: 40}}, {}, now=2)) == [('resolved', None)]
+
+
+def test_subjects_are_independent_and_resolve_when_gone():
+    engine = rule(**{'for': 0})
+    events = engine.evaluate({'latency': {'deck': 50, 'tv': 10}}, now=0)
+    assert states(events) == [('firing', 'deck')]
+    assert states(engine.evaluate({'latency': {'tv': 10}}, now=1)) == [('resolved', 'deck')]
+    assert engine.firing() == []
+
+
+def test_nan_and_none_values_are_skipped():
+    engine = rule(**{'for': 0})
+    assert engine.evaluate({'latency': {None: float('nan'), 'deck': None}}, now=0) == []
+
+
+def test_invalid_rules_are_dropped():
+    engine = AlertEngine([{'metric': 'fps', 'op': '!=', 'threshold': 1}, {'op': '>'}, {'metric': 'fps', 'threshold': 1}])
+    assert [r.metric for r in engine.rules] == ['fps']
+
+
+def test_message():
+    r = AlertRule("Slow guest", 'latency', '>', 40)
+    event = r.update('deck (192.168.0.2)', 4.25, r.limits({}), 0) or r.update('deck (192.168.0.2)', 45, r.limits({}), 0)
+    assert event.message == "Slow guest — deck: latency 45 ms (limit 40 ms)"
+
+
+def test_metric_values_skips_unmeasured():
+    values = metric_values(0, 0, 0)
+    assert values['fps'] == {} and values['bandwidth'] == {} and values['latency'] == {}
+    values = metric_values(12, 60, 20, {'deck': 12}, {'deck': (5.0, 0.1)})
+    assert values['fps'] == {None: 60}
+    assert values['latency'] == {'deck': 12}
+    assert values['guest_tx'] == {'deck': 5.0}
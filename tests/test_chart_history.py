@@ -0,0 +1,84 @@
+import math
+from types import SimpleNamespace
+
+from utils.chart_history import ChartHistory, ColumnRing, SummaryLevel
+
+
+def usage(cpu, gpu=None):
+    return SimpleNamespace(cpu=cpu, gpu=gpu, rss=100.0, threads=4, read=None, write=None)
+
+
+def test_column_ring_wraps_in_chronological_order():
+    ring = ColumnRing(3)
+    for i in range(5):
+        ring.push({'t': float(i)})
+    assert len(ring) == 3
+    assert ring.column('t') == [2.0, 3.0, 4.0]
+    assert ring.get('t', 0) == 2.0 and ring.get('t', -1) == 4.0
+
+
+def test_late_column_is_backfilled_with_nan():
+    ring = ColumnRing(4)
+    ring.push({'t': 0.0})
+    ring.push({'t': 1.0, 'x': 5.0})
+    x = ring.column('x')
+    assert math.isnan(x[0]) and x[1] == 5.0
+    assert all(math.isnan(v) for v in ring.column('missing'))
+
+
+def test_drop_empty():
+    ring = ColumnRing(2)
+    ring.push({'t': 0.0, 'a': 1.0})
+    ring.push({'t': 1.0})
+    ring.push({'t': 2.0})
+    ring.drop_empty(['a', 't'])
+    assert set(ring.columns) == {'t'}
+
+
+def test_summary_level_buckets():
+    level = SummaryLevel(10.0, 4)
+    for t, v in [(0, 1.0), (5, 3.0), (12, 10.0), (35, 7.0)]:
+        level.add(t, {'latency': v})
+    assert level.column('t', None) == [0.0, 10.0, 20.0, 30.0]
+    assert level.column('min', 'latency')[:2] == [1.0, 10.0]
+    assert level.column('max', 'latency')[0] == 3.0
+    assert level.column('avg', 'latency')[0] == 2.0
+    # Empty bucket keeps the time axis regular, the bucket in progress comes last
+    assert math.isnan(level.column('avg', 'latency')[2])
+    assert level.column('avg', 'latency')[3] == 7.0
+
+
+def test_history_point_round_trip():
+    h = ChartHistory(8)
+    h.append(1.0, 12.0, 60.0, 20.0, users=2, device_latencies={'deck': 12.0, 'tv': 30.0},
+             device_bandwidth={'deck': (15.0, 0.5)}, bw_override="Unlimited",
+             resources={'sunshine': usage(25.0, 40.0)})
+    p = h.point(0)
+    assert (p['t'], p['latency'], p['fps'], p['bandwidth'], p['users']) == (1.0, 12.0, 60.0, 20.0, 2)
+    assert p['device_latencies'] == {'deck': 12.0, 'tv': 30.0}
+    assert p['device_bandwidth'] == {'deck': (15.0, 0.5)}
+    assert p['bw_override'] == "Unlimited"
+    assert p['resources']['sunshine'] == {'cpu': 25.0, 'gpu': 40.0, 'rss': 100.0, 'threads': 4}
+    assert h.devices() == ['deck', 'tv'] and h.groups() == ['sunshine']
+
+
+def test_history_forgets_devices_after_a_lap():
+    h = ChartHistory(3)
+    h.append(0.0, 1.0, 60.0, 1.0, device_latencies={'deck': 5.0})
+    for t in range(1, 6):
+        h.append(float(t), 1.0, 60.0, 1.0, device_latencies={'tv': 6.0})
+    assert h.devices() == ['tv']
+    assert h.device_column('lat', 'tv') == [6.0, 6.0, 6.0]
+    # Ids stay stable, so a returning device reuses its name slot
+    assert h.device_id('deck') == 0
+
+
+def test_history_feeds_summary_levels():
+    h = ChartHistory(4, levels=[(10.0, 6)])
+    for t in range(25):
+        h.append(float(t), float(t), 60.0, 1.0, device_latencies={'deck': 2.0 * t},
+                 resources={'game': usage(50.0)})
+    level = h.levels[0]
+    assert level.column('max', 'latency') == [9.0, 19.0, 24.0]
+    assert h.devices(level=level) == ['deck']
+    assert h.groups(level=level) == ['game']
@@ -0,0 +1,51 @@
+from utils.downsample import minmax_downsample, value_at
+
+
+def test_small_series_returned_whole():
+    xs, ys = [0, 1, 2, 3], [5, 6, 7, 8]
+    assert minmax_downsample(xs, ys, 0, 3, 10) == (xs, ys)
+
+
+def test_keeps_one_neighbour_outside_the_window():
+    xs = list(range(10))
+    ys = [x * 10 for x in xs]
+    assert minmax_downsample(xs, ys, 3.5, 5.5, 10) == ([3, 4, 5, 6], [30, 40, 50, 60])
+
+
+def test_reduces_to_min_and_max_per_bucket():
+    xs = [i * 0.01 for i in range(1000)]
+    ys = [0.0] * 1000
+    ys[123] = 99.0   # Spike
+    ys[700] = -50.0  # Dip
+    out_x, out_y = minmax_downsample(xs, ys, 0.0, 10.0, 20)
+    assert len(out_x) <= 2 * 20 + 2
+    assert 99.0 in out_y and -50.0 in out_y
+    assert out_x == sorted(out_x)
+    # Every kept point is a real sample
+    assert all(ys[round(x * 100)] == y for x, y in zip(out_x, out_y))
+
+
+def test_min_before_max_keeps_time_order():
+    xs = list(range(100))
+    ys = [0] * 100
+    ys[10], ys[20] = -1, 1
+    out_x, out_y = minmax_downsample(xs, ys, 0, 99, 1)
+    assert (out_x, out_y) == ([0, 10, 20, 99], [0, -1, 1, 0])
+
+
+def test_keeps_the_first_and_last_points():
+    xs = list(range(100))
+    ys = [50] * 100
+    ys[0], ys[99] = 7, 8
+    ys[5], ys[40], ys[60], ys[95] = 0, 100, 0, 100
+    out_x, out_y = minmax_downsample(xs, ys, 0, 99, 2)
+    assert (out_x[0], out_y[0]) == (0, 7)
+    assert (out_x[-1], out_y[-1]) == (99, 8)
+    assert 0 in out_y and 100 in out_y
+
+
+def test_value_at():
+    xs, ys = [1.0, 2.0, 3.0], ['a', 'b', 'c']
+    assert value_at(xs, ys, 2.0) == 'b'
+    assert value_at(xs, ys, 2.5) is None
+    assert value_at(xs, ys, 4.0) is None
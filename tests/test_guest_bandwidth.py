@@ -0,0 +1,78 @@
+from utils import guest_bandwidth
+from utils.guest_bandwidth import GuestBandwidthMeter, _parse_conntrack_line, read_conntrack_flows
+
+UDP_VIDEO = ("ipv4     2 udp      17 29 src=192.168.1.20 dst=192.168.1.10 sport=50000 dport=47998 packets=100 bytes=5000 "
+             "src=192.168.1.10 dst=192.168.1.20 sport=47998 dport=50000 packets=9000 bytes=12000000 [ASSURED] mark=0 zone=0 use=2")
+TCP_CONTROL = ("ipv4     2 tcp      6 431999 ESTABLISHED src=192.168.1.20 dst=192.168.1.10 sport=41000 dport=47984 packets=20 bytes=3000 "
+               "src=192.168.1.10 dst=192.168.1.20 sport=47984 dport=41000 packets=18 bytes=9000 [ASSURED] mark=0 use=1")
+# Host-initiated flow: original direction is host -> guest
+HOST_OPENED = ("ipv4     2 udp      17 29 src=192.168.1.10 dst=192.168.1.30 sport=48000 dport=51000 packets=50 bytes=700000 "
+               "src=192.168.1.30 dst=192.168.1.10 sport=51000 dport=48000 packets=5 bytes=400 mark=0 use=1")
+NO_ACCOUNTING = ("ipv4     2 udp      17 29 src=192.168.1.20 dst=192.168.1.10 sport=50000 dport=47998 "
+                 "src=192.168.1.10 dst=192.168.1.20 sport=47998 dport=50000 [ASSURED] mark=0 use=2")
+UNRELATED = ("ipv4     2 tcp      6 100 ESTABLISHED src=192.168.1.10 dst=1.1.1.1 sport=40000 dport=443 packets=1 bytes=60 "
+             "src=1.1.1.1 dst=192.168.1.10 sport=443 dport=40000 packets=1 bytes=60 mark=0 use=1")
+
+
+def test_parse_conntrack_line():
+    assert _parse_conntrack_line(UDP_VIDEO) == (
+        'udp', ('192.168.1.20', '192.168.1.10', 50000, 47998, 5000), ('192.168.1.10', '192.168.1.20', 47998, 50000, 12000000))
+    assert _parse_conntrack_line(TCP_CONTROL)[0] == 'tcp'
+    assert _parse_conntrack_line(NO_ACCOUNTING) is None
+    assert _parse_conntrack_line("") is None
+
+
+def test_read_conntrack_flows(tmp_path, monkeypatch):
+    path = tmp_path / 'nf_conntrack'
+    path.write_text('\n'.join([UDP_VIDEO, TCP_CONTROL, HOST_OPENED, UNRELATED]) + '\n')
+    monkeypatch.setattr(guest_bandwidth, 'CONNTRACK_PATH', str(path))
+    flows = read_conntrack_flows({47984, 47998, 48000})
+    # tx is host -> guest whichever side opened the flow
+    assert flows == {
+        ('udp', '192.168.1.20', 50000, 47998): (12000000, 5000),
+        ('tcp', '192.168.1.20', 41000, 47984): (9000, 3000),
+        ('udp', '192.168.1.30', 51000, 48000): (700000, 400),
+    }
+
+
+def test_read_conntrack_flows_without_accounting(tmp_path, monkeypatch):
+    path, acct = tmp_path / 'nf_conntrack', tmp_path / 'acct'
+    path.write_text(NO_ACCOUNTING + '\n')
+    acct.write_text('0\n')
+    monkeypatch.setattr(guest_bandwidth, 'CONNTRACK_PATH', str(path))
+    monkeypatch.setattr(guest_bandwidth, 'CONNTRACK_ACCT_PATH', str(acct))
+    assert read_conntrack_flows({47998}) is None
+    # Accounting on but no Sunshine flows yet: empty, not unavailable
+    acct.write_text('1\n')
+    assert read_conntrack_flows({47998}) == {}
+
+
+def test_meter_rates_per_guest(monkeypatch):
+    samples = iter([
+        {('udp', '10.0.0.2', 50000, 47998): (1000000, 1000), ('tcp', '10.0.0.2', 41000, 47984): (0, 0)},
+        # +2 MB video, a new flow appears, another guest's counters reset (recreated flow)
+        {('udp', '10.0.0.2', 50000, 47998): (3000000, 1000), ('tcp', '10.0.0.2', 41000, 47984): (250000, 0),
+         ('udp', '10.0.0.3', 50001, 47998): (500000, 0)},
+    ])
+    clock = iter([100.0, 102.0])
+    monkeypatch.setattr(guest_bandwidth, 'read_conntrack_flows', lambda ports: next(samples))
+    monkeypatch.setattr(guest_bandwidth.time, 'monotonic', lambda: next(clock))
+    meter = GuestBandwidthMeter({47984, 47998})
+    assert meter.sample() == {}
+    assert meter.available
+    rates = meter.sample()
+    assert rates['10.0.0.2'] == (9.0, 0.0)
+    assert rates['10.0.0.3'] == (2.0, 0.0)
+
+
+def test_meter_unavailable_without_conntrack(monkeypatch):
+    calls = []
+    def unreadable(ports):
+        calls.append(ports)
+        raise PermissionError(13, "Permission denied")
+    monkeypatch.setattr(guest_bandwidth, 'read_conntrack_flows', unreadable)
+    meter = GuestBandwidthMeter({47984})
+    assert meter.sample() == {}
+    assert not meter.available
+    # Not retried every cycle
+    assert meter.sample() == {} and len(calls) == 1
@@ -0,0 +1,62 @@
+import pytest
+
+from guest.moonlight_stats import MoonlightStatsParser
+
+# As moonlight-qt logs it when the stream ends
+GLOBAL_STATS = """\
+00:10:01 - SDL Info (0): Global video stats
+00:10:01 - SDL Info (0): ----------------------------------------------------------
+Video stream: 1920x1080 60.00 FPS (Codec: H.264)
+Incoming frame rate from network: 59.98 FPS
+Decoding frame rate: 59.98 FPS
+Rendering frame rate: 59.90 FPS
+Host processing latency min/max/average: 3.1/9.8/4.2 ms
+Frames dropped by your network connection: 0.10%
+Frames dropped due to network jitter: 0.20%
+Average network latency: 4 ms (variance: 1 ms)
+Average decoding time: 1.20 ms
+Average frame queue delay: 0.30 ms
+Average rendering time (including monitor V-sync latency): 8.00 ms
+00:10:01 - SDL Info (0): Quitting session
+"""
+
+
+def feed(parser, text):
+    return [s for s in (parser.feed(l) for l in text.splitlines()) if s]
+
+
+def test_global_stats_block():
+    parser = MoonlightStatsParser()
+    [stats] = feed(parser, GLOBAL_STATS)
+    assert stats.final
+    assert (stats.network_fps, stats.decoded_fps, stats.rendered_fps) == (59.98, 59.98, 59.9)
+    assert stats.host_latency == 4.2
+    assert (stats.network_latency, stats.network_variance) == (4.0, 1.0)
+    assert stats.render_time == 8.0
+    assert stats.bitrate is None
+    assert stats.fps == 59.9
+    assert stats.frame_drops == pytest.approx(0.3)
+    assert parser.flush() is None
+
+
+def test_latency_uses_half_the_round_trip():
+    [stats] = feed(MoonlightStatsParser(), GLOBAL_STATS)
+    # host + network / 2 + decode + queue + render
+    assert stats.latency == pytest.approx(4.2 + 2.0 + 1.2 + 0.3 + 8.0)
+
+
+def test_block_without_header_is_not_final():
+    body = GLOBAL_STATS.split('----------------------------------------------------------\n', 1)[1]
+    [stats] = feed(MoonlightStatsParser(), body)
+    assert not stats.final
+
+
+def test_partial_blocks():
+    parser = MoonlightStatsParser()
+    # A new block starts before the previous one ended
+    assert feed(parser, "Video stream: 1280x720 60.00 FPS (Codec: HEVC)\nRendering frame rate: 30.00 FPS") == []
+    [partial] = feed(parser, "Video stream: 1280x720 60.00 FPS (Codec: HEVC)")
+    assert partial.fps == 30.0 and partial.latency is None and partial.frame_drops is None
+    feed(parser, "Bitrate: 18.5 Mbps")
+    assert parser.flush().bitrate == 18.5
+    assert parser.flush() is None
@@ -0,0 +1,79 @@
+import os
+import socket
+import struct
+
+import pytest
+
+from utils import sock_diag
+from utils.sock_diag import INET_DIAG_BC_S_GE, INET_DIAG_BC_S_LE, TCP_LISTEN, query_sockets
+
+
+def decode(bytecode):
+    """[(offset, code, yes, no, port)] for the two-word port comparisons"""
+    ops = []
+    for offset in range(0, len(bytecode), 8):
+        code, yes, no = struct.unpack_from('=BBH', bytecode, offset)
+        port = struct.unpack_from('=BBH', bytecode, offset + 4)[2]
+        ops.append((offset, code, yes, no, port))
+    return ops
+
+
+def test_port_filter_bytecode():
+    bytecode = sock_diag._port_filter(47984, 48010)
+    assert len(bytecode) == 16
+    assert decode(bytecode) == [(0, INET_DIAG_BC_S_GE, 8, 20, 47984), (8, INET_DIAG_BC_S_LE, 8, 12, 48010)]
+    # yes steps to the next op; no lands 4 bytes past the end (reject)
+    for offset, _code, yes, no, _port in decode(bytecode):
+        assert offset + yes in (8, len(bytecode))
+        assert offset + no == len(bytecode) + 4
+
+
+def test_normalize_ip():
+    assert sock_diag._normalize_ip(socket.inet_pton(socket.AF_INET, '192.168.0.2') + b'\0' * 12, socket.AF_INET) == '192.168.0.2'
+    mapped = socket.inet_pton(socket.AF_INET6, '::ffff:10.0.0.7')
+    assert sock_diag._normalize_ip(mapped, socket.AF_INET6) == '10.0.0.7'
+    assert sock_diag._normalize_ip(socket.inet_pton(socket.AF_INET6, 'fe80::1'), socket.AF_INET6) == 'fe80::1'
+
+
+def test_proc_ip_host_order():
+    # /proc/net/tcp prints 127.0.0.1 as 0100007F on little endian machines
+    expected = '127.0.0.1' if struct.pack('=I', 1)[0] == 1 else '1.0.0.127'
+    assert sock_diag._proc_ip('0100007F') == expected
+
+
+@pytest.fixture
+def listeners():
+    socks = []
+    for _ in range(2):
+        s = socket.socket()
+        s.bind(('127.0.0.1', 0))
+        s.listen()
+        socks.append(s)
+    yield socks
+    for s in socks:
+        s.close()
+
+
+def test_query_sockets_finds_listener_by_port_and_inode(listeners):
+    port = listeners[0].getsockname()[1]
+    found = query_sockets([port], ('tcp',), 1 << TCP_LISTEN)
+    assert [(s.local_port, s.state) for s in found] == [(port, 'LISTEN')]
+    inode = int(os.readlink(f'/proc/self/fd/{listeners[0].fileno()}')[8:-1])
+    assert found[0].inode == inode
+
+
+def test_query_sockets_drops_ports_inside_the_range(listeners):
+    # The kernel filters on min..max; ports in between are dropped in Python
+    a, b = sorted(s.getsockname()[1] for s in listeners)
+    if b - a < 2: pytest.skip("listeners got adjacent ports")
+    found = query_sockets([a - 1, b + 1], ('tcp',), 1 << TCP_LISTEN)
+    assert all(s.local_port not in (a, b) for s in found)
+
+
+def test_proc_fallback_matches_netlink(listeners, monkeypatch):
+    port = listeners[1].getsockname()[1]
+    netlink = query_sockets([port], ('tcp',), 1 << TCP_LISTEN)
+    def no_netlink(*args): raise OSError("no sock_diag")
+    monkeypatch.setattr(sock_diag, '_netlink_query', no_netlink)
+    proc = query_sockets([port], ('tcp',), 1 << TCP_LISTEN)
+    assert [(s.local_ip, s.local_port, s.inode) for s in proc] == [(s.local_ip, s.local_port, s.inode) for s in netlink]
@@ -0,0 +1,77 @@
+import random
+
+import pytest
+
+from utils.stream_stats import FPS_EDGES, LATENCY_EDGES, SlidingHistogram, StreamStats, log_edges
+
+
+def exact_quantile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def test_log_edges():
+    edges = log_edges(1.0, 1000.0, 3)
+    assert edges == pytest.approx([1.0, 10.0, 100.0, 1000.0])
+
+
+@pytest.mark.parametrize('q', [0.5, 0.95, 0.99])
+def test_quantiles_close_to_exact(q):
+    rng = random.Random(7)
+    values = [rng.lognormvariate(2.5, 0.6) for _ in range(5000)]
+    h = SlidingHistogram(LATENCY_EDGES)
+    for v in values:
+        h.add(v, now=1.0)
+    # ~12 % wide buckets
+    assert h.quantile(q) == pytest.approx(exact_quantile(values, q), rel=0.12)
+
+
+def test_mean_and_stddev_are_exact():
+    h = SlidingHistogram(FPS_EDGES)
+    for v in (58.0, 60.0, 62.0):
+        h.add(v, now=0.0)
+    assert h.mean() == pytest.approx(60.0)
+    assert h.stddev() == pytest.approx((8 / 3) ** 0.5)
+
+
+def test_empty_and_out_of_range():
+    h = SlidingHistogram(LATENCY_EDGES)
+    assert h.quantile(0.5) == 0.0 and h.mean() == 0.0 and h.stddev() == 0.0
+    h.add(10 ** 6, now=0.0)
+    assert h.quantile(0.99) == LATENCY_EDGES[-1]
+
+
+def test_window_slides_by_slot():
+    h = SlidingHistogram(FPS_EDGES, window=60.0, slots=12)
+    h.add(30.0, now=0.0)
+    h.add(60.0, now=30.0)
+    assert h.count == 2
+    # The first slot (0-5 s) leaves the window once time reaches 60 s
+    h.expire(now=60.0)
+    assert h.count == 1 and h.mean() == pytest.approx(60.0)
+    # A gap longer than the window empties it
+    h.expire(now=500.0)
+    assert h.count == 0 and h.quantile(0.5) == 0.0
+
+
+def test_stream_stats_summary():
+    stats = StreamStats(window=60.0)
+    for i, ms in enumerate([10.0, 12.0, 10.0, 12.0] * 5):
+        stats.add_latency('deck', ms, now=float(i))
+        stats.add_fps('deck', 60.0, now=float(i))
+    stats.add_latency('deck', 0, now=20.0)  # Not measured: ignored
+    summary = stats.summary('deck', now=20.0)
+    assert summary.samples == 20
+    assert 9.0 < summary.p50 < 13.0
+    assert 0.0 < summary.jitter < 2.0
+    assert summary.fps_avg == pytest.approx(60.0)
+    assert summary.fps_stability == pytest.approx(1.0)
+    assert stats.summary('tv').samples == 0
+
+
+def test_stream_stats_prune():
+    stats = StreamStats(window=10.0)
+    stats.add_latency('deck', 5.0, now=0.0)
+    stats.add_latency('tv', 5.0, now=8.0)
+    stats.prune(now=15.0)
+    assert stats.guests() == ['tv']
@@ -0,0 +1,84 @@
+import os
+
+import pytest
+
+from host.sunshine_config import SunshineConfigFile
+
+CONF = "# Sunshine\nport = 47989\nfps = 60\n\n# encoder\nencoder = nvenc\n"
+
+
+@pytest.fixture
+def conf(tmp_path):
+    path = tmp_path / 'sunshine.conf'
+    path.write_text(CONF)
+    return SunshineConfigFile(path)
+
+
+def test_update_reports_only_changed_keys(conf):
+    mtime = conf.path.stat().st_mtime_ns
+    assert conf.update({'fps': 60, 'port': '47989'}) == set()
+    # Nothing changed: the file is not rewritten
+    assert conf.path.stat().st_mtime_ns == mtime
+    assert conf.update({'fps': 120, 'bitrate': 20000}) == {'fps', 'bitrate'}
+    assert conf.path.read_text() == "# Sunshine\nport = 47989\nfps = 120\n\n# encoder\nencoder = nvenc\nbitrate = 20000\n"
+
+
+def test_none_removes_a_key(conf):
+    assert conf.set('encoder', None) == {'encoder'}
+    assert conf.set('encoder', None) == set()
+    # Comments stay
+    assert conf.path.read_text() == "# Sunshine\nport = 47989\nfps = 60\n\n# encoder\n"
+
+
+def test_transaction_writes_once(conf, monkeypatch):
+    writes = []
+    real_write = conf._write
+    monkeypatch.setattr(conf, '_write', lambda: (writes.append(1), real_write()))
+    with conf.transaction() as changed:
+        conf.set('fps', 90)
+        conf.set('port', 48000)
+        conf.set('fps', 90)
+        assert writes == []
+    assert changed == {'fps', 'port'}
+    assert writes == [1]
+    assert conf.values()['port'] == '48000'
+
+
+def test_transaction_rolls_back_on_error(conf):
+    with pytest.raises(RuntimeError):
+        with conf.transaction():
+            conf.set('fps', 144)
+            conf.set('new_key', 1)
+            raise RuntimeError("half applied")
+    assert conf.path.read_text() == CONF
+    assert conf.values() == {'port': '47989', 'fps': '60', 'encoder': 'nvenc'}
+
+
+def test_nested_rollback_keeps_outer_updates(conf):
+    with conf.transaction() as changed:
+        conf.set('fps', 90)
+        try:
+            with conf.transaction():
+                conf.set('port', 1)
+                raise ValueError
+        except ValueError:
+            pass
+    assert changed == {'fps'}
+    assert conf.values()['port'] == '47989' and conf.values()['fps'] == '90'
+
+
+def test_external_edits_are_picked_up(conf):
+    conf.path.write_text(CONF.replace('fps = 60', 'fps = 30'))
+    # Make sure the mtime differs even on coarse filesystems
+    st = conf.path.stat()
+    os.utime(conf.path, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+    assert conf.get('fps') == '30'
+    assert conf.set('bitrate', 1) == {'bitrate'}
+    assert 'fps = 30' in conf.path.read_text()
+
+
+def test_missing_file_is_created(tmp_path):
+    conf = SunshineConfigFile(tmp_path / 'new' / 'sunshine.conf')
+    assert conf.values() == {}
+    assert conf.set('port', 47989) == {'port'}
+    assert conf.path.read_text() == "port = 47989\n"
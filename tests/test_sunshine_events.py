@@ -0,0 +1,73 @@
+from host.sunshine_events import (CLIENT_CONNECTED, CLIENT_DISCONNECTED, ENCODER_INITIALIZED, ERROR, SESSION_ENDED,
+                                  SESSION_STARTED, SunshineEventStream)
+
+
+class FakeTailer:
+    def __init__(self):
+        self.callbacks = []
+
+    def subscribe(self, callback):
+        self.callbacks.append(callback)
+        return lambda: self.callbacks.remove(callback)
+
+
+def line(msg, level='Info'):
+    return f"[2024-05-01 12:00:00.123]: {level}: {msg}"
+
+
+def test_event_kinds():
+    stream = SunshineEventStream(FakeTailer())
+    assert stream.parse_line(line("Client connected")).kind == CLIENT_CONNECTED
+    assert stream.parse_line(line("Failed to bind", 'Error')).kind == ERROR
+    enc = stream.parse_line(line("Found H.264 encoder: h264_nvenc [nvenc]"))
+    assert enc.kind == ENCODER_INITIALIZED and enc.detail == "H.264: h264_nvenc [nvenc]"
+    assert stream.parse_line(line("Unrelated message")) is None
+    assert stream.parse_line("not a sunshine log line") is None
+
+
+def test_older_timestamp_format():
+    stream = SunshineEventStream(FakeTailer())
+    event = stream.parse_line("[2024:05:01:12:00:00]: Info: New streaming session started")
+    assert event.kind == SESSION_STARTED and event.client_ip is None
+
+
+def test_peer_address_carried_to_next_event():
+    stream = SunshineEventStream(FakeTailer())
+    assert stream.parse_line(line("Peer address: 192.168.1.20")) is None
+    assert stream.parse_line(line("New streaming session started")).client_ip == '192.168.1.20'
+    assert stream.parse_line(line("Client disconnected [fe80::1%eth0]")).client_ip == 'fe80::1%eth0'
+
+
+def test_one_teardown_counts_down_once():
+    stream = SunshineEventStream(FakeTailer())
+    stream.parse_line(line("New streaming session started"))
+    stream.parse_line(line("New streaming session started"))
+    # One guest leaves, logging both lines
+    stream.parse_line(line("Client disconnected"))
+    event = stream.parse_line(line("Streaming session ended"))
+    assert event.kind == SESSION_ENDED and event.active_sessions == 1
+    assert stream.parse_line(line("Client disconnected")).kind == CLIENT_DISCONNECTED
+    assert stream.active_sessions == 1
+    stream.parse_line(line("Streaming session ended"))
+    stream.parse_line(line("Streaming session ended"))
+    assert stream.active_sessions == 0
+
+
+def test_logged_count_wins():
+    stream = SunshineEventStream(FakeTailer())
+    stream.parse_line(line("New streaming session started [active sessions: 3]"))
+    assert stream.active_sessions == 3
+    stream.parse_line(line("Client disconnected [active sessions: 2]"))
+    assert stream.active_sessions == 2
+
+
+def test_subscribers_and_tail_subscription():
+    tailer = FakeTailer()
+    stream = SunshineEventStream(tailer)
+    received = []
+    unsubscribe = stream.subscribe(received.append)
+    assert len(tailer.callbacks) == 1
+    tailer.callbacks[0]([line("New streaming session started"), line("noise")])
+    assert [e.kind for e in received] == [SESSION_STARTED]
+    unsubscribe()
+    assert tailer.callbacks == []
@@ -2,6 +2,8 @@ import subprocess, shutil
 class MoonlightClient:
     def __init__(self, logger=None):
         self.process = None; self.connected_host = None; self.logger = logger
+        # Called with each MoonlightStats parsed from the stream's output (reader thread)
+        self.on_stats = None
         self.moonlight_cmd = next((c for c in ['moonlight-qt', 'moonlight'] if shutil.which(c)), None)
     
     def _prepare_ip(self, ip):
@@ -57,17 +59,24 @@ class MoonlightClient:
                 self.logger.info(f"Connecting to {ip} (target: {target_ip}) with options: {kw}")
                 self.logger.info(f"Command: {' '.join(cmd)}")
             
-            stdout_target = subprocess.PIPE if self.logger else None
-            stderr_target = subprocess.PIPE if self.logger else None
+            stdout_target = subprocess.PIPE if self.logger or self.on_stats else None
+            stderr_target = subprocess.PIPE if self.logger or self.on_stats else None
             
             self.process = subprocess.Popen(cmd, stdout=stdout_target, stderr=stderr_target, text=True)
             self.connected_host = ip
             
-            if self.logger:
+            if self.logger or self.on_stats:
                 import threading
+                from .moonlight_stats import MoonlightStatsParser
                 def log_output(pipe, level):
+                    parser = MoonlightStatsParser()
                     for line in iter(pipe.readline, ''):
-                        if line: getattr(self.logger, level, self.logger.info)(f"[Moonlight] {line.strip()}")
+                        if not line: continue
+                        if self.logger: getattr(self.logger, level, self.logger.info)(f"[Moonlight] {line.strip()}")
+                        stats = parser.feed(line)
+                        if stats and self.on_stats: self.on_stats(stats)
+                    stats = parser.flush()
+                    if stats and self.on_stats: self.on_stats(stats)
                     pipe.close()
                 if self.process.stdout: threading.Thread(target=log_output, args=(self.process.stdout, 'info'), daemon=True).start()
                 if self.process.stderr: threading.Thread(target=log_output, args=(self.process.stderr, 'error'), daemon=True).start()
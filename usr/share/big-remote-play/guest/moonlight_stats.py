@@ -0,0 +1,111 @@
+"""
+Stream statistics from Moonlight's log output
+
+moonlight-qt prints its video stats block to the log only once, under a
+"Global video stats" header when the stream ends (averages over the whole
+stream); the per-second values go to its on-screen overlay only, so there
+is no live source to chart. Only the final block is shown, as a summary.
+"""
+
+import re
+import time
+from typing import NamedTuple
+
+
+class MoonlightStats(NamedTuple):
+    """One video stats block; None = not in this Moonlight version's output."""
+    timestamp: float
+    network_fps: float     # Frames received from the network
+    decoded_fps: float
+    rendered_fps: float
+    host_latency: float    # Host processing, average ms
+    network_latency: float # Round trip, ms
+    network_variance: float
+    decode_time: float     # ms
+    queue_delay: float     # ms
+    render_time: float     # ms, monitor V-sync included
+    network_drops: float   # % of frames lost on the network
+    jitter_drops: float    # % of frames dropped for arriving late
+    bitrate: float         # Mbps
+    final: bool = False    # Whole-stream averages logged at stream end
+
+    @property
+    def latency(self) -> float:
+        """Host processing + one-way network (half the round trip) + decode + queue + render (ms), None without any"""
+        network = self.network_latency / 2 if self.network_latency is not None else None
+        stages = [v for v in (self.host_latency, network, self.decode_time, self.queue_delay, self.render_time) if v is not None]
+        return sum(stages) if stages else None
+
+    @property
+    def fps(self) -> float:
+        for v in (self.rendered_fps, self.decoded_fps, self.network_fps):
+            if v is not None: return v
+        return None
+
+    @property
+    def frame_drops(self) -> float:
+        drops = [v for v in (self.network_drops, self.jitter_drops) if v is not None]
+        return sum(drops) if drops else None
+
+
+_NUM = r'([\d.]+)'
+# (pattern, fields); lines may carry a log prefix ("00:00:05 - SDL Info (0): ...")
+_PATTERNS = [
+    (re.compile(r'Bitrate: ' + _NUM + ' Mbps'), ('bitrate',)),
+    (re.compile(r'Incoming frame rate from network: ' + _NUM + ' FPS'), ('network_fps',)),
+    (re.compile(r'Decoding frame rate: ' + _NUM + ' FPS'), ('decoded_fps',)),
+    (re.compile(r'Rendering frame rate: ' + _NUM + ' FPS'), ('rendered_fps',)),
+    (re.compile(r'Host processing latency min/max/average: ' + _NUM + '/' + _NUM + '/' + _NUM + ' ms'), (None, None, 'host_latency')),
+    (re.compile(r'Frames dropped by your network connection: ' + _NUM + '%'), ('network_drops',)),
+    (re.compile(r'Frames dropped due to network jitter: ' + _NUM + '%'), ('jitter_drops',)),
+    (re.compile(r'Average network latency: ' + _NUM + r' ms \(variance: ' + _NUM + r' ms\)'), ('network_latency', 'network_variance')),
+    (re.compile(r'Average decoding time: ' + _NUM + ' ms'), ('decode_time',)),
+    (re.compile(r'Average frame queue delay: ' + _NUM + ' ms'), ('queue_delay',)),
+    (re.compile(r'Average rendering time[^:]*: ' + _NUM + ' ms'), ('render_time',)),
+]
+_BLOCK_START = re.compile(r'Video stream: \d+x\d+')
+_FINAL_HEADER = 'Global video stats'
+# Last line of a block
+_BLOCK_END = 'render_time'
+
+
+class MoonlightStatsParser:
+    """
+    Incremental parser for the video stats blocks Moonlight prints (the
+    text of its performance overlay). feed() takes one output line at a
+    time and returns a MoonlightStats when a block is complete; other
+    lines are ignored. One parser per output stream.
+    """
+
+    def __init__(self):
+        self._values = {}
+        self._final = False
+
+    def _emit(self):
+        if not self._values: return None
+        values, self._values = self._values, {}
+        final, self._final = self._final, False
+        return MoonlightStats(time.time(), *(values.get(f) for f in MoonlightStats._fields[1:-1]), final=final)
+
+    def feed(self, line: str):
+        if _FINAL_HEADER in line:
+            stats = self._emit()
+            self._final = True
+            return stats
+        if _BLOCK_START.search(line):
+            # A new block without the end of the previous one
+            return self._emit()
+        if ':' not in line: return None
+        for pattern, fields in _PATTERNS:
+            match = pattern.search(line)
+            if not match: continue
+            for name, value in zip(fields, match.groups()):
+                if name:
+                    try: self._values[name] = float(value)
+                    except ValueError: pass
+            return self._emit() if fields[-1] == _BLOCK_END else None
+        return None
+
+    def flush(self):
+        """A partial block left at the end of the output"""
+        return self._emit()
@@ -0,0 +1,357 @@
+"""
+Display-free sampling of the host's streaming metrics
+"""
+
+import re
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+from utils.i18n import _
+from host.sunshine_async import AsyncSunshineAPI, SunshineAPILoop
+from host.sunshine_manager import DEFAULT_PORT, sunshine_ports
+from utils.latency_probe import LatencyProber
+from utils.sock_diag import query_sockets
+from utils.guest_bandwidth import GuestBandwidthMeter
+from utils.resolver import get_resolver
+from utils.proc_stats import ProcessSampler
+
+# Devices that stop answering (no API, socket or ping) are forgotten after this (s)
+DEVICE_TIMEOUT = 30.0
+
+
+class MetricsSample(NamedTuple):
+    """One collection cycle; measured values only, 0 = not measured."""
+    timestamp: float
+    latency: float
+    fps: float
+    bandwidth: float
+    # [{'ip', 'name', 'latency', 'id'[, 'tx_mbps', 'rx_mbps']}], name is "Name (ip)", latency None = not measured
+    sessions: list
+    # Guests seen by the API or the sockets this cycle (the rest only answer pings)
+    active: int
+    device_latencies: dict
+    device_bandwidth: dict
+    # {'host' | group: ResourceUsage}, see ProcessSampler
+    resources: dict
+    # Where bandwidth comes from: 'api', 'conntrack' (sum of the guests) or None (not measured)
+    bandwidth_source: str = None
+    # False when conntrack is not readable: no per-guest bandwidth at all
+    guest_bandwidth_available: bool = True
+
+    def to_dict(self) -> dict:
+        return {
+            'timestamp': round(self.timestamp, 3), 'latency_ms': self.latency, 'fps': self.fps,
+            'bandwidth_mbps': self.bandwidth, 'bandwidth_source': self.bandwidth_source,
+            'guest_bandwidth_available': self.guest_bandwidth_available, 'active_sessions': self.active,
+            'guests': [{'ip': s['ip'], 'name': s['name'].split(' (')[0], 'session_id': s.get('id'),
+                        'latency_ms': s['latency'], 'tx_mbps': s.get('tx_mbps'), 'rx_mbps': s.get('rx_mbps')}
+                       for s in self.sessions],
+            'resources': {name: {k: round(v, 2) if isinstance(v, float) else v for k, v in r._asdict().items() if v is not None}
+                          for name, r in self.resources.items()},
+        }
+
+
+class MetricsCollector:
+    """
+    Sunshine API stats and sessions, socket detection, pings and per-guest
+    bandwidth merged into one sample per call.
+
+    Guests are remembered between calls (names, last latency) and dropped
+    after DEVICE_TIMEOUT without any sign of life. Used by the performance
+    monitor and by the headless `big-remote-play monitor`; nothing here
+    needs a display. on_update_needed, when set, is called from another
+    thread when collecting again early would show something new (a
+    hostname was resolved). With a Sunshine host, its process tree (and
+    any group added to processes) is sampled for CPU, memory, I/O and GPU.
+    """
+
+    def __init__(self, sunshine=None, auth=None):
+        self.sunshine = sunshine
+        self.on_update_needed = None
+        # Fixed credentials; read from sunshine.conf on every cycle otherwise
+        self._auth = auth
+        # Key: IP, Value: {'ip', 'name', 'last_seen', 'status'[, 'last_latency']}
+        self.known_devices = {}
+        self._api_loop = None
+        # (host, port, ssl_context) _api_loop was built for
+        self._api_target = None
+        # One deadline for all guests per cycle
+        self._prober = LatencyProber(timeout=1.0)
+        # Per-guest TX/RX between cycles
+        self._bw_meter = GuestBandwidthMeter()
+        self.processes = None
+        if sunshine:
+            self.processes = ProcessSampler()
+            self.processes.track('sunshine', self._sunshine_pids)
+
+    def get_auth(self):
+        if self._auth: return self._auth
+        try:
+            paths = [
+                self.sunshine.conf.path if self.sunshine else Path.home() / '.config' / 'big-remoteplay' / 'sunshine' / 'sunshine.conf',
+                Path.home() / '.config' / 'sunshine' / 'sunshine.conf',
+                Path('/etc') / 'sunshine' / 'sunshine.conf'
+            ]
+            for p in paths:
+                if p.exists():
+                    user, pw = "", ""
+                    with open(p, 'r') as f:
+                        content = f.read()
+                        user_match = re.search(r'^sunshine_user\s*=\s*(.+)', content, re.MULTILINE)
+                        pw_match = re.search(r'^sunshine_password\s*=\s*(.+)', content, re.MULTILINE)
+                        if user_match: user = user_match.group(1).strip()
+                        if pw_match: pw = pw_match.group(1).strip()
+                    if user and pw: return (user, pw)
+        except Exception:
+            pass
+        return None
+
+    def _sunshine_pids(self):
+        pid = self.sunshine.pid
+        if pid is None:
+            # Not started by this process: the PID file of a running instance
+            try: pid = int((self.sunshine.config_dir / 'sunshine.pid').read_text().strip())
+            except (OSError, ValueError): return []
+        return [pid]
+
+    def cancel(self):
+        """Aborts in-flight API requests instead of waiting for their timeout"""
+        if self._api_loop: self._api_loop.cancel()
+
+    def close(self):
+        if self._api_loop:
+            self._api_loop.close()
+            self._api_loop = None
+
+    def _fetch_api_data(self, auth):
+        """Fetches stats and sessions concurrently, bounded by one timeout"""
+        api = self.sunshine.api
+        target = (api.host, api.port, api.ssl_context)
+        if target != self._api_target:
+            # The port follows sunshine.conf (SunshineHost._sync_port)
+            self.close()
+        if self._api_loop is None:
+            self._api_loop = SunshineAPILoop(AsyncSunshineAPI(api.host, api.port, ssl_context=api.ssl_context))
+            self._api_target = target
+        return self._api_loop.run(self._api_loop.api.fetch_stats_and_sessions(auth, timeout=2.0), default=({}, []))
+
+    def _resolve_hostname(self, ip):
+        """Cached hostname or None; never blocks the cycle (the name shows up once resolved)"""
+        if not ip or ip in ['0.0.0.0']: return None
+        if ip in ['127.0.0.1', '::1', 'localhost']: return "Localhost"
+        return get_resolver().lookup(ip, self._on_hostname_resolved)
+
+    def _on_hostname_resolved(self, ip, name):
+        callback = self.on_update_needed
+        if name and callback: callback()
+
+    def _ping_hosts(self, ips):
+        """RTT in ms for every IP at once ({ip: ms}, None when not measured)"""
+        # Skip placeholders, loopback is allowed for local testing
+        targets = [ip for ip in ips if ip and ip not in ('Unknown IP', '0.0.0.0')]
+        return self._prober.probe(targets) if targets else {}
+
+    def sunshine_ports(self):
+        return set(sunshine_ports(self.sunshine.port if self.sunshine else DEFAULT_PORT).values())
+
+    def _detect_sessions_via_sockets(self, sockets=None):
+        """Retorna um Dicionário {ip: dados} para facilitar busca"""
+        found_sessions = {}
+        try:
+            # Kernel-side port filter, IPv4 and IPv6, no fork
+            if sockets is None: sockets = query_sockets(self.sunshine_ports())
+            for sock in sockets:
+                ip = sock.remote_ip
+                # Allow localhost for testing (127.0.0.1)
+                if not ip or ip in ('0.0.0.0', '::'): continue
+                data = found_sessions.get(ip)
+                if data is None:
+                    data = found_sessions[ip] = {'ip': ip, 'name': _('Guest'), 'latency': 0, 'fps': 60,
+                                                 'ports': [], 'bytes_sent': 0, 'bytes_received': 0}
+                data['ports'].append(sock.local_port)
+                data['bytes_sent'] += sock.bytes_sent
+                data['bytes_received'] += sock.bytes_received
+        except Exception:
+            pass
+        return found_sessions
+
+    def collect(self) -> MetricsSample:
+        auth = self.get_auth()
+        api_stats = {}
+        api_sessions_list = []
+
+        # 1. Tentar pegar dados oficiais da API
+        if self.sunshine:
+            try:
+                api_stats, api_sessions_list = self._fetch_api_data(auth)
+            except Exception:
+                pass
+
+        def safe_float(v):
+            try: return float(v)
+            except: return 0.0
+
+        # Métricas Globais
+        latency_avg = safe_float(api_stats.get('average_latency', 0))
+        fps = safe_float(api_stats.get('fps', 0))
+        bandwidth = safe_float(api_stats.get('bitrate', 0)) / 1000.0
+
+        # 2. Pegar dados dos sockets (kernel, sock_diag)
+        ports = self.sunshine_ports()
+        try: sockets = query_sockets(ports)
+        except Exception: sockets = []
+        ss_sessions_dict = self._detect_sessions_via_sockets(sockets)
+
+        # Banda por convidado (conntrack; sem acesso a ele não há, os sockets só veem o TCP de controle)
+        self._bw_meter.ports = ports
+        guest_bandwidth = self._bw_meter.sample()
+
+        # 3. Mesclar API com SS para garantir IPs
+        # Normalizar lista da API
+        normalized_api_sessions = []
+        if api_sessions_list:
+            for s in api_sessions_list:
+                if not isinstance(s, dict): continue
+                # Normalizar chaves
+                s_ip = s.get('ip') or s.get('clientAddress') or ''
+                s_name = s.get('name') or s.get('clientName') or _('Guest')
+
+                # Se API não tem IP, tenta achar no SS
+                if not s_ip and ss_sessions_dict:
+                    # Pega o primeiro IP disponível do SS como "chute" se só tiver 1 convidado
+                    if len(ss_sessions_dict) == 1:
+                        s_ip = list(ss_sessions_dict.keys())[0]
+
+                # Try to resolve hostname if name is generic
+                if s_name == _('Guest') or s_name == 'Unknown':
+                     if s_ip:
+                         resolved = self._resolve_hostname(s_ip)
+                         if resolved: s_name = resolved
+
+                normalized_api_sessions.append({'ip': s_ip, 'name': s_name, 'source': 'api', 'id': s.get('id')})
+
+        # Adicionar sessões do SS que não estão na API
+        current_cycle_ips = set()
+
+        # Adicionar da API
+        for s in normalized_api_sessions:
+            if s['ip']: current_cycle_ips.add(s['ip'])
+
+        # Adicionar do SS (se não estiver na API)
+        for ip, data in ss_sessions_dict.items():
+            if ip not in current_cycle_ips:
+                # Resolve hostname for SS sessions too
+                hname = self._resolve_hostname(ip) or _('Guest')
+                normalized_api_sessions.append({'ip': ip, 'name': hname, 'source': 'ss', 'id': None})
+                current_cycle_ips.add(ip)
+
+        # 4. ATUALIZAR LISTA DE DISPOSITIVOS CONHECIDOS (Persistência)
+        # Se um IP apareceu agora, atualizamos o timestamp.
+        # Se não apareceu agora, mantemos ele na lista se ele responder ao ping.
+
+        now = time.time()
+
+        # Inserir novos ou atualizar existentes detectados agora
+        for s in normalized_api_sessions:
+            ip = s['ip']
+            name = s['name']
+            if not ip: continue
+
+            # Se já conhecemos, preservar nome se for "Guest" agora
+            if ip in self.known_devices:
+                if name == _('Guest') and self.known_devices[ip]['name'] != _('Guest'):
+                    name = self.known_devices[ip]['name']
+
+            self.known_devices[ip] = {
+                'ip': ip,
+                'name': name,
+                'last_seen': now,
+                'status': 'active'
+            }
+
+        # 5. PING E LIMPEZA
+        # Vamos iterar sobre TODOS os dispositivos conhecidos, não só os ativos
+        final_display_list = []
+        device_latencies = {}
+        device_bandwidth = {}
+
+        active_sessions_count = 0
+
+        ips_to_remove = []
+
+        # SEMPRE PINGAR para ter dados no gráfico
+        # Todos ao mesmo tempo, um host inalcançável não atrasa o ciclo
+        latencies = self._ping_hosts(list(self.known_devices))
+        session_ids = {s['ip']: s.get('id') for s in reversed(normalized_api_sessions) if s['ip']}
+
+        for ip, data in self.known_devices.items():
+            # Verificar se está "ativo" neste ciclo (veio da API ou SS)
+            is_active_cycle = ip in current_cycle_ips
+
+            lat = latencies.get(ip)
+
+            # Lógica de Persistência:
+            # Se pingou > 0: Mantém na lista como 'Online'
+            # Se pingou 0:
+            #    Se estava ativo no ciclo (API disse que ta lá), mantém (pode ser firewall bloqueando ping)
+            #    Se NÃO estava ativo no ciclo, marca para remoção (timeout)
+
+            if lat:
+                data['last_latency'] = lat
+                data['last_seen'] = now # Renovamos "visto" se ping responde
+            else:
+                # Se falhou ping, usa ultimo conhecido ou None (não medido)
+                lat = data.get('last_latency')
+
+            # Definir nome de exibição
+            display_name = data['name']
+            if ip not in display_name:
+                display_name = f"{display_name} ({ip})"
+
+            # Se não temos sinal de vida (nem API, nem SS, nem Ping) por X tempo, remover
+            if not is_active_cycle and not lat and (now - data['last_seen'] > DEVICE_TIMEOUT):
+                ips_to_remove.append(ip)
+                continue
+
+            session_obj = {
+                'ip': ip,
+                'name': display_name,
+                'latency': lat,
+                'id': session_ids.get(ip)
+            }
+            if ip in guest_bandwidth:
+                session_obj['tx_mbps'], session_obj['rx_mbps'] = guest_bandwidth[ip]
+                device_bandwidth[display_name] = guest_bandwidth[ip]
+
+            if is_active_cycle:
+                active_sessions_count += 1
+
+            final_display_list.append(session_obj)
+
+            # Adicionar ao gráfico se tiver latência
+            if lat:
+                device_latencies[display_name] = lat
+
+        # Limpar antigos
+        for ip in ips_to_remove:
+            del self.known_devices[ip]
+
+        # Calcular médias para linha geral
+        if not latency_avg and device_latencies:
+            latency_avg = sum(device_latencies.values()) / len(device_latencies)
+
+        # Sem bitrate da API: soma do envio medido por convidado
+        bandwidth_source = 'api' if bandwidth else None
+        if bandwidth == 0 and device_bandwidth:
+            bandwidth = sum(tx for tx, _rx in device_bandwidth.values())
+            bandwidth_source = 'conntrack'
+
+        resources = {}
+        if self.processes:
+            try: resources = self.processes.sample()
+            except Exception as e: print(f"Error sampling host resources: {e}")
+
+        return MetricsSample(now, latency_avg, fps, bandwidth, final_display_list, active_sessions_count,
+                             device_latencies, device_bandwidth, resources, bandwidth_source,
+                             guest_bandwidth_available=self._bw_meter.available)
@@ -0,0 +1,162 @@
+"""
+Several isolated Sunshine instances on one host
+"""
+
+import json
+import re
+import socket
+from dataclasses import dataclass, asdict
+from pathlib import Path
+
+from utils.i18n import _
+from host.sunshine_manager import SunshineHost, DEFAULT_PORT
+from host.sunshine_config import SunshineConfigFile
+
+INSTANCES_DIR = Path.home() / '.config' / 'big-remoteplay' / 'instances'
+# sunshine.conf of the default instance, whose base port new instances avoid
+MAIN_CONFIG = Path.home() / '.config' / 'big-remoteplay' / 'sunshine' / 'sunshine.conf'
+# Distance between base ports, an instance uses base-5 .. base+21
+PORT_STEP = 100
+NAME_RE = re.compile(r'^[A-Za-z0-9_-]{1,32}$')
+
+
+@dataclass
+class InstanceSpec:
+    """Persistent description of an extra Sunshine instance."""
+    name: str
+    port: int
+    output_name: str = None
+    adapter_name: str = None
+    encoder: str = None
+
+
+class SunshineInstanceManager:
+    """
+    Creates and tracks extra Sunshine instances next to the default one.
+
+    Each instance has its own config dir (sunshine.conf, state, credentials,
+    certificates, apps, log and PID file), a base port PORT_STEP apart from
+    the others, and can be pinned to an output monitor and encoder adapter,
+    so every guest can get its own display and GPU encoder.
+    """
+
+    def __init__(self, base_dir: Path = None, reserved_ports=None):
+        self.base_dir = Path(base_dir or INSTANCES_DIR)
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        self.index_file = self.base_dir / 'instances.json'
+        # None: the default instance's configured port, read on every allocation
+        self.reserved_ports = None if reserved_ports is None else set(reserved_ports)
+        self.specs = {}
+        self.hosts = {}
+        self.load()
+
+    def load(self):
+        self.specs = {}
+        if self.index_file.exists():
+            try:
+                with open(self.index_file, 'r') as f:
+                    for item in json.load(f):
+                        spec = InstanceSpec(**item)
+                        self.specs[spec.name] = spec
+            except Exception as e:
+                print(f"Error loading Sunshine instances: {e}")
+
+    def save(self):
+        try:
+            with open(self.index_file, 'w') as f:
+                json.dump([asdict(s) for s in self.specs.values()], f, indent=2)
+        except Exception as e:
+            print(f"Error saving Sunshine instances: {e}")
+
+    @staticmethod
+    def main_port() -> int:
+        """Base port the default instance is configured with"""
+        try: return int(SunshineConfigFile(MAIN_CONFIG).get('port', DEFAULT_PORT))
+        except ValueError: return DEFAULT_PORT
+
+    def _next_port(self) -> int:
+        reserved = {self.main_port()} if self.reserved_ports is None else self.reserved_ports
+        used = reserved | {s.port for s in self.specs.values()}
+        port = DEFAULT_PORT + PORT_STEP
+        # Base ports need not be PORT_STEP aligned: keep the whole range clear
+        while any(abs(port - u) < PORT_STEP for u in used):
+            port += PORT_STEP
+        return port
+
+    def create(self, name: str, output_name: str = None, adapter_name: str = None, encoder: str = None) -> tuple[bool, str]:
+        """Registers a new instance and writes its isolated configuration"""
+        if not NAME_RE.match(name or ''):
+            return False, _("Invalid instance name")
+        if name in self.specs:
+            return False, _("Instance already exists")
+        spec = InstanceSpec(name, self._next_port(), output_name, adapter_name, encoder)
+        self.specs[name] = spec
+        if self.configure(name) is None:
+            del self.specs[name]
+            return False, _("Could not write instance configuration")
+        self.save()
+        return True, None
+
+    def remove(self, name: str) -> bool:
+        """Stops an instance and forgets it (its config dir is kept)"""
+        if name not in self.specs: return False
+        self.stop(name)
+        self.hosts.pop(name, None)
+        del self.specs[name]
+        self.save()
+        return True
+
+    def get(self, name: str) -> SunshineHost:
+        """SunshineHost of an instance, None if unknown"""
+        spec = self.specs.get(name)
+        if spec is None: return None
+        host = self.hosts.get(name)
+        if host is None:
+            host = SunshineHost(self.base_dir / name, port=spec.port, name=name)
+            self.hosts[name] = host
+        return host
+
+    def configure(self, name: str, settings: dict = None):
+        """
+        Writes the instance's sunshine.conf: the given settings plus the keys
+        that keep it apart from the other instances. Returns the changed keys.
+        """
+        spec, host = self.specs.get(name), self.get(name)
+        if host is None: return None
+        d = host.config_dir
+        isolated = {
+            'port': spec.port,
+            'sunshine_name': f"{socket.gethostname()} ({name})",
+            # Without these Sunshine shares its state and pairing files in ~/.config/sunshine
+            'file_state': str(d / 'sunshine_state.json'),
+            'credentials_file': str(d / 'sunshine_state.json'),
+            'pkey': str(d / 'pkey.pem'),
+            'cert': str(d / 'cert.pem'),
+            'file_apps': str(d / 'apps.json'),
+            'output_name': spec.output_name,
+            'adapter_name': spec.adapter_name,
+        }
+        if spec.encoder: isolated['encoder'] = spec.encoder
+        return host.configure({**(settings or {}), **isolated})
+
+    def start(self, name: str, settings: dict = None) -> tuple[bool, str]:
+        host = self.get(name)
+        if host is None:
+            return False, _("Unknown instance")
+        if self.configure(name, settings) is None:
+            return False, _("Could not write instance configuration")
+        if not (host.config_dir / 'apps.json').exists():
+            host.update_apps([{"name": "Desktop", "output": "", "cmd": "", "detached": ["sleep infinity"]}])
+        return host.start()
+
+    def stop(self, name: str) -> bool:
+        host = self.hosts.get(name) or self.get(name)
+        return host.stop() if host and host.is_running() else False
+
+    def stop_all(self):
+        for name in list(self.specs):
+            self.stop(name)
+
+    def running(self) -> list:
+        """Names of the instances currently running"""
+        return [n for n in self.specs if self.get(n).is_running()]
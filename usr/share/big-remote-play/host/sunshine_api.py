@@ -0,0 +1,154 @@
+"""
+Persistent HTTPS client for the Sunshine REST API
+"""
+
+import base64
+import http.client
+import json
+import socket
+import ssl
+import threading
+from dataclasses import dataclass
+
+API_HOST = '127.0.0.1' # Avoid IPv6 (::1) issues if Sunshine binds to 0.0.0.0
+API_PORT = 47990
+# Safe to resend when a reused connection fails after the request went out
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS'})
+
+
+def create_ssl_context() -> ssl.SSLContext:
+    """SSL context accepting Sunshine's self-signed certificate"""
+    ctx = ssl.create_default_context()
+    ctx.check_hostname = False
+    ctx.verify_mode = ssl.CERT_NONE
+    # Legacy server support for older Sunshine builds
+    ctx.options |= getattr(ssl, 'OP_LEGACY_SERVER_CONNECT', 0x4)
+    return ctx
+
+
+def basic_auth_header(auth: tuple[str, str]) -> str:
+    u, p = auth
+    return f"Basic {base64.b64encode(f'{u}:{p}'.encode()).decode()}"
+
+
+@dataclass
+class APIResponse:
+    """Fully read response from the Sunshine API."""
+    status: int
+    reason: str
+    body: bytes
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+    def json(self):
+        return json.loads(self.body.decode('utf-8')) if self.body else None
+
+    def text(self) -> str:
+        return self.body.decode('utf-8', errors='replace')
+
+
+class SunshineAPIClient:
+    """
+    Keep-alive HTTPS client shared by every call to the Sunshine API.
+
+    Holds one SSL context, a small pool of idle connections that are reused
+    across requests, and the precomputed Authorization headers, so that
+    periodic polling does not pay a TLS handshake per request.
+    """
+
+    def __init__(self, host: str = API_HOST, port: int = API_PORT, max_idle: int = 4):
+        self.host = host
+        self.port = port
+        self.max_idle = max_idle
+        self.ssl_context = create_ssl_context()
+        self._idle = []
+        self._lock = threading.Lock()
+        self._headers_cache = {}
+
+    @property
+    def base_url(self) -> str:
+        return f"https://{self.host}:{self.port}"
+
+    def _headers(self, auth, has_body: bool) -> dict:
+        key = (auth, has_body)
+        headers = self._headers_cache.get(key)
+        if headers is None:
+            headers = {}
+            if has_body:
+                headers["Content-Type"] = "application/json"
+            if auth:
+                headers["Authorization"] = basic_auth_header(auth)
+            self._headers_cache[key] = headers
+        return headers
+
+    def _acquire(self) -> http.client.HTTPSConnection:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return http.client.HTTPSConnection(self.host, self.port, context=self.ssl_context)
+
+    def _release(self, conn: http.client.HTTPSConnection):
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def request(self, method: str, path: str, payload=None, auth=None, timeout: float = 5.0) -> APIResponse:
+        """
+        Performs a request, reusing an idle connection when possible.
+
+        Raises OSError / http.client.HTTPException on connection failures.
+        HTTP error statuses are returned, not raised.
+        """
+        body = json.dumps(payload).encode('utf-8') if payload is not None else None
+        headers = self._headers(auth, body is not None)
+
+        idempotent = method in IDEMPOTENT_METHODS
+        for attempt in range(2):
+            conn = self._acquire()
+            reused = conn.sock is not None
+            conn.timeout = timeout
+            if reused:
+                conn.sock.settimeout(timeout)
+            sent = False
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                sent = True
+                resp = conn.getresponse()
+                data = resp.read()
+            except socket.timeout:
+                conn.close()
+                raise
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                # The server may have closed an idle keep-alive connection, retry once on a fresh one;
+                # a sent POST may already have been applied, so it is only retried if sending failed
+                if reused and attempt == 0 and (idempotent or not sent):
+                    continue
+                raise
+
+            if resp.will_close:
+                conn.close()
+            else:
+                self._release(conn)
+            return APIResponse(resp.status, resp.reason, data)
+
+    def get(self, path: str, auth=None, timeout: float = 2.0) -> APIResponse:
+        return self.request('GET', path, auth=auth, timeout=timeout)
+
+    def post(self, path: str, payload=None, auth=None, timeout: float = 5.0) -> APIResponse:
+        return self.request('POST', path, payload=payload, auth=auth, timeout=timeout)
+
+    def delete(self, path: str, auth=None, timeout: float = 5.0) -> APIResponse:
+        return self.request('DELETE', path, auth=auth, timeout=timeout)
+
+    def close(self):
+        """Closes all idle connections"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            try: conn.close()
+            except: pass
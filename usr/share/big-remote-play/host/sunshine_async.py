@@ -0,0 +1,207 @@
+"""
+Asyncio client for the Sunshine REST API
+"""
+
+import asyncio
+import threading
+
+from host.sunshine_api import API_HOST, API_PORT, APIResponse, basic_auth_header, create_ssl_context
+
+SESSIONS_ENDPOINTS = ('/api/sessions', '/api/clients/list')
+
+
+class _Connection:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    def close(self):
+        try: self.writer.close()
+        except: pass
+
+
+class AsyncSunshineAPI:
+    """
+    Asyncio Sunshine API client.
+
+    Requests run concurrently on keep-alive connections and can be
+    cancelled. The sessions endpoint that the running Sunshine version
+    answers is remembered, so the 404 fallback is paid only once.
+    """
+
+    def __init__(self, host: str = API_HOST, port: int = API_PORT, ssl_context=None, max_idle: int = 4):
+        self.host = host
+        self.port = port
+        self.max_idle = max_idle
+        self.ssl_context = ssl_context or create_ssl_context()
+        self.sessions_endpoint = None
+        self._idle = []
+
+    async def _acquire(self) -> tuple[_Connection, bool]:
+        while self._idle:
+            conn = self._idle.pop()
+            if not conn.reader.at_eof() and not conn.writer.is_closing():
+                return conn, True
+            conn.close()
+        reader, writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl_context)
+        return _Connection(reader, writer), False
+
+    def _release(self, conn: _Connection):
+        if len(self._idle) < self.max_idle:
+            self._idle.append(conn)
+        else:
+            conn.close()
+
+    async def _read_body(self, reader, headers: dict) -> bytes:
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b';', 1)[0].strip() or b'0', 16)
+                if size == 0:
+                    # Trailer section ends with an empty line
+                    while (await reader.readline()) not in (b'\r\n', b'\n', b''): pass
+                    return b''.join(chunks)
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+        if 'content-length' in headers:
+            return await reader.readexactly(int(headers['content-length']))
+        return await reader.read()
+
+    async def request(self, method: str, path: str, auth=None) -> APIResponse:
+        """Performs a request. Cancelling the caller drops the connection."""
+        request_headers = {
+            'Host': f"{self.host}:{self.port}",
+            'Connection': 'keep-alive',
+            'Content-Length': '0',
+        }
+        if auth:
+            request_headers['Authorization'] = basic_auth_header(auth)
+        head = f"{method} {path} HTTP/1.1\r\n" + ''.join(f"{k}: {v}\r\n" for k, v in request_headers.items()) + "\r\n"
+
+        for attempt in range(2):
+            conn, reused = await self._acquire()
+            try:
+                conn.writer.write(head.encode('latin-1'))
+                await conn.writer.drain()
+                status_line = await conn.reader.readline()
+                if not status_line:
+                    raise ConnectionResetError("Connection closed by Sunshine")
+                _version, status, *reason = status_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = await conn.reader.readline()
+                    if line in (b'\r\n', b'\n', b''): break
+                    k, _sep, v = line.decode('latin-1').partition(':')
+                    headers[k.strip().lower()] = v.strip()
+                body = await self._read_body(conn.reader, headers)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                conn.close()
+                # Stale keep-alive connection, retry once on a fresh one
+                if reused and attempt == 0: continue
+                raise
+            except BaseException:
+                conn.close()
+                raise
+
+            if headers.get('connection', '').lower() == 'close':
+                conn.close()
+            else:
+                self._release(conn)
+            return APIResponse(int(status), reason[0].strip() if reason else '', body)
+
+    async def get_performance_stats(self, auth=None) -> dict:
+        """Fetches performance stats"""
+        try:
+            r = await self.request('GET', '/api/stats', auth=auth)
+            if r.status != 200: return {}
+            data = r.json()
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    async def get_active_sessions(self, auth=None) -> list:
+        """Fetches active sessions, remembering which endpoint this Sunshine supports"""
+        candidates = [self.sessions_endpoint] if self.sessions_endpoint else list(SESSIONS_ENDPOINTS)
+        try:
+            for path in candidates:
+                r = await self.request('GET', path, auth=auth)
+                if r.status == 404:
+                    # Sunshine may have been upgraded/downgraded, probe again next time
+                    self.sessions_endpoint = None
+                    continue
+                if r.status != 200: return []
+                self.sessions_endpoint = path
+                data = r.json()
+                if path == '/api/clients/list' and isinstance(data, dict):
+                    # In older versions, connected clients are in 'clients' and have a 'connected' flag
+                    return [c for c in data.get('clients', []) if c.get('connected')]
+                # Handle different Sunshine versions response format
+                if isinstance(data, dict): return data.get('sessions', [])
+                return data if isinstance(data, list) else []
+        except (OSError, ValueError):
+            pass
+        return []
+
+    async def fetch_stats_and_sessions(self, auth=None, timeout: float = 2.0) -> tuple[dict, list]:
+        """
+        Fetches stats and sessions concurrently.
+
+        The whole call is bounded by a single timeout; whatever has not
+        finished by then is cancelled and reported as empty.
+        """
+        stats_task = asyncio.ensure_future(self.get_performance_stats(auth))
+        sessions_task = asyncio.ensure_future(self.get_active_sessions(auth))
+        done, pending = await asyncio.wait((stats_task, sessions_task), timeout=timeout)
+        for t in pending:
+            t.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        stats = stats_task.result() if stats_task in done and not stats_task.exception() else {}
+        sessions = sessions_task.result() if sessions_task in done and not sessions_task.exception() else []
+        return stats, sessions
+
+    async def aclose(self):
+        """Closes idle connections"""
+        idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+class SunshineAPILoop:
+    """
+    Runs AsyncSunshineAPI coroutines on a private event loop owned by a
+    worker thread. cancel() may be called from any thread.
+    """
+
+    def __init__(self, api: AsyncSunshineAPI):
+        self.api = api
+        self._loop = None
+        self._task = None
+        self._lock = threading.Lock()
+
+    def run(self, coro, default=None):
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+        with self._lock:
+            self._task = self._loop.create_task(coro)
+        try:
+            return self._loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            return default
+        finally:
+            with self._lock:
+                self._task = None
+
+    def cancel(self):
+        with self._lock:
+            if self._task and self._loop:
+                self._loop.call_soon_threadsafe(self._task.cancel)
+
+    def close(self):
+        """Must be called from the thread that used run()"""
+        if self._loop is None: return
+        try:
+            self._loop.run_until_complete(self.api.aclose())
+            self._loop.close()
+        except: pass
+        self._loop = None
@@ -0,0 +1,159 @@
+"""
+Transactional access to sunshine.conf
+"""
+
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+
+class SunshineConfigFile:
+    """
+    sunshine.conf with batched, diff-aware and atomic writes.
+
+    Only the lines of keys whose value changed are rewritten (comments and
+    ordering are kept), the file is replaced through a temporary file plus
+    rename, and nothing is written when no value changed. Every write
+    returns the set of changed keys so callers can decide whether Sunshine
+    needs a restart.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lines = []
+        self._values = {}
+        self._mtime = None
+        self._batch_depth = 0
+        self._batch_changed = set()
+        self._lock = threading.RLock()
+        self.load()
+
+    def load(self) -> dict:
+        """(Re)reads the file"""
+        with self._lock:
+            self._lines, self._values = [], {}
+            try:
+                st = self.path.stat()
+                with open(self.path, 'r') as f:
+                    self._lines = f.read().splitlines()
+                self._mtime = st.st_mtime_ns
+            except FileNotFoundError:
+                self._mtime = None
+            except Exception as e:
+                print(f"Error loading Sunshine config: {e}")
+            for line in self._lines:
+                key, value = self._parse(line)
+                if key is not None:
+                    self._values[key] = value
+            return dict(self._values)
+
+    @staticmethod
+    def _parse(line: str):
+        s = line.strip()
+        if not s or s.startswith('#') or '=' not in s: return None, None
+        k, v = s.split('=', 1)
+        return k.strip(), v.strip()
+
+    def _reload_if_changed(self):
+        # Pick up edits made by other writers (web UI, other managers) before merging ours
+        try:
+            mtime = self.path.stat().st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime != self._mtime and self._batch_depth == 0:
+            self.load()
+
+    def values(self) -> dict:
+        with self._lock:
+            self._reload_if_changed()
+            return dict(self._values)
+
+    def get(self, key, default=None):
+        with self._lock:
+            self._reload_if_changed()
+            return self._values.get(key, default)
+
+    def update(self, settings: dict) -> set:
+        """
+        Applies settings (None removes a key). Writes once, only if something
+        changed, unless inside transaction(). Returns the changed keys.
+        """
+        with self._lock:
+            self._reload_if_changed()
+            changed = set()
+            for key, value in settings.items():
+                if value is None:
+                    if key in self._values:
+                        del self._values[key]
+                        self._lines = [l for l in self._lines if self._parse(l)[0] != key]
+                        changed.add(key)
+                    continue
+                value = str(value)
+                if self._values.get(key) == value: continue
+                new_line = f"{key} = {value}"
+                if key in self._values:
+                    self._lines = [new_line if self._parse(l)[0] == key else l for l in self._lines]
+                else:
+                    self._lines.append(new_line)
+                self._values[key] = value
+                changed.add(key)
+
+            if self._batch_depth:
+                self._batch_changed |= changed
+            elif changed:
+                self._write()
+            return changed
+
+    def set(self, key, value) -> set:
+        return self.update({key: value})
+
+    @contextmanager
+    def transaction(self):
+        """
+        Groups updates into a single write at the end.
+
+            with conf.transaction() as changed:
+                conf.set(...)
+            # changed now holds every key modified in the block
+
+        If the block raises, its updates are undone and nothing is written.
+        """
+        changed = set()
+        with self._lock:
+            if self._batch_depth == 0:
+                self._reload_if_changed()
+                self._batch_changed = set()
+            # Nested blocks roll back only their own updates
+            saved = (list(self._lines), dict(self._values), set(self._batch_changed))
+            self._batch_depth += 1
+            try:
+                yield changed
+            except BaseException:
+                self._lines, self._values, self._batch_changed = saved
+                raise
+            finally:
+                self._batch_depth -= 1
+            if self._batch_depth == 0:
+                batch, self._batch_changed = self._batch_changed, set()
+                if batch:
+                    self._write()
+                changed |= batch
+
+    def _write(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix='.sunshine.conf.', dir=str(self.path.parent))
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write('\n'.join(self._lines) + ('\n' if self._lines else ''))
+                f.flush()
+                os.fsync(f.fileno())
+            try: os.chmod(tmp, self.path.stat().st_mode & 0o777)
+            except OSError: os.chmod(tmp, 0o600)
+            os.replace(tmp, self.path)
+            self._mtime = self.path.stat().st_mtime_ns
+        except BaseException:
+            try: os.unlink(tmp)
+            except OSError: pass
+            raise
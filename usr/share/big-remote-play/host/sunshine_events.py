@@ -0,0 +1,134 @@
+"""
+Typed events parsed from the Sunshine log
+"""
+
+import re
+import threading
+import time
+from dataclasses import dataclass
+
+SESSION_STARTED = 'session-started'
+SESSION_ENDED = 'session-ended'
+CLIENT_CONNECTED = 'client-connected'
+CLIENT_DISCONNECTED = 'client-disconnected'
+ENCODER_INITIALIZED = 'encoder-initialized'
+STREAM_STARTED = 'stream-started'
+STREAM_STOPPED = 'stream-stopped'
+ERROR = 'error'
+
+# "[2024-05-01 12:00:00.123]: Info: message" (older builds use "2024:05:01:12:00:00")
+LINE_RE = re.compile(r'^\[(?P<ts>[^\]]*)\]:\s*(?P<level>[A-Za-z]+):\s*(?P<msg>.*)$')
+IP_RE = re.compile(r'\[?((?:\d{1,3}\.){3}\d{1,3}|[0-9a-fA-F]*:[0-9a-fA-F:]+(?:%\w+)?)\]?')
+ACTIVE_SESSIONS_RE = re.compile(r'active sessions:\s*(\d+)', re.IGNORECASE)
+ENCODER_RE = re.compile(r'Found (?P<codec>[\w.]+) encoder:\s*(?P<name>\S+)\s*\[(?P<api>\w+)\]', re.IGNORECASE)
+
+# (event kind, lowercase message fragment) checked in order
+MESSAGE_PATTERNS = (
+    (SESSION_STARTED, 'new streaming session started'),
+    (SESSION_ENDED, 'streaming session ended'),
+    (CLIENT_CONNECTED, 'client connected'),
+    (CLIENT_DISCONNECTED, 'client disconnected'),
+    (STREAM_STARTED, 'executing ['),
+    (STREAM_STOPPED, 'process terminated'),
+)
+
+# Lines carrying only the peer address right before a connect/start message
+PEER_ADDRESS_HINTS = ('peer address', 'client address', 'new session')
+
+
+@dataclass
+class SunshineEvent:
+    """Single event from the Sunshine log."""
+    kind: str
+    timestamp: float
+    client_ip: str = None
+    detail: str = ""
+    active_sessions: int = None
+
+
+def _find_ip(msg: str):
+    for m in IP_RE.finditer(msg):
+        ip = m.group(1)
+        # IPv6 needs "::" or a full 8-group form, so "12:00:00" is not taken for one
+        if '.' in ip or '::' in ip or ip.count(':') >= 7:
+            if ip not in ('0.0.0.0', '::'): return ip
+    return None
+
+
+class SunshineEventStream:
+    """
+    Turns new sunshine.log lines into SunshineEvent objects.
+
+    Subscribes to a LogTailer on first use. Callbacks run on the tail
+    thread; UI consumers should hop to the main loop with GLib.idle_add.
+    """
+
+    def __init__(self, tailer):
+        self.tailer = tailer
+        self.active_sessions = 0
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._unsubscribe_tail = None
+        self._last_ip = None
+        self._last_ip_time = 0.0
+
+    def subscribe(self, callback):
+        """Registers callback(event). Returns a function that unsubscribes it."""
+        with self._lock:
+            self._subscribers.append(callback)
+            if self._unsubscribe_tail is None:
+                self._unsubscribe_tail = self.tailer.subscribe(self._on_lines)
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers: self._subscribers.remove(callback)
+                if not self._subscribers and self._unsubscribe_tail:
+                    self._unsubscribe_tail()
+                    self._unsubscribe_tail = None
+        return unsubscribe
+
+    def parse_line(self, line: str):
+        """Returns a SunshineEvent for a log line, or None"""
+        m = LINE_RE.match(line.strip())
+        if not m: return None
+        level, msg = m.group('level').lower(), m.group('msg')
+        lower = msg.lower()
+        now = time.time()
+
+        ip = _find_ip(msg)
+        if ip and any(h in lower for h in PEER_ADDRESS_HINTS):
+            self._last_ip, self._last_ip_time = ip, now
+
+        if level in ('error', 'fatal'):
+            return SunshineEvent(ERROR, now, ip, msg)
+
+        enc = ENCODER_RE.search(msg)
+        if enc:
+            return SunshineEvent(ENCODER_INITIALIZED, now, None, f"{enc.group('codec')}: {enc.group('name')} [{enc.group('api')}]")
+
+        for kind, fragment in MESSAGE_PATTERNS:
+            if fragment in lower:
+                # Most connect messages don't carry the address, use one seen just before
+                if not ip and self._last_ip and now - self._last_ip_time < 10:
+                    ip = self._last_ip
+                count = ACTIVE_SESSIONS_RE.search(msg)
+                count = int(count.group(1)) if count else None
+                # The count Sunshine logs wins; otherwise only the start/end pair moves it,
+                # a teardown often logs both "session ended" and "client disconnected"
+                if count is not None:
+                    self.active_sessions = count
+                elif kind == SESSION_STARTED:
+                    self.active_sessions += 1
+                elif kind == SESSION_ENDED:
+                    self.active_sessions = max(0, self.active_sessions - 1)
+                return SunshineEvent(kind, now, ip, msg, self.active_sessions)
+        return None
+
+    def _on_lines(self, lines):
+        events = [e for e in (self.parse_line(l) for l in lines) if e]
+        if not events: return
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for e in events:
+            for cb in subscribers:
+                try: cb(e)
+                except Exception as ex: print(f"Sunshine event subscriber error: {ex}")
@@ -0,0 +1,165 @@
+"""
+Bounded sunshine.log with rotation and an incremental tail reader
+"""
+
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+
+
+class SunshineLog:
+    """
+    Rotates sunshine.log by size and age.
+
+    Before Sunshine starts the file is rotated by renaming. While Sunshine
+    holds it open (append mode) it is rotated by copy + truncate, so the
+    running process keeps writing to the same descriptor.
+    """
+
+    def __init__(self, path: Path, max_bytes: int = 10 * 1024 * 1024, max_age: float = 7 * 24 * 3600, backups: int = 3):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.backups = backups
+        self._since = time.time()
+
+    def _backup(self, n: int) -> Path:
+        return self.path.with_name(f"{self.path.name}.{n}")
+
+    def _shift_backups(self):
+        oldest = self._backup(self.backups)
+        if oldest.exists(): oldest.unlink()
+        for n in range(self.backups - 1, 0, -1):
+            if self._backup(n).exists():
+                self._backup(n).rename(self._backup(n + 1))
+
+    def needs_rotation(self) -> bool:
+        try:
+            st = self.path.stat()
+        except OSError:
+            return False
+        if st.st_size == 0: return False
+        if st.st_size >= self.max_bytes: return True
+        # Age counts from our last rotation, or from the last write for a file left by a previous run
+        return time.time() - min(self._since, st.st_mtime) >= self.max_age
+
+    def open(self):
+        """Rotates if needed and opens the log for a new Sunshine process"""
+        try:
+            if self.needs_rotation():
+                self._shift_backups()
+                self.path.rename(self._backup(1))
+        except OSError as e:
+            print(f"Error rotating Sunshine log: {e}")
+        self._since = time.time()
+        return open(self.path, 'a')
+
+    def maybe_rotate(self) -> bool:
+        """Rotates the log of a running process (copy + truncate)"""
+        if not self.needs_rotation(): return False
+        try:
+            self._shift_backups()
+            shutil.copyfile(self.path, self._backup(1))
+            os.truncate(self.path, 0)
+        except OSError as e:
+            print(f"Error rotating Sunshine log: {e}")
+            return False
+        self._since = time.time()
+        return True
+
+
+class LogTailer:
+    """
+    Incremental reader for a growing log file.
+
+    Starts at the current end of the file and hands only the newly appended
+    lines to subscribers, from a polling thread. Truncation or replacement
+    of the file (rotation) restarts reading from its beginning.
+    """
+
+    def __init__(self, path: Path, interval: float = 0.25, on_poll=None):
+        self.path = Path(path)
+        self.interval = interval
+        self.on_poll = on_poll
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._offset = None
+        self._inode = None
+        self._pending = b""
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    def subscribe(self, callback):
+        """
+        Registers callback(lines) called from the tail thread with new
+        complete lines, while the tail runs (start()/stop(), driven by the
+        Sunshine process). Returns a function that unsubscribes it.
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers: self._subscribers.remove(callback)
+        return unsubscribe
+
+    def seek_end(self):
+        """Skips everything written so far"""
+        with self._lock:
+            try:
+                st = self.path.stat()
+                self._offset, self._inode = st.st_size, st.st_ino
+            except OSError:
+                self._offset, self._inode = 0, None
+            self._pending = b""
+
+    def start(self):
+        if self._thread and self._thread.is_alive() and not self._stop_event.is_set(): return
+        if self._offset is None: self.seek_end()
+        # Fresh event per thread, a thread still winding down keeps its own
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(self._stop_event,), name="SunshineLogTail", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _run(self, stop_event):
+        while not stop_event.wait(self.interval):
+            self.poll()
+            # Runs after reading so a rotation doesn't drop unread lines
+            if self.on_poll:
+                try: self.on_poll()
+                except Exception: pass
+
+    def poll(self) -> list:
+        """Reads new bytes and dispatches complete lines. Returns them too."""
+        with self._lock:
+            try:
+                st = self.path.stat()
+            except OSError:
+                return []
+            if self._offset is None:
+                self._offset, self._inode = st.st_size, st.st_ino
+            if st.st_ino != self._inode or st.st_size < self._offset:
+                # Rotated or truncated
+                self._offset, self._inode, self._pending = 0, st.st_ino, b""
+            if st.st_size == self._offset:
+                return []
+            try:
+                with open(self.path, 'rb') as f:
+                    f.seek(self._offset)
+                    chunk = f.read(st.st_size - self._offset)
+            except OSError:
+                return []
+            self._offset += len(chunk)
+            parts = (self._pending + chunk).split(b'\n')
+            self._pending = parts.pop()
+            lines = [p.decode('utf-8', errors='replace').rstrip('\r') for p in parts]
+            subscribers = list(self._subscribers)
+
+        for cb in subscribers:
+            try: cb(lines)
+            except Exception as e: print(f"Log subscriber error: {e}")
+        return lines
@@ -1,14 +1,94 @@
-import subprocess, signal, os, shutil
+import subprocess, signal, os, shutil, socket, threading, time
 from pathlib import Path
 from utils.i18n import _
+from host.sunshine_api import SunshineAPIClient
+from host.supervisor import SunshineSupervisor
+from host.sunshine_log import SunshineLog, LogTailer
+from host.sunshine_events import SunshineEventStream
+from host.sunshine_config import SunshineConfigFile
+from host.sunshine_events import SESSION_ENDED, CLIENT_DISCONNECTED
+from utils.sock_diag import query_sockets, TCP_LISTEN
+
+try:
+    from gi.repository import GLib
+except ImportError:
+    GLib = None
+
+# Log lines meaning Sunshine can't run (dynamic linker failures)
+STARTUP_ERROR_MARKERS = ("error while loading shared libraries", "symbol lookup error")
+# Lowercase log fragments printed once Sunshine is serving
+READY_LOG_MARKERS = ("configuration ui available at", "listening on port")
+
+# Base 'port' of sunshine.conf; every other port is derived from it
+DEFAULT_PORT = 47989
+
+def sunshine_ports(base: int = DEFAULT_PORT) -> dict:
+    """Ports used by a Sunshine instance with the given base port"""
+    return {
+        'https': base - 5, 'http': base, 'web': base + 1,
+        'video': base + 9, 'control': base + 10, 'audio': base + 11,
+        'mic': base + 13, 'rtsp': base + 21,
+    }
+
+# sunshine.conf has no runtime reload (neither signal nor API): keys only read
+# by this app need nothing, every other key needs a restart, deferred until the
+# current sessions end
+LIVE_CONFIG_KEYS = frozenset({'sunshine_user', 'sunshine_password'})
+# Stream defaults: the client asks for its FPS and bitrate at every launch, so
+# the next session uses the new values without a restart
+SESSION_CONFIG_KEYS = frozenset({'fps', 'bitrate'})
+
 class SunshineHost:
-    def __init__(self, cdir: Path = None):
+    def __init__(self, cdir: Path = None, port: int = None, name: str = None):
+        """
+        Args:
+            cdir: Config dir of this instance (sunshine.conf, PID file, log)
+            port: Base port, defaults to the one in sunshine.conf
+            name: Instance name, None for the default instance
+        """
         self.config_dir = cdir or (Path.home() / '.config' / 'big-remoteplay' / 'sunshine')
         self.config_dir.mkdir(parents=True, exist_ok=True)
+        self.name = name
         self.process = None
         self.pid = None
+        # sunshine.conf with atomic, diff-aware writes
+        self.conf = SunshineConfigFile(self.config_dir / 'sunshine.conf')
+        try: self.port = int(port or self.conf.get('port', DEFAULT_PORT))
+        except ValueError: self.port = DEFAULT_PORT
+        # Shared keep-alive API client (one SSL context, pooled connections)
+        self.api = SunshineAPIClient(port=sunshine_ports(self.port)['web'])
+        # Deadline for start() readiness and last measured time-to-ready (seconds)
+        self.startup_timeout = 5.0
+        self.startup_time = None
+        # Push-based exit detection and optional crash restart
+        self.supervisor = SunshineSupervisor(self)
+        # Bounded log; subscribe to log_tailer to receive new lines
+        self.log = SunshineLog(self.config_dir / 'sunshine.log')
+        self.log_tailer = LogTailer(self.log.path, on_poll=self._rotate_log)
+        # Typed session/encoder/error events parsed from the log
+        self.events = SunshineEventStream(self.log_tailer)
+        # Keys written while sessions were active, loaded once they end
+        self.pending_restart_keys = set()
+        self._pending_auth = None
+        self._unsubscribe_pending = None
+        self._config_callbacks = []
+        # One restart at a time (apply_config workers, session end)
+        self._apply_lock = threading.Lock()
+        # start/stop come from the main loop, crash restarts and config restarts
+        self._run_lock = threading.RLock()
         
-    def start(self, **kwargs):
+    def start(self, ready_timeout: float = None, **kwargs):
+        """
+        Starts Sunshine and waits until it is ready to accept connections.
+
+        Args:
+            ready_timeout: Maximum seconds to wait for readiness
+                           (defaults to self.startup_timeout)
+        """
+        with self._run_lock:
+            return self._start(ready_timeout)
+
+    def _start(self, ready_timeout):
         if self.is_running():
             return True, "Already running"
             
@@ -47,10 +127,15 @@ class SunshineHost:
                 str(config_file)
             ]
             
+            self._sync_port()
+            # Free the API port if a previous instance is still shutting down
+            self._wait_port_released(timeout=2.0)
+
             # Start process redirecting logs to file
-            log_path = self.config_dir / 'sunshine.log'
-            self.log_file = open(log_path, 'a')
+            self.log_file = self.log.open()
+            self.log_tailer.seek_end()
             
+            started_at = time.monotonic()
             self.process = subprocess.Popen(
                 cmd,
                 text=True,
@@ -63,47 +148,44 @@ class SunshineHost:
             
             self.pid = self.process.pid
             
-            # Check if process died immediately (e.g. library error)
-            try:
-                # Wait a bit to see if startup fails
-                exit_code = self.process.wait(timeout=2.0)
-                
-                # If reached here, process ended (failed)
-                self.log_file.flush()
-                # Try to read the error from the log
-                error_detail = ""
-                try:
-                    with open(log_path, 'r') as f:
-                        lines = f.readlines()
-                        if lines:
-                            # Look for shared library errors in the last 10 lines
-                            for line in lines[-10:]:
-                                if "error while loading shared libraries" in line or "symbol lookup error" in line:
-                                    error_detail = line.strip()
-                                    break
-                except:
-                    pass
+            # Wait until Sunshine is up, fail fast on dying process or library errors
+            timeout = self.startup_timeout if ready_timeout is None else ready_timeout
+            state, detail = self._wait_until_ready(timeout)
 
+            if state in ('exited', 'error'):
+                if state == 'error' and self.process.poll() is None:
+                    try: os.killpg(os.getpgid(self.process.pid), signal.SIGKILL)
+                    except: pass
+                    self.process.wait()
+                exit_code = self.process.returncode
                 self.log_file.write(_("Sunshine failed to start (Exit code {}).\n").format(exit_code))
-                if error_detail:
-                    print(_("Sunshine failed to start: {}").format(error_detail))
+                self.log_file.flush()
+                if detail:
+                    print(_("Sunshine failed to start: {}").format(detail))
                 else:
                     print(_("Sunshine failed to start (Exit code {}). Check logs.").format(exit_code))
                 
                 self.process = None
                 self.pid = None
-                return False, error_detail if error_detail else f"Exit code {exit_code}"
-                
-            except subprocess.TimeoutExpired:
-                # Process continues running after timeout, success!
-                pass            
+                return False, detail if detail else f"Exit code {exit_code}"
+
+            self.startup_time = time.monotonic() - started_at if state == 'ready' else None
+            if self.startup_time is None:
+                print(_("Sunshine not ready after {:.1f}s, continuing").format(timeout))
             
             # Save PID
             pid_file = self.config_dir / 'sunshine.pid'
             with open(pid_file, 'w') as f:
                 f.write(str(self.pid))
+
+            self.supervisor.watch(self.pid, self.process)
+            # A fresh process has no sessions
+            self.events.active_sessions = 0
+            self.log_tailer.start()
                 
             print(_("Sunshine started (PID: {})").format(self.pid))
+            if self.startup_time is not None:
+                print(_("Sunshine ready in {:.2f}s ({})").format(self.startup_time, detail))
             return True, None
             
         except Exception as e:
@@ -111,7 +193,16 @@ class SunshineHost:
             return False, str(e) # Return tuple (success, error_message)
             
     def stop(self) -> bool:
-        """Stops Sunshine server"""
+        """Stops Sunshine server; waits for a restart in progress, then stops it too"""
+        with self._run_lock:
+            return self._stop()
+
+    def _stop(self) -> bool:
+        # Exit from here on is expected, don't restart
+        self.supervisor.unwatch()
+        self.supervisor.cancel_restart()
+        # The next start() loads the whole file anyway
+        self._clear_pending_restart()
         if not self.is_running():
             print(_("Sunshine is not running"))
             return False
@@ -137,10 +228,13 @@ class SunshineHost:
                         os.kill(pid, signal.SIGTERM)
                     except: pass
         
-            # Fallback for orphan processes
-            subprocess.run(['pkill', 'sunshine'], stderr=subprocess.DEVNULL)
+            # Fallback for orphans running this instance's config, other instances are left alone
+            for pid in self._find_instance_pids():
+                try: os.kill(pid, signal.SIGTERM)
+                except OSError: pass
             
             # Close log
+            self.log_tailer.stop()
             if hasattr(self, 'log_file'):
                 try: self.log_file.close()
                 except: pass
@@ -148,21 +242,124 @@ class SunshineHost:
                     
             pid_file = self.config_dir / 'sunshine.pid'
             if pid_file.exists(): pid_file.unlink()
+
+            # Pooled connections point to the dead server
+            self.api.close()
                 
             self.process = None
             self.pid = None
             return True
         except Exception as e:
-            subprocess.run(['pkill', '-9', 'sunshine'], stderr=subprocess.DEVNULL)
+            for pid in self._find_instance_pids():
+                try: os.kill(pid, signal.SIGKILL)
+                except OSError: pass
             return False
             
+    def _sync_port(self):
+        # The base port may have been changed in sunshine.conf since we were created
+        try: port = int(self.conf.get('port', self.port))
+        except ValueError: return
+        if port != self.port:
+            self.port = port
+            self.api.close()
+            self.api.port = sunshine_ports(port)['web']
+
+    def _find_instance_pids(self) -> list:
+        """PIDs of sunshine processes started with this instance's sunshine.conf"""
+        conf_path = str(self.conf.path).encode()
+        pids = []
+        for entry in os.scandir('/proc'):
+            if not entry.name.isdigit(): continue
+            try:
+                with open(f'/proc/{entry.name}/cmdline', 'rb') as f:
+                    argv = f.read().split(b'\0')
+            except OSError:
+                continue
+            if argv and os.path.basename(argv[0]) == b'sunshine' and conf_path in argv[1:]:
+                pids.append(int(entry.name))
+        return pids
+
+    def _api_port_open(self) -> bool:
+        try:
+            with socket.create_connection((self.api.host, self.api.port), timeout=0.1):
+                return True
+        except OSError:
+            return False
+
+    def _owns_api_port(self, pid: int) -> bool:
+        """True when pid holds the socket listening on the API port, not another instance"""
+        try:
+            inodes = {s.inode for s in query_sockets([self.api.port], ('tcp',), 1 << TCP_LISTEN) if s.inode}
+            if not inodes: return False
+            for fd in os.scandir(f'/proc/{pid}/fd'):
+                link = os.readlink(fd.path)
+                if link.startswith('socket:[') and int(link[8:-1]) in inodes:
+                    return True
+        except (OSError, ValueError):
+            pass
+        return False
+
+    def _wait_port_released(self, timeout: float):
+        deadline = time.monotonic() + timeout
+        while self._api_port_open() and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+    def _rotate_log(self):
+        if self.process is not None:
+            self.log.maybe_rotate()
+
+    def _wait_until_ready(self, timeout: float) -> tuple[str, str]:
+        """
+        Polls the new process until it is ready.
+
+        Returns (state, detail) where state is 'ready', 'exited', 'error'
+        (shared library failure found in the log) or 'timeout'.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            exited = self.process.poll() is not None
+            # Only the bytes appended since the last poll are read
+            for line in self.log_tailer.poll():
+                if any(m in line for m in STARTUP_ERROR_MARKERS):
+                    return 'error', line.strip()
+                if any(m in line.lower() for m in READY_LOG_MARKERS):
+                    return 'ready', _("log")
+            if exited:
+                return 'exited', ""
+            if self._owns_api_port(self.process.pid):
+                return 'ready', _("API port")
+            if time.monotonic() >= deadline:
+                return 'timeout', ""
+            time.sleep(0.05)
+
+    def _on_process_exit(self, pid: int):
+        """Called by the supervisor after the watched process exited"""
+        if self.pid != pid: return
+        self.log_tailer.stop()
+        if hasattr(self, 'log_file'):
+            try: self.log_file.close()
+            except: pass
+            del self.log_file
+        pid_file = self.config_dir / 'sunshine.pid'
+        try: pid_file.unlink()
+        except OSError: pass
+        self.api.close()
+        self.process = None
+        self.pid = None
+
     def restart(self) -> bool:
         """Restarts the server"""
-        self.stop()
-        return self.start()
+        with self._run_lock:
+            self.stop()
+            return self.start()
         
     def is_running(self) -> bool:
         """Checks if Sunshine is running"""
+        # Supervised process: answered from the pidfd, no syscalls to spawn anything
+        alive = self.supervisor.is_alive()
+        if alive is not None:
+            return alive
+
         # Check process directly
         if self.process and self.process.poll() is None:
             return True
@@ -176,6 +373,10 @@ class SunshineHost:
                     
                 # Check if process exists
                 os.kill(pid, 0)
+                # Adopt it so later checks and its exit are event-driven
+                if self.supervisor.watch(pid):
+                    self.pid = pid
+                    self.log_tailer.start()
                 return True
                 
             except (OSError, ValueError):
@@ -183,14 +384,10 @@ class SunshineHost:
                 pid_file.unlink()
                 return False
                 
-        # Check via pgrep
+        # Instance started by another run of the app without a PID file
         try:
-            result = subprocess.run(
-                ['pgrep', '-x', 'sunshine'],
-                capture_output=True
-            )
-            return result.returncode == 0
-        except:
+            return bool(self._find_instance_pids())
+        except OSError:
             return False
             
     def get_status(self) -> dict:
@@ -199,6 +396,9 @@ class SunshineHost:
             'running': self.is_running(),
             'pid': self.pid,
             'config_dir': str(self.config_dir),
+            'name': self.name,
+            'port': self.port,
+            'startup_time': self.startup_time,
         }
         
     def update_apps(self, apps_list: list) -> bool:
@@ -229,221 +429,206 @@ class SunshineHost:
             print(f"Error saving apps.json: {e}")
             return False
 
-    def configure(self, settings: dict) -> bool:
+    def configure(self, settings: dict):
         """
         Configures Sunshine
         
         Args:
-            settings: Dictionary with settings
+            settings: Dictionary with settings (None removes a key)
+
+        Returns:
+            Set of keys whose value changed (empty when the file was left
+            untouched), or None on error
         """
         try:
-            config_file = self.config_dir / 'sunshine.conf'
-            
-            # Load existing config
-            current_config = {}
-            if config_file.exists():
-                try:
-                    with open(config_file, 'r') as f:
-                        for line in f:
-                            line = line.strip()
-                            if not line or line.startswith('#'): continue
-                            if '=' in line:
-                                parts = line.split('=', 1)
-                                if len(parts) == 2:
-                                    current_config[parts[0].strip()] = parts[1].strip()
-                except Exception as e:
-                    print(f"Error reading existing config: {e}")
-            
-            # Update with new settings
-            for k, v in settings.items():
-                if v is None:
-                    # Remove key if value is None
-                    if k in current_config:
-                        del current_config[k]
-                else:
-                    current_config[k] = str(v)
- 
-            # Ensure pointing to apps.json
-            if 'apps_file' not in current_config:
-                current_config['apps_file'] = 'apps.json'
-            
-            # Save merged config
-            with open(config_file, 'w') as f:
-                for key, value in current_config.items():
-                    f.write(f"{key} = {value}\n")
-                    
-            return True
+            with self.conf.transaction() as changed:
+                self.conf.update(settings)
+                # Ensure pointing to apps.json
+                if self.conf.get('apps_file') is None:
+                    self.conf.set('apps_file', 'apps.json')
+            return changed
             
         except Exception as e:
             print(f"Error configuring Sunshine: {e}")
+            return None
+
+    @staticmethod
+    def classify_config_keys(keys) -> tuple[set, set]:
+        """Splits sunshine.conf keys into (no restart needed, restart) sets"""
+        keys = set(keys)
+        live = keys & (LIVE_CONFIG_KEYS | SESSION_CONFIG_KEYS)
+        return live, keys - live
+
+    def add_config_applied_callback(self, callback):
+        """
+        Registers callback(keys, success) called after a deferred restart
+        loaded pending keys (on the main loop when GLib is available).
+        Returns a function that unregisters it.
+        """
+        self._config_callbacks.append(callback)
+        def remove():
+            if callback in self._config_callbacks: self._config_callbacks.remove(callback)
+        return remove
+
+    @staticmethod
+    def _on_main_loop(fn, *args):
+        def call():
+            try: fn(*args)
+            except Exception as e: print(f"Sunshine callback error: {e}")
             return False
+        if GLib is not None: GLib.idle_add(call)
+        else: call()
+
+    def active_session_count(self, auth=None) -> int:
+        """Active streaming sessions, from the API and the log (the larger wins); blocking"""
+        count = self.events.active_sessions
+        if auth:
+            count = max(count, len(self.get_active_sessions(auth)))
+        return count
+
+    def apply_config(self, keys, auth=None, on_done=None) -> str:
+        """
+        Loads already written sunshine.conf keys into the running server
+        without dropping sessions: a deferred restart, not a hot reload.
+
+        Returns 'applied' when there is nothing for Sunshine to reload
+        (app-only or per-session keys, or not running). Otherwise returns 'pending': the
+        session check and restart run on a worker thread, which then calls
+        on_done(result) (on the main loop when GLib is available) with:
+            'restarted': Sunshine was idle and has been restarted
+            'deferred':  sessions are active, restart once the last one ends
+                         (see pending_restart_keys and apply_pending())
+            'failed':    the restart failed
+        """
+        _live, restart = self.classify_config_keys(keys)
+        if not restart or not self.is_running():
+            return 'applied'
+
+        self.pending_restart_keys |= restart
+        if auth: self._pending_auth = auth
+        threading.Thread(target=self._apply_config_worker, args=(on_done,), name='SunshineApplyConfig', daemon=True).start()
+        return 'pending'
+
+    def _apply_config_worker(self, on_done):
+        with self._apply_lock:
+            if self.active_session_count(self._pending_auth) > 0:
+                if self._unsubscribe_pending is None:
+                    self._unsubscribe_pending = self.events.subscribe(self._on_pending_event)
+                result = 'deferred'
+            else:
+                result = 'restarted' if self._restart_for_pending() else 'failed'
+        if on_done: self._on_main_loop(on_done, result)
+
+    def apply_pending(self) -> bool:
+        """Restarts Sunshine now to load pending keys (drops active sessions); blocking"""
+        with self._apply_lock:
+            return self._restart_for_pending()
+
+    def _restart_for_pending(self) -> bool:
+        with self._run_lock:
+            # A user stop() meanwhile cleared the keys: stay stopped
+            if not self.pending_restart_keys: return True
+            # Only the server process; audio sinks and the rest of the host setup stay
+            self.stop()
+            success, msg = self.start()
+        if not success:
+            print(_("Sunshine restart failed: {}").format(msg))
+        return success
+
+    def _clear_pending_restart(self):
+        self.pending_restart_keys = set()
+        self._pending_auth = None
+        if self._unsubscribe_pending:
+            self._unsubscribe_pending()
+            self._unsubscribe_pending = None
+
+    def _on_pending_event(self, event):
+        # Tail thread; the session check and restart block, so neither here nor on the main loop
+        if event.kind not in (SESSION_ENDED, CLIENT_DISCONNECTED) or event.active_sessions: return
+        threading.Thread(target=self._apply_pending_if_idle, name='SunshineApplyConfig', daemon=True).start()
+
+    def _apply_pending_if_idle(self):
+        with self._apply_lock:
+            keys = set(self.pending_restart_keys)
+            if not keys or not self.is_running() or self.active_session_count(self._pending_auth) > 0: return
+            success = self._restart_for_pending()
+        for cb in list(self._config_callbacks):
+            self._on_main_loop(cb, keys, success)
 
     def send_pin(self, pin: str, name: str = None, auth: tuple[str, str] = None) -> tuple[bool, str]:
         """Sends PIN to Sunshine via API"""
-        import urllib.request, ssl, json, base64
-        
-        # Use 127.0.0.1 to avoid IPv6 (::1) issues if Sunshine binds to 0.0.0.0
-        url = "https://127.0.0.1:47990/api/pin"
-        headers = {
-            "Content-Type": "application/json",
-        }
-        
-        if auth:
-            username, password = auth
-            auth_str = f"{username}:{password}"
-            b64_auth = base64.b64encode(auth_str.encode()).decode()
-            headers["Authorization"] = f"Basic {b64_auth}"
-        
-        ctx = ssl._create_unverified_context()
-        ctx.check_hostname = False
-        ctx.verify_mode = ssl.CERT_NONE
+        payload = {"pin": pin}
+        if name:
+            payload["name"] = name
         try:
-             # Fix for legacy server support or specific SSL options
-             ctx.options |= 0x4  # ssl.OP_LEGACY_SERVER_CONNECT
-        except: pass
-        
-        try:
-            payload = {"pin": pin}
-            if name:
-                payload["name"] = name
-            data = json.dumps(payload).encode('utf-8')
-            req = urllib.request.Request(url, data=data, headers=headers, method='POST')
-            
-            with urllib.request.urlopen(req, context=ctx, timeout=5) as response:
-                if response.status == 200:
-                    return True, _("PIN sent successfully")
-                return False, f"HTTP Status {response.status}"
-                
-        except urllib.error.HTTPError as e:
-            if e.code == 401:
+            r = self.api.post('/api/pin', payload, auth=auth, timeout=5)
+            if r.status == 200:
+                return True, _("PIN sent successfully")
+            if r.status == 401:
                 return False, _("Authentication Failed. Configure a user in Sunshine.")
-            return False, _("API Error: {} - {}").format(e.code, e.reason)
+            return False, _("API Error: {} - {}").format(r.status, r.reason)
         except Exception as e:
             return False, _("Connection Error: {}").format(e)
 
     def create_user(self, username, password) -> tuple[bool, str]:
         """Creates new admin user in Sunshine via API"""
-        import urllib.request, ssl, json
-        
-        url = "https://127.0.0.1:47990/api/users"
-        headers = {
-            "Content-Type": "application/json",
+        # Try sending password confirmation too, as error 400 suggests missing fields.
+        # Based on web form that requires confirmation.
+        # And on field IDs: usernameInput, passwordInput, confirmPasswordInput
+        payload = {
+            "usernameInput": username, 
+            "passwordInput": password,
+            "confirmPasswordInput": password 
         }
-        
-        ctx = ssl.create_default_context()
-        ctx.check_hostname = False
-        ctx.verify_mode = ssl.CERT_NONE
-        
         try:
-            # Try sending password confirmation too, as error 400 suggests missing fields.
-            # Based on web form that requires confirmation.
-            # And on field IDs: usernameInput, passwordInput, confirmPasswordInput
-            data_dict = {
-                "usernameInput": username, 
-                "passwordInput": password,
-                "confirmPasswordInput": password 
-            }
-            data = json.dumps(data_dict).encode('utf-8')
-            req = urllib.request.Request(url, data=data, headers=headers, method='POST')
-            
-            with urllib.request.urlopen(req, context=ctx, timeout=5) as response:
-                if response.status == 200:
-                    return True, _("User created successfully")
-                return False, f"HTTP Status {response.status}"
-                
-        except urllib.error.HTTPError as e:
-            msg = e.read().decode('utf-8') if e.fp else e.reason
-            return False, _("API Error: {} - {}").format(e.code, msg)
+            r = self.api.post('/api/users', payload, timeout=5)
+            if r.status == 200:
+                return True, _("User created successfully")
+            return False, _("API Error: {} - {}").format(r.status, r.text() or r.reason)
         except Exception as e:
             return False, _("Connection Error: {}").format(e)
+
     def terminate_session(self, session_id: str, auth: tuple[str, str] = None) -> bool:
         """Terminates a specific session via Sunshine API"""
         if not session_id:
              return False
-
-        import urllib.request, ssl, base64
-
-        # Use 127.0.0.1 to avoid IPv6 issues
-        url = f"https://127.0.0.1:47990/api/sessions/{session_id}"
-
-        headers = {}
-        if auth:
-            u, p = auth
-            headers["Authorization"] = f"Basic {base64.b64encode(f'{u}:{p}'.encode()).decode()}"
-        
-        ctx = ssl.create_default_context()
-        ctx.check_hostname = False
-        ctx.verify_mode = ssl.CERT_NONE
-        
         try:
-            req = urllib.request.Request(url, headers=headers, method='DELETE')
-            with urllib.request.urlopen(req, context=ctx, timeout=5) as response:
-                return response.status in [200, 204]
+            r = self.api.delete(f'/api/sessions/{session_id}', auth=auth, timeout=5)
+            return r.status in [200, 204]
         except Exception as e:
             return False
 
     def get_performance_stats(self, auth=None) -> dict:
         """Fetches performance stats from Sunshine API"""
-        import urllib.request, ssl, json, base64
-        url = "https://127.0.0.1:47990/api/stats"
-        headers = {"Content-Type": "application/json"}
-        if auth:
-            u, p = auth
-            headers["Authorization"] = f"Basic {base64.b64encode(f'{u}:{p}'.encode()).decode()}"
-        
-        ctx = ssl.create_default_context()
-        ctx.check_hostname = False
-        ctx.verify_mode = ssl.CERT_NONE
-        
         try:
-            req = urllib.request.Request(url, headers=headers, method='GET')
-            with urllib.request.urlopen(req, context=ctx, timeout=2) as r:
-                body = r.read().decode('utf-8')
-                return json.loads(body)
-        except urllib.error.HTTPError as e:
-            if e.code == 404: 
-                # Endpoint doesn't exist on this version, silent fail
-                return {}
-            return {}
+            r = self.api.get('/api/stats', auth=auth, timeout=2)
+            # 404: endpoint doesn't exist on this version, silent fail
+            if r.status != 200: return {}
+            data = r.json()
+            return data if isinstance(data, dict) else {}
         except Exception as e:
             return {}
 
     def get_active_sessions(self, auth=None) -> list:
         """Fetches active sessions from Sunshine API"""
-        import urllib.request, ssl, json, base64
-        url = "https://127.0.0.1:47990/api/sessions"
-        headers = {"Content-Type": "application/json"}
-        if auth:
-            u, p = auth
-            headers["Authorization"] = f"Basic {base64.b64encode(f'{u}:{p}'.encode()).decode()}"
-        
-        ctx = ssl.create_default_context()
-        ctx.check_hostname = False
-        ctx.verify_mode = ssl.CERT_NONE
-        
         try:
-            req = urllib.request.Request(url, headers=headers, method='GET')
-            with urllib.request.urlopen(req, context=ctx, timeout=2) as r:
-                body = r.read().decode('utf-8')
-                data = json.loads(body)
+            r = self.api.get('/api/sessions', auth=auth, timeout=2)
+            if r.status == 200:
+                data = r.json()
                 # Handle different Sunshine versions response format
                 if isinstance(data, dict): return data.get('sessions', [])
                 return data if isinstance(data, list) else []
-        except urllib.error.HTTPError as e:
-            if e.code == 404:
-                # Try fallback for older Sunshine versions
-                try:
-                    url_fallback = "https://127.0.0.1:47990/api/clients/list"
-                    req = urllib.request.Request(url_fallback, headers=headers, method='GET')
-                    with urllib.request.urlopen(req, context=ctx, timeout=2) as r:
-                        data = json.loads(r.read().decode('utf-8'))
-                        if isinstance(data, dict):
-                            # In older versions, connected clients are in 'clients' and have a 'connected' flag
-                            clients = data.get('clients', [])
-                            return [c for c in clients if c.get('connected')]
-                        return data if isinstance(data, list) else []
-                except: return []
+            if r.status != 404:
+                return []
 
-            return []
+            # Try fallback for older Sunshine versions
+            r = self.api.get('/api/clients/list', auth=auth, timeout=2)
+            if r.status != 200: return []
+            data = r.json()
+            if isinstance(data, dict):
+                # In older versions, connected clients are in 'clients' and have a 'connected' flag
+                clients = data.get('clients', [])
+                return [c for c in clients if c.get('connected')]
+            return data if isinstance(data, list) else []
         except Exception as e:
             return []
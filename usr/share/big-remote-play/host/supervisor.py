@@ -0,0 +1,204 @@
+"""
+Event-driven supervision of the Sunshine process
+"""
+
+import os
+import select
+import threading
+import time
+
+try:
+    from gi.repository import GLib
+except ImportError:
+    GLib = None
+
+
+class SunshineSupervisor:
+    """
+    Watches the Sunshine process through a pidfd and reports its exit on the
+    GLib main loop (or a watcher thread when GLib is not available).
+
+    Liveness checks read the pidfd state, so they cost no forks. When
+    restart_on_crash is enabled, unexpected exits restart Sunshine with an
+    exponential backoff that resets once a run lasted stable_after seconds.
+    Restarts block until Sunshine is ready, so they run on a timer thread
+    under the host's start/stop lock: a stop() cancels the timer and waits for
+    a restart in progress. Callbacks are always dispatched on the main loop.
+    """
+
+    def __init__(self, host, restart_on_crash: bool = False, backoff_initial: float = 1.0,
+                 backoff_max: float = 60.0, stable_after: float = 30.0):
+        self.host = host
+        self.restart_on_crash = restart_on_crash
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.stable_after = stable_after
+        self.pid = None
+        self._pidfd = None
+        self._process = None
+        self._source_id = None
+        self._started_at = 0.0
+        self._crash_count = 0
+        self._restart_timer = None
+        self._callbacks = []
+        self._restart_callbacks = []
+        self._lock = threading.Lock()
+
+    def add_exit_callback(self, callback):
+        """
+        Registers callback(returncode, restart_delay) called on the main loop
+        when the watched process exits unexpectedly. restart_delay is None
+        when no restart is scheduled. Returns a function that unregisters it.
+        """
+        self._callbacks.append(callback)
+        def remove():
+            if callback in self._callbacks: self._callbacks.remove(callback)
+        return remove
+
+    def add_restart_callback(self, callback):
+        """
+        Registers callback(success, retry_delay) called on the main loop after
+        a crash restart. retry_delay is None on success. Returns a function
+        that unregisters it.
+        """
+        self._restart_callbacks.append(callback)
+        def remove():
+            if callback in self._restart_callbacks: self._restart_callbacks.remove(callback)
+        return remove
+
+    @staticmethod
+    def _dispatch(callbacks, *args):
+        def call():
+            for cb in list(callbacks):
+                try: cb(*args)
+                except Exception as e: print(f"Supervisor callback error: {e}")
+            return False
+        if GLib is not None: GLib.idle_add(call)
+        else: call()
+
+    def watch(self, pid: int, process=None) -> bool:
+        """Starts watching pid. process is the Popen object when Sunshine is our child."""
+        self.unwatch()
+        try:
+            pidfd = os.pidfd_open(pid)
+        except (AttributeError, OSError):
+            pidfd = None
+            # Without pidfd we can still be notified about our own child
+            if process is None or GLib is None:
+                return False
+
+        with self._lock:
+            self.pid = pid
+            self._pidfd = pidfd
+            self._process = process
+            self._started_at = time.monotonic()
+
+        if GLib is not None:
+            if pidfd is not None:
+                self._source_id = GLib.unix_fd_add_full(GLib.PRIORITY_DEFAULT, pidfd, GLib.IOCondition.IN, self._on_pidfd_ready, pid)
+            else:
+                self._source_id = GLib.child_watch_add(GLib.PRIORITY_DEFAULT, pid, self._on_child_exit)
+        else:
+            # The thread owns its own descriptor, unwatch() may close ours at any time
+            thread_fd = os.dup(pidfd) if pidfd is not None else None
+            threading.Thread(target=self._watch_thread, args=(thread_fd, pid, process), name="SunshineSupervisor", daemon=True).start()
+        return True
+
+    def unwatch(self):
+        """Stops watching. The next exit is treated as expected."""
+        with self._lock:
+            source_id, self._source_id = self._source_id, None
+            pidfd, self._pidfd = self._pidfd, None
+            self.pid = None
+            self._process = None
+        if source_id and GLib is not None:
+            GLib.source_remove(source_id)
+        if pidfd is not None:
+            try: os.close(pidfd)
+            except OSError: pass
+
+    def cancel_restart(self):
+        with self._lock:
+            timer, self._restart_timer = self._restart_timer, None
+        if timer: timer.cancel()
+
+    def is_watching(self) -> bool:
+        return self.pid is not None
+
+    def is_alive(self):
+        """
+        True/False for the watched process, or None when nothing is watched
+        and the caller has to fall back to other checks.
+        """
+        with self._lock:
+            if self.pid is None:
+                return None
+            if self._pidfd is not None:
+                # A pidfd becomes readable once the process has exited
+                readable, _w, _x = select.select([self._pidfd], [], [], 0)
+                return not readable
+            if self._process is not None:
+                return self._process.poll() is None
+        return None
+
+    def _watch_thread(self, pidfd, pid, process):
+        if pidfd is None:
+            process.wait()
+        else:
+            select.select([pidfd], [], [])
+            os.close(pidfd)
+        if self.pid == pid:
+            self._handle_exit(pid)
+
+    def _on_pidfd_ready(self, fd, condition, pid):
+        self._source_id = None
+        if self.pid == pid:
+            self._handle_exit(pid)
+        return False
+
+    def _on_child_exit(self, pid, status):
+        self._source_id = None
+        if self.pid == pid:
+            self._handle_exit(pid, os.waitstatus_to_exitcode(status) if hasattr(os, 'waitstatus_to_exitcode') else status)
+
+    def _handle_exit(self, pid, returncode=None):
+        process = self._process
+        if process is not None:
+            # Reap the zombie
+            try: returncode = process.wait(timeout=1)
+            except Exception: pass
+        uptime = time.monotonic() - self._started_at
+        self.unwatch()
+        self.host._on_process_exit(pid)
+
+        if uptime >= self.stable_after:
+            self._crash_count = 0
+        delay = self._schedule_restart() if self.restart_on_crash else None
+
+        print(f"Sunshine (PID {pid}) exited unexpectedly (code {returncode})" + (f", restarting in {delay:.1f}s" if delay is not None else ""))
+        self._dispatch(self._callbacks, returncode, delay)
+
+    def _schedule_restart(self) -> float:
+        delay = min(self.backoff_initial * (2 ** self._crash_count), self.backoff_max)
+        self._crash_count += 1
+        timer = threading.Timer(delay, lambda: self._do_restart(timer))
+        timer.daemon = True
+        with self._lock:
+            self._restart_timer = timer
+        timer.start()
+        return delay
+
+    def _do_restart(self, timer):
+        # Timer thread: start() blocks until Sunshine is ready, only the result goes to the main loop
+        with self.host._run_lock:
+            # Checked under the lock: a stop() before this point cancelled the timer
+            if self._restart_timer is not timer or not self.restart_on_crash or self.host.is_running():
+                return
+            success, msg = self.host.start()
+            with self._lock:
+                self._restart_timer = None
+        delay = None
+        if not success:
+            delay = self._schedule_restart()
+            print(f"Sunshine restart failed: {msg}, retrying in {delay:.1f}s")
+        self._dispatch(self._restart_callbacks, success, delay)
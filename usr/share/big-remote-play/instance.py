@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Extra Sunshine instances: `big-remote-play instance`
+
+Creates, starts, stops, lists and removes isolated Sunshine instances
+(own config dir, credentials, pairing state and port range), e.g. one per
+guest, each on its own output monitor and encoder. Started instances keep
+running after this command exits; stop them with `instance stop`.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from host.instances import SunshineInstanceManager
+from host.sunshine_manager import sunshine_ports
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='big-remote-play instance',
+                                     description="Manage extra Sunshine instances")
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('list', help="instances, their ports and state")
+    create = sub.add_parser('create', help="register a new instance")
+    create.add_argument('name')
+    create.add_argument('--output-name', help="monitor to capture (Sunshine 'output_name')")
+    create.add_argument('--adapter-name', help="GPU to encode on (Sunshine 'adapter_name', e.g. /dev/dri/renderD129)")
+    create.add_argument('--encoder', help="encoder backend (nvenc, vaapi, software, ...)")
+    for command, text in (('start', "start an instance"), ('stop', "stop an instance"),
+                          ('remove', "stop and forget an instance (its config dir is kept)")):
+        sub.add_parser(command, help=text).add_argument('name')
+    return parser.parse_args(argv)
+
+
+def print_list(manager):
+    if not manager.specs:
+        print("No extra Sunshine instances")
+        return
+    for name, spec in manager.specs.items():
+        state = "running" if manager.get(name).is_running() else "stopped"
+        pinned = ", ".join(f"{k}={v}" for k, v in (('output', spec.output_name), ('adapter', spec.adapter_name),
+                                                   ('encoder', spec.encoder)) if v)
+        print(f"{name}\t{state}\tport {spec.port}\thttps://localhost:{sunshine_ports(spec.port)['web']}" +
+              (f"\t{pinned}" if pinned else ""))
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    manager = SunshineInstanceManager()
+    if args.command == 'list':
+        print_list(manager)
+        return 0
+    if args.command == 'create':
+        ok, msg = manager.create(args.name, args.output_name, args.adapter_name, args.encoder)
+        if not ok: raise SystemExit(msg)
+        print(f"Created '{args.name}' on port {manager.specs[args.name].port}")
+        return 0
+    if args.name not in manager.specs:
+        raise SystemExit(f"Unknown Sunshine instance: {args.name}")
+    if args.command == 'start':
+        ok, msg = manager.start(args.name)
+        if not ok: raise SystemExit(f"Could not start '{args.name}': {msg}")
+        print(f"Web UI: https://localhost:{sunshine_ports(manager.specs[args.name].port)['web']}")
+    elif args.command == 'stop':
+        if not manager.stop(args.name): raise SystemExit(f"'{args.name}' is not running")
+    elif args.command == 'remove':
+        manager.remove(args.name)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
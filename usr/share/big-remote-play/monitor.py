@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Headless host monitor: `big-remote-play monitor`
+
+Samples the local Sunshine host (API stats, guests, pings, bandwidth)
+without GTK and writes one JSON object per line, optionally serving the
+latest sample as Prometheus/OpenMetrics text on localhost. Alert rules
+from the app config add {"alert": ...} lines and a log entry when they
+fire or resolve.
+"""
+
+import argparse
+import json
+import os
+import signal
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from host.collector import MetricsCollector
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='big-remote-play monitor',
+                                     description="Headless Sunshine host metrics (JSON lines, Prometheus)")
+    parser.add_argument('--interval', type=float, default=1.0, help="seconds between samples (default 1)")
+    parser.add_argument('--count', type=int, default=0, help="stop after this many samples (default: run until stopped)")
+    parser.add_argument('--instance', help="extra Sunshine instance to monitor (default: the main one)")
+    parser.add_argument('--port', type=int, help="Sunshine base port (default: from sunshine.conf)")
+    parser.add_argument('--output', default='-', help="file to append JSON lines to (default: stdout)")
+    parser.add_argument('--quiet', action='store_true', help="no JSON lines (with --prometheus)")
+    parser.add_argument('--prometheus', type=int, metavar='PORT', help="serve /metrics on 127.0.0.1:PORT")
+    parser.add_argument('--no-alerts', action='store_true', help="don't evaluate the alert rules")
+    args = parser.parse_args(argv)
+    if args.interval <= 0:
+        parser.error("--interval must be positive")
+    return args
+
+
+def open_host(args):
+    if args.instance:
+        from host.instances import SunshineInstanceManager
+        host = SunshineInstanceManager().get(args.instance)
+        if host is None:
+            raise SystemExit(f"Unknown Sunshine instance: {args.instance}")
+        return host
+    from host.sunshine_manager import SunshineHost
+    return SunshineHost(port=args.port)
+
+
+def open_alerts(args):
+    """(AlertEngine, Logger), or None when disabled"""
+    from utils.config import Config
+    from utils.alerts import AlertEngine
+    from utils.logger import Logger
+    config = Config()
+    if args.no_alerts or not config.get('alerts_enabled', True): return None
+    return AlertEngine(config.get('alert_rules')), Logger()
+
+
+def check_alerts(alerts, stats, sample, out):
+    from utils.alerts import metric_values
+    engine, logger = alerts
+    for guest, lat in sample.device_latencies.items():
+        stats.add_latency(guest, lat)
+    if not sample.device_latencies: stats.add_latency(None, sample.latency)
+    stats.prune()
+    guest_stats = {guest: stats.summary(guest) for guest in stats.guests()}
+    values = metric_values(sample.latency, sample.fps, sample.bandwidth, sample.device_latencies,
+                           sample.device_bandwidth, sample.resources, guest_stats)
+    # No target FPS/bandwidth here: rules relative to them are skipped
+    for event in engine.evaluate(values, now=sample.timestamp):
+        if event.state == 'firing': logger.warning(f"Alert: {event.message}")
+        else: logger.info(f"Alert resolved: {event.message}")
+        if out:
+            out.write(json.dumps(event.to_dict(), ensure_ascii=False) + '\n')
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    collector = MetricsCollector(open_host(args))
+    server = None
+    if args.prometheus:
+        from utils.openmetrics import MetricsServer
+        try:
+            server = MetricsServer(args.prometheus).start()
+        except OSError as e:
+            raise SystemExit(f"Cannot listen on 127.0.0.1:{args.prometheus}: {e}")
+        print(f"Serving metrics on http://127.0.0.1:{server.address[1]}/metrics", file=sys.stderr, flush=True)
+    alerts = open_alerts(args)
+    stats = None
+    if alerts:
+        from utils.stream_stats import StreamStats
+        stats = StreamStats(window=60.0)
+    out = None
+    if not args.quiet:
+        out = sys.stdout if args.output == '-' else open(args.output, 'a', buffering=1)
+
+    stop = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop.set())
+
+    count = 0
+    deadline = time.monotonic()
+    try:
+        while not stop.is_set():
+            sample = collector.collect()
+            if server: server.update(sample)
+            if out:
+                out.write(json.dumps(sample.to_dict(), ensure_ascii=False) + '\n')
+            if alerts:
+                check_alerts(alerts, stats, sample, out)
+            if out:
+                out.flush()
+            count += 1
+            if args.count and count >= args.count: break
+            # Fixed cadence: the cycle's own duration is not added to the interval
+            deadline = max(deadline + args.interval, time.monotonic())
+            stop.wait(deadline - time.monotonic())
+    except BrokenPipeError:
+        # Reader went away (e.g. piped into head): no flush error at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    finally:
+        collector.close()
+        if server: server.stop()
+        if out and args.output != '-': out.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
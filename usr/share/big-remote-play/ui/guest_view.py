@@ -12,6 +12,7 @@ from guest.moonlight_client import MoonlightClient
 from utils.i18n import _
 from utils.icons import create_icon_widget
 from utils.moonlight_config import MoonlightConfigManager
+from utils.resolver import get_resolver
 
 class GuestView(Gtk.Box):
     def __init__(self):
@@ -32,9 +33,22 @@ class GuestView(Gtk.Box):
         self.moonlight_config = MoonlightConfigManager()
         self.moonlight = MoonlightClient(logger=self.logger)
         self.setup_ui()
+        self.moonlight.on_stats = self._on_moonlight_stats
         self.discover_hosts()
         GLib.timeout_add(1000, self.monitor_connection)
         
+    def _on_moonlight_stats(self, stats):
+        """Moonlight reader thread: the end-of-stream averages are shown as a summary"""
+        if not stats.final: return
+        parts = []
+        if stats.latency is not None: parts.append(_("{:.1f} ms latency").format(stats.latency))
+        if stats.fps is not None: parts.append(_("{:.0f} FPS").format(stats.fps))
+        if stats.frame_drops is not None: parts.append(_("{:.1f}% frames dropped").format(stats.frame_drops))
+        if not parts: return
+        text = _("Stream average: {}").format(", ".join(parts))
+        if self.logger: self.logger.info(text)
+        GLib.idle_add(self.show_toast, text)
+
     def detect_bitrate(self, button=None):
         self.show_toast(_("Detecting bandwidth..."))
         def run_detect():
@@ -368,6 +382,13 @@ class GuestView(Gtk.Box):
         icon = create_icon_widget('computer-symbolic', size=32)
         info = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=2); info.set_valign(Gtk.Align.CENTER)
         n = Gtk.Label(label=host['name']); n.set_halign(Gtk.Align.START); n.add_css_class('heading')
+        if host.get('resolved') is False:
+            # Scanned hosts start as "Host (ip)"; the name shows up when reverse DNS answers
+            def set_name(name):
+                host['name'] = name; host['resolved'] = True; n.set_label(name)
+                return False
+            name = get_resolver().lookup(host['ip'].split('%')[0], lambda ip, name: name and GLib.idle_add(set_name, name))
+            if name: set_name(name)
         i = Gtk.Label(label=host['ip']); i.set_halign(Gtk.Align.START); i.add_css_class('dim-label')
         info.append(n); info.append(i); box.append(radio); box.append(icon); box.append(info)
         
@@ -564,6 +585,9 @@ class GuestView(Gtk.Box):
                 'audio': audio_active, 
                 'hw_decode': hw_decode_active
             }
+            # Expected values for the monitor (idle display, relative alerts)
+            self.perf_monitor.set_target_fps(fps)
+            self.perf_monitor.set_target_bandwidth(bitrate_val)
             
             if self.moonlight.connect(host['ip'], **opts): 
                 GLib.idle_add(lambda: (self.show_loading(False), self.perf_monitor.set_connection_status(host['name'], _("Active Stream"), True), self.perf_monitor.start_monitoring()))
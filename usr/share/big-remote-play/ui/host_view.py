@@ -13,6 +13,7 @@ from gi.repository import GLib
 from utils.i18n import _
 from utils.icons import create_icon_widget
 from ui.sunshine_preferences import SunshineConfigManager
+from host.sunshine_manager import SESSION_CONFIG_KEYS
 class HostView(Gtk.Box):
     def __init__(self):
         self.loading_settings = True
@@ -25,6 +26,11 @@ class HostView(Gtk.Box):
         
         from host.sunshine_manager import SunshineHost
         self.sunshine = SunshineHost(Path.home() / '.config' / 'big-remoteplay' / 'sunshine')
+        self.sunshine.supervisor.restart_on_crash = self.config.get('host', {}).get('auto_restart', False)
+        self.sunshine.supervisor.add_exit_callback(self._on_sunshine_exit)
+        self.sunshine.supervisor.add_restart_callback(self._on_sunshine_restarted)
+        self.sunshine.events.subscribe(lambda e: GLib.idle_add(self._on_sunshine_event, e))
+        self.sunshine.add_config_applied_callback(self._on_sunshine_config_applied)
         
         if self.sunshine.is_running():
             self.is_hosting = True
@@ -137,6 +143,8 @@ class HostView(Gtk.Box):
         
         from .performance_monitor import PerformanceMonitor
         self.perf_monitor = PerformanceMonitor(sunshine=self.sunshine)
+        # Games started by _launch_game_direct (and their children) next to Sunshine in the chart
+        self.perf_monitor.collector.processes.track('game', self._live_game_pids)
         self.perf_monitor.set_visible(True)
         self.perf_monitor.set_connection_status("Localhost", _("Sunshine Offline"), False)
         
@@ -351,6 +359,12 @@ class HostView(Gtk.Box):
         self.webui_anyone_row.set_subtitle(_('Allows anyone to access the web interface (Anyone may access Web UI)'))
         self.webui_anyone_row.set_active(False)
         self.advanced_expander.add_row(self.webui_anyone_row)
+
+        self.auto_restart_row = Adw.SwitchRow()
+        self.auto_restart_row.set_title(_('Restart on Crash'))
+        self.auto_restart_row.set_subtitle(_('Automatically restart Sunshine if it stops unexpectedly'))
+        self.auto_restart_row.set_active(False)
+        self.advanced_expander.add_row(self.auto_restart_row)
         
         self.firewall_row = Adw.ActionRow()
         self.firewall_row.set_title(_("Configure Firewall (IPv6)"))
@@ -495,8 +509,7 @@ class HostView(Gtk.Box):
         return True
 
     def _get_sunshine_conf_path(self):
-        from pathlib import Path
-        return Path.home() / '.config' / 'big-remoteplay' / 'sunshine' / 'sunshine.conf'
+        return self.sunshine.conf.path
 
     def _get_sunshine_creds(self):
         conf_file = self._get_sunshine_conf_path()
@@ -521,113 +534,41 @@ class HostView(Gtk.Box):
         return None
 
     def _save_sunshine_creds(self, user, password):
-        conf_file = self._get_sunshine_conf_path()
-        lines = []
-        if conf_file.exists():
-            try:
-                with open(conf_file, 'r') as f:
-                    lines = f.readlines()
-            except: pass
-        
-        new_lines = []
-        found_user = False
-        found_pass = False
-        
-        for line in lines:
-            if '=' in line:
-                key, _ = line.split('=', 1)
-                key = key.strip()
-                if key == 'sunshine_user':
-                    new_lines.append(f"sunshine_user = {user}\n")
-                    found_user = True
-                    continue
-                elif key == 'sunshine_password':
-                    new_lines.append(f"sunshine_password = {password}\n")
-                    found_pass = True
-                    continue
-            new_lines.append(line)
-            
-        if not found_user: new_lines.append(f"sunshine_user = {user}\n")
-        if not found_pass: new_lines.append(f"sunshine_password = {password}\n")
-
         # Configs required for API and operation
-        required = {
-            "credentials": f"sunshine:{password}",
-            "log_level": "2",
-            "port": "47989",
-            "webserver": "0.0.0.0",
-            "enable_api_endpoints": "true"
-        }
-        
-        final_lines = []
-        existing_keys = set()
-        
-        # Process existing + updated user/pass lines
-        for line in new_lines:
-            if '=' in line:
-                key = line.split('=')[0].strip()
-                if key in required:
-                    final_lines.append(f"{key} = {required[key]}\n")
-                    existing_keys.add(key)
-                    continue
-            final_lines.append(line)
-            
-        # Append missing required configs
-        for k, v in required.items():
-            if k not in existing_keys:
-                final_lines.append(f"{k} = {v}\n")
-        
         try:
-            conf_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(conf_file, 'w') as f:
-                f.writelines(final_lines)
+            self.sunshine.conf.update({
+                "sunshine_user": user,
+                "sunshine_password": password,
+                "credentials": f"sunshine:{password}",
+                "log_level": "2",
+                "port": str(self.sunshine.port),
+                "webserver": "0.0.0.0",
+                "enable_api_endpoints": "true"
+            })
         except Exception as e:
             print(f"Error saving Sunshine creds: {e}")
 
     def _ensure_sunshine_config(self):
         """Ensures sunshine.conf has required API settings"""
-        conf_file = self._get_sunshine_conf_path()
-        if not conf_file.exists(): return
+        conf = self.sunshine.conf
+        if not conf.path.exists(): return
         
         try:
-            lines = []
-            with open(conf_file, 'r') as f:
-                lines = f.readlines()
-            
-            config_map = {}
-            for line in lines:
-                if '=' in line:
-                    k, v = line.split('=', 1)
-                    config_map[k.strip()] = v.strip()
-            
+            config_map = conf.values()
             pwd = config_map.get('sunshine_password', '')
             
             # If we have a password but no credentials line or missing API config
-            updates_needed = False
             required = {
                 "log_level": "2",
-                "port": "47989",
+                "port": str(self.sunshine.port),
                 "webserver": "0.0.0.0",
                 "enable_api_endpoints": "true"
             }
             if pwd and 'credentials' not in config_map:
                  required['credentials'] = f"sunshine:{pwd}"
             
-            for k, v in required.items():
-                if k not in config_map:
-                    updates_needed = True
-            
-            if updates_needed:
-                final_lines = lines.copy()
-                if final_lines and not final_lines[-1].endswith('\n'):
-                    final_lines[-1] += '\n'
-                    
-                for k, v in required.items():
-                    if k not in config_map:
-                        final_lines.append(f"{k} = {v}\n")
-                
-                with open(conf_file, 'w') as f:
-                    f.writelines(final_lines)
+            # Only add what is missing, keep user values; no write if nothing is
+            conf.update({k: v for k, v in required.items() if k not in config_map})
                 
         except Exception as e:
             print(f"Error ensuring sunshine config: {e}")
@@ -722,7 +663,7 @@ class HostView(Gtk.Box):
         def on_resp(d, r):
             if r == "open":
                 import webbrowser
-                webbrowser.open("https://localhost:47990")
+                webbrowser.open(f"https://localhost:{self.sunshine.api.port}")
         
         dialog.connect("response", on_resp)
         dialog.present()
@@ -1180,9 +1121,9 @@ class HostView(Gtk.Box):
         self.loading_bar.set_visible(True); self.loading_bar.pulse()
             
         try:
+            # stop() waits for the process and start() for the API port to be released
             if self.sunshine.is_running():
                 self.sunshine.stop()
-                import time; time.sleep(1)
             
             self.pin_code = ''.join(random.choices(string.digits, k=6))
             from utils.network import NetworkDiscovery
@@ -1254,7 +1195,7 @@ class HostView(Gtk.Box):
                 'origin_web_ui_allowed': 'wan' if self.webui_anyone_row.get_active() else 'lan',
                 'webserver': '0.0.0.0',
                 'enable_api_endpoints': 'true',
-                'port': '47989'
+                'port': str(self.sunshine.port)
             }
             
 
@@ -1358,6 +1299,24 @@ class HostView(Gtk.Box):
             self.start_btn_spinner.stop()
             self.start_btn_spinner.set_visible(False)
         
+    def _live_game_pids(self):
+        """
+        Launcher PIDs whose process or process group (the game it left
+        running) is still alive. Others are dropped: once the group is gone
+        the PID can be reused by an unrelated process.
+        """
+        def alive(p):
+            if p.poll() is None: return True
+            try: os.killpg(p.pid, 0)
+            except ProcessLookupError: return False
+            except OSError: pass
+            return True
+        procs = getattr(self, '_game_processes', [])
+        # Removed one by one, launches may append from another thread meanwhile
+        for p in [p for p in procs if not alive(p)]:
+            procs.remove(p)
+        return [p.pid for p in procs]
+
     def _launch_game_direct(self):
         """Directly launch game/platform via subprocess - radical approach"""
         info = getattr(self, '_game_launch_info', None)
@@ -1485,9 +1444,6 @@ class HostView(Gtk.Box):
             self.sunshine.stop()
         except Exception as e:
             print(f"Error stopping Sunshine: {e}")
-        
-        # Hard kill fallback
-        subprocess.run(['pkill', '-9', 'sunshine'], stderr=subprocess.DEVNULL)
             
         self.is_hosting = False
         self.sync_ui_state()
@@ -1497,24 +1453,38 @@ class HostView(Gtk.Box):
         self.start_btn_spinner.set_visible(False)
         self.show_toast(_('Server stopped'))
         
-    def update_status_info(self):
-        sunshine_running = self.check_process_running('sunshine')
-        
-        # If it was supposed to be hosting but sunshine is not running
-        if self.is_hosting and not sunshine_running:
-             self.is_hosting = False
-             self.sync_ui_state()
-             self.show_toast(_("Sunshine stopped unexpectedly"))
-             return True
+    def _on_sunshine_exit(self, returncode, restart_delay):
+        """Supervisor notification, runs on the main loop"""
+        if not self.is_hosting: return
+        if restart_delay is not None:
+            self.show_toast(_("Sunshine stopped unexpectedly, restarting in {}s").format(int(restart_delay)))
+            return
+        self.is_hosting = False
+        self.sync_ui_state()
+        self.show_toast(_("Sunshine stopped unexpectedly"))
+
+    def _on_sunshine_restarted(self, success, retry_delay):
+        """Supervisor crash restart result, runs on the main loop"""
+        if not self.is_hosting: return
+        if success:
+            self.show_toast(_("Sunshine restarted"))
+        else:
+            self.show_toast(_("Sunshine restart failed, retrying in {}s").format(int(retry_delay)))
+
+    def _on_sunshine_event(self, event):
+        """Sunshine log event, runs on the main loop"""
+        from host.sunshine_events import SESSION_STARTED, CLIENT_DISCONNECTED, SESSION_ENDED, ENCODER_INITIALIZED
+        if not self.is_hosting: return False
+        who = event.client_ip or _("Guest")
+        if event.kind == SESSION_STARTED:
+            self.show_toast(_("{} connected").format(who))
+            self.perf_monitor.set_connection_status("Sunshine", _("Active Connection"), True)
+        elif event.kind in (CLIENT_DISCONNECTED, SESSION_ENDED):
+            self.show_toast(_("{} disconnected").format(who))
+        elif event.kind == ENCODER_INITIALIZED:
+            print(f"Sunshine encoder: {event.detail}")
+        return False
 
-        if not self.is_hosting: return True
-        
-        if hasattr(self, 'sunshine_val'):
-            self.sunshine_val.set_markup('<span color="#2ec27e">On-line</span>' if sunshine_running else '<span color="#e01b24">Parado</span>')
-        ipv4, ipv6 = self.get_ip_addresses()
-        self.update_field('ipv4', ipv4); self.update_field('ipv6', ipv6)
-        return True
-        
     def check_process_running(self, process_name):
         try:
             subprocess.check_output(["pgrep", "-x", process_name])
@@ -1571,7 +1541,7 @@ class HostView(Gtk.Box):
         def on_response(d, r):
             if r == "logs":
                 try:
-                    log_path = self.sunshine.config_dir / 'sunshine.log'
+                    log_path = self.sunshine.log.path
                     subprocess.Popen(['xdg-open', str(log_path)])
                 except: pass
             elif r == "fix":
@@ -1593,7 +1563,7 @@ class HostView(Gtk.Box):
         else: print(f"Toast: {message}")
         
     def open_sunshine_config(self, button):
-        subprocess.Popen(['xdg-open', 'https://localhost:47990'])
+        subprocess.Popen(['xdg-open', f'https://localhost:{self.sunshine.api.port}'])
 
     def on_game_mode_changed(self, row, param):
         idx = row.get_selected()
@@ -1641,6 +1611,7 @@ class HostView(Gtk.Box):
 
             'ipv6': self.ipv6_row.get_active(),
             'webui_anyone': self.webui_anyone_row.get_active(),
+            'auto_restart': self.auto_restart_row.get_active(),
             # New settings
             'efficient_codecs': self.codecs_row.get_active(),
             'optimization_mode': self.optimization_row.get_selected(),
@@ -1648,6 +1619,7 @@ class HostView(Gtk.Box):
         })
 
         self.config.set('host', h)
+        self.sunshine.supervisor.restart_on_crash = h['auto_restart']
         
         # Update monitor target FPS live
         fps_idx = self.fps_row.get_selected()
@@ -1662,50 +1634,96 @@ class HostView(Gtk.Box):
             from ui.sunshine_preferences import SunshineConfigManager
             scm = SunshineConfigManager()
             
-            # Map Host Settings -> Sunshine Settings
-            scm.set('upnp', 'enabled' if self.upnp_row.get_active() else 'disabled')
-            scm.set('address_family', 'both' if self.ipv6_row.get_active() else 'ipv4')
-            scm.set('origin_web_ui_allowed', 'wan' if self.webui_anyone_row.get_active() else 'lan')
-            streaming_active = self.audio_mode_row.get_selected() in [0, 1, 3]
-            scm.set('stream_audio', 'true' if streaming_active else 'false')
-            
-            # Map Codecs
-            # If enabled -> advertised(1). If disabled -> disabled(0)
-            codec_val = '1' if self.codecs_row.get_active() else '0'
-            scm.set('hevc_mode', codec_val)
-            scm.set('av1_mode', codec_val)
-            
-            # Map Wi-Fi Mode (FEC)
-            # Enabled -> 20%. Disabled -> 5%
-            scm.set('fec_percentage', '20' if self.wifi_row.get_active() else '5')
-            
-            # Map Optimization Mode
-            # 0=Low Latency, 1=Balanced, 2=High Quality
-            opt_idx = self.optimization_row.get_selected()
-            if opt_idx == 0: # Low Latency
-                scm.set('nvenc_preset', '1') # P1
-                scm.set('amd_quality', 'speed')
-                scm.set('sw_preset', 'ultrafast')
-                scm.set('nvenc_twopass', 'disabled')
-            elif opt_idx == 2: # High Quality
-                scm.set('nvenc_preset', '7') # P7
-                scm.set('amd_quality', 'quality')
-                scm.set('sw_preset', 'medium')
-                scm.set('nvenc_twopass', 'quarter_res')
-            else: # Balanced
-                scm.set('nvenc_preset', '4') # P4
-                scm.set('amd_quality', 'balanced')
-                scm.set('sw_preset', 'veryfast')
-                scm.set('nvenc_twopass', 'disabled') # Or quarter_res depending on preference
-            
-            # Map Bandwidth to min_bitrate
-            # 0 = Unlimited (default 0 or very high)
-            bw = int(self.bandwidth_row.get_value() * 1000) # Mbps -> Kbps
-            scm.set('min_bitrate', str(bw) if bw > 0 else '0')
+            # One diff-aware write for the whole mapping
+            with scm.batch() as changed:
+                # Stream defaults written by start_hosting
+                scm.set('fps', int(fps_val))
+                bw_mbps = self.bandwidth_row.get_value()
+                scm.set('bitrate', int(bw_mbps * 1000) if bw_mbps > 0 else 20000)
+
+                # Map Host Settings -> Sunshine Settings
+                scm.set('upnp', 'enabled' if self.upnp_row.get_active() else 'disabled')
+                scm.set('address_family', 'both' if self.ipv6_row.get_active() else 'ipv4')
+                scm.set('origin_web_ui_allowed', 'wan' if self.webui_anyone_row.get_active() else 'lan')
+                streaming_active = self.audio_mode_row.get_selected() in [0, 1, 3]
+                scm.set('stream_audio', 'true' if streaming_active else 'false')
+            
+                # Map Codecs
+                # If enabled -> advertised(1). If disabled -> disabled(0)
+                codec_val = '1' if self.codecs_row.get_active() else '0'
+                scm.set('hevc_mode', codec_val)
+                scm.set('av1_mode', codec_val)
+            
+                # Map Wi-Fi Mode (FEC)
+                # Enabled -> 20%. Disabled -> 5%
+                scm.set('fec_percentage', '20' if self.wifi_row.get_active() else '5')
+            
+                # Map Optimization Mode
+                # 0=Low Latency, 1=Balanced, 2=High Quality
+                opt_idx = self.optimization_row.get_selected()
+                if opt_idx == 0: # Low Latency
+                    scm.set('nvenc_preset', '1') # P1
+                    scm.set('amd_quality', 'speed')
+                    scm.set('sw_preset', 'ultrafast')
+                    scm.set('nvenc_twopass', 'disabled')
+                elif opt_idx == 2: # High Quality
+                    scm.set('nvenc_preset', '7') # P7
+                    scm.set('amd_quality', 'quality')
+                    scm.set('sw_preset', 'medium')
+                    scm.set('nvenc_twopass', 'quarter_res')
+                else: # Balanced
+                    scm.set('nvenc_preset', '4') # P4
+                    scm.set('amd_quality', 'balanced')
+                    scm.set('sw_preset', 'veryfast')
+                    scm.set('nvenc_twopass', 'disabled') # Or quarter_res depending on preference
+            
+                # Map Bandwidth to min_bitrate
+                # 0 = Unlimited (default 0 or very high)
+                bw = int(self.bandwidth_row.get_value() * 1000) # Mbps -> Kbps
+                scm.set('min_bitrate', str(bw) if bw > 0 else '0')
+
+            self._queue_config_apply(changed)
                 
         except Exception as e:
             print(f"Error syncing to Sunshine config: {e}")
 
+    def _queue_config_apply(self, keys):
+        """Loads changed keys into the running server once the user stops editing"""
+        if not self.is_hosting or not keys: return
+        self._config_apply_keys = getattr(self, '_config_apply_keys', set()) | set(keys)
+        # Debounce, sliders emit a change per step
+        if getattr(self, '_config_apply_source', None):
+            GLib.source_remove(self._config_apply_source)
+        self._config_apply_source = GLib.timeout_add(1000, self._do_config_apply)
+
+    def _do_config_apply(self):
+        self._config_apply_source = None
+        keys, self._config_apply_keys = self._config_apply_keys, set()
+        if not self.is_hosting: return False
+        # Session check and restart run on a worker, the result comes back here
+        result = self.sunshine.apply_config(keys, auth=self._get_sunshine_creds(), on_done=self._on_config_apply_done)
+        if result == 'applied' and keys & SESSION_CONFIG_KEYS:
+            self.show_toast(_("FPS and bitrate apply from the next session"))
+        return False
+
+    def _on_config_apply_done(self, result):
+        if result == 'restarted':
+            self.show_toast(_("Settings applied"))
+        elif result == 'deferred':
+            self.show_toast(_("Settings apply after current sessions end"))
+        elif result == 'failed':
+            self.show_toast(_("Failed to apply settings"))
+        return False
+
+    def _on_sunshine_config_applied(self, keys, success):
+        """Deferred settings loaded after the last session ended"""
+        if success:
+            self.show_toast(_("Pending settings applied"))
+        else:
+            self.is_hosting = self.sunshine.is_running()
+            self.sync_ui_state()
+            self.show_toast(_("Failed to apply settings"))
+
     def load_settings(self):
         self.loading_settings = True
         try:
@@ -1791,6 +1809,7 @@ class HostView(Gtk.Box):
             self.upnp_row.set_active(h.get('upnp', True))
             self.ipv6_row.set_active(h.get('ipv6', True))
             self.webui_anyone_row.set_active(h.get('webui_anyone', False))
+            self.auto_restart_row.set_active(h.get('auto_restart', False))
             
             # New settings
             self.codecs_row.set_active(h.get('efficient_codecs', True))
@@ -1800,7 +1819,7 @@ class HostView(Gtk.Box):
             self.loading_settings = False
 
     def connect_settings_signals(self):
-        for r in [self.upnp_row, self.ipv6_row, self.webui_anyone_row, self.codecs_row, self.wifi_row]:
+        for r in [self.upnp_row, self.ipv6_row, self.webui_anyone_row, self.auto_restart_row, self.codecs_row, self.wifi_row]:
             r.connect('notify::active', self.save_host_settings)
 
         for r in [self.audio_mode_row, self.game_mode_row, self.game_list_row, self.monitor_row, self.gpu_row, self.platform_row, self.audio_output_row, self.optimization_row, self.resolution_row, self.fps_row]:
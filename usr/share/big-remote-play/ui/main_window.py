@@ -794,8 +794,10 @@ class MainWindow(Adw.ApplicationWindow):
         GLib.timeout_add_seconds(3, self.p_check)
 
     def p_check(self):
+        # The host's supervisor knows about its own Sunshine without forking pgrep
+        supervised = self.host_view.sunshine.supervisor.is_alive() if hasattr(self, 'host_view') else None
         def check():
-            r_sun = self.system_check.is_sunshine_running()
+            r_sun = supervised if supervised is not None else self.system_check.is_sunshine_running()
             r_moon = self.system_check.is_moonlight_running()
             r_docker = self.system_check.is_docker_running()
             r_tail = self.system_check.is_tailscale_running()
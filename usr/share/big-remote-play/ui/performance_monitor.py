@@ -5,23 +5,20 @@ Replaces the old text-based monitor with a modern visual chart.
 """
 
 from __future__ import annotations
-from collections import deque
-from dataclasses import dataclass
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from datetime import datetime
 import time
 import random
 import threading
 import subprocess
-import re
 from pathlib import Path
-import queue
-import os
 import signal
 import gi
-import socket
 
 gi.require_version("Gtk", "4.0")
 gi.require_version("Adw", "1")
-from gi.repository import Gtk, GLib, Adw, Gdk
+from gi.repository import Gtk, GLib, Adw, Gdk, Gio, GObject
 from utils.i18n import _
 
 try:
@@ -30,20 +27,93 @@ except ImportError:
     cairo = None
 
 CHART_MAX_HISTORY = 60
+# Sampling cadence (s): every second while guests are around or numbers move,
+# backing off towards the idle interval otherwise
+MONITOR_INTERVAL_ACTIVE = 1.0
+MONITOR_INTERVAL_IDLE = 5.0
+MONITOR_BACKOFF = 1.5
+# Longer live windows from per-bucket summaries: (bucket seconds, buckets)
+CHART_LEVELS = ((10.0, 60), (60.0, 60))
+CHART_WINDOW_LABELS = ("1 min", "10 min", "1 h")
+# Replay: narrowest zoom (s) and the sample gap that breaks a line (s)
+REPLAY_MIN_SPAN = 10.0
+REPLAY_GAP = 5.0
+# Host load series (0-100 %): CPU dotted, GPU dash-dotted
+RESOURCE_COLORS = {'host': (0.6, 0.6, 0.6, 1.0), 'sunshine': (1.0, 0.85, 0.2, 1.0), 'game': (0.9, 0.3, 0.9, 1.0)}
+CPU_DASH = [1, 3]
+GPU_DASH = [6, 2, 1, 2]
 
 from utils.icons import create_icon_widget, set_icon
+from host.collector import MetricsCollector
+from utils.stream_stats import StreamStats
+from utils.metrics_recorder import MetricsRecorder, DEFAULT_PATH as METRICS_PATH
+from utils.downsample import minmax_downsample, value_at
+from utils.chart_history import ChartHistory
+from utils.alerts import AlertEngine, metric_values
+from utils.logger import Logger
 
 @dataclass
 class PerformanceDataPoint:
-    """Single data point for performance chart."""
+    """Single data point for performance chart; texts are formatted on access."""
     latency: float
     fps: float
     bandwidth: float
     device_latencies: dict
-    latency_text: str
-    fps_text: str
-    bandwidth_text: str
     users_count: int = 0
+    # {device: (tx_mbps, rx_mbps)}
+    device_bandwidth: dict = field(default_factory=dict)
+    bandwidth_override: str | None = None
+    # {group: {'cpu', 'gpu', 'rss', 'threads', 'read', 'write'}}
+    resources: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_history(cls, history: ChartHistory, i: int) -> PerformanceDataPoint:
+        p = history.point(i)
+        return cls(p['latency'], p['fps'], p['bandwidth'], p['device_latencies'], p['users'],
+                   p['device_bandwidth'], p['bw_override'], p['resources'])
+
+    @property
+    def latency_text(self) -> str:
+        return f"{self.latency:.0f} ms"
+
+    @property
+    def fps_text(self) -> str:
+        return f"{self.fps:.0f} FPS"
+
+    @property
+    def bandwidth_text(self) -> str:
+        return self.bandwidth_override or f"{self.bandwidth:.1f} Mbps"
+
+@dataclass
+class ReplayData:
+    """A recorded session as sparse columns (unmeasured samples left out)."""
+    title: str
+    times: list
+    users: list
+    # {'latency'|'fps'|'bandwidth': (times, values)}
+    series: dict
+    # {device: (times, latencies)}
+    device_latencies: dict
+    # {device: (times, tx, rx)}
+    device_bandwidth: dict
+
+    @classmethod
+    def from_samples(cls, samples, title: str = "") -> ReplayData:
+        series = {k: ([], []) for k in ('latency', 'fps', 'bandwidth')}
+        dev_lat, dev_bw = {}, {}
+        for s in samples:
+            for k in series:
+                v = getattr(s, k)
+                if v > 0:
+                    series[k][0].append(s.timestamp)
+                    series[k][1].append(v)
+            for dev, lat in s.device_latencies.items():
+                ts, vals = dev_lat.setdefault(dev, ([], []))
+                ts.append(s.timestamp); vals.append(lat)
+            for dev, (tx, rx) in s.device_bandwidth.items():
+                ts, txs, rxs = dev_bw.setdefault(dev, ([], [], []))
+                ts.append(s.timestamp); txs.append(tx); rxs.append(rx)
+        return cls(title, [s.timestamp for s in samples], [s.users for s in samples], series, dev_lat, dev_bw)
 
 class PerformanceChartWidget(Gtk.DrawingArea):
     """
@@ -52,13 +122,16 @@ class PerformanceChartWidget(Gtk.DrawingArea):
 
     def __init__(self) -> None:
         super().__init__()
-        self._history: deque[PerformanceDataPoint] = deque(maxlen=CHART_MAX_HISTORY)
+        self._history = ChartHistory(CHART_MAX_HISTORY, CHART_LEVELS)
+        # 0 = raw samples, n = CHART_LEVELS[n - 1]
+        self._level = 0
         self.max_latency = 100.0
         self.max_fps = 120.0
         self.max_bandwidth = 50.0
-        self._cur_latency_text = "--"
-        self._cur_fps_text = "--"
-        self._cur_bw_text = "--"
+        # Percentiles/jitter per device over the chart's time span
+        self.stats = StreamStats(window=CHART_MAX_HISTORY)
+        self._cur_stats = {}
+        self._fps_stats = None
         self.device_colors = {}
         self.color_palette = [
             (1.0, 0.4, 0.0, 1.0),
@@ -70,6 +143,14 @@ class PerformanceChartWidget(Gtk.DrawingArea):
         ]
         self._hover_x: float | None = None
         self._hover_index: int | None = None
+        # Replay of a recorded session (None = live)
+        self._replay: ReplayData | None = None
+        self._view = None
+        self._drag_view = None
+        self._replay_cache = None
+        # Cached layer surfaces {name: (key, surface)}; bumped on every data/view change
+        self._layers = {}
+        self._data_version = 0
         self.set_size_request(300, 160)
         self.set_vexpand(False)
         self.set_hexpand(True)
@@ -78,6 +159,16 @@ class PerformanceChartWidget(Gtk.DrawingArea):
         motion_controller.connect("motion", self._on_motion)
         motion_controller.connect("leave", self._on_leave)
         self.add_controller(motion_controller)
+        scroll_controller = Gtk.EventControllerScroll.new(Gtk.EventControllerScrollFlags.VERTICAL)
+        scroll_controller.connect("scroll", self._on_scroll)
+        self.add_controller(scroll_controller)
+        drag = Gtk.GestureDrag()
+        drag.connect("drag-begin", self._on_drag_begin)
+        drag.connect("drag-update", self._on_drag_update)
+        self.add_controller(drag)
+        click = Gtk.GestureClick()
+        click.connect("pressed", self._on_pressed)
+        self.add_controller(click)
         
     def _get_device_color(self, name):
         # Remove sufixos de estado para manter a cor consistente
@@ -86,32 +177,108 @@ class PerformanceChartWidget(Gtk.DrawingArea):
             idx = len(self.device_colors) % len(self.color_palette)
             self.device_colors[base_name] = self.color_palette[idx]
         return self.device_colors[base_name]
+
+    @staticmethod
+    def _group_label(group):
+        return {'host': _("Host"), 'sunshine': "Sunshine", 'game': _("Game")}.get(group, group)
+
+    def _group_color(self, group):
+        return RESOURCE_COLORS.get(group) or self._get_device_color(group)
+
+    @staticmethod
+    def _in_group_order(groups):
+        """Host first, then Sunshine, the game and any other group"""
+        order = list(RESOURCE_COLORS)
+        return sorted(groups, key=lambda g: (order.index(g) if g in order else len(order), g))
         
-    def add_data_point(self, latency: float, fps: float, bandwidth: float, users: int = 0, device_latencies: dict = None, bw_text_override: str = None):
+    def add_data_point(self, latency: float, fps: float, bandwidth: float, users: int = 0, device_latencies: dict = None, bw_text_override: str = None, device_bandwidth: dict = None, resources: dict = None):
         if latency > self.max_latency: self.max_latency = latency * 1.2
         if fps > self.max_fps: self.max_fps = fps * 1.2
         if bandwidth > self.max_bandwidth: self.max_bandwidth = bandwidth * 1.2
         if device_latencies:
             for lat in device_latencies.values():
                 if lat > self.max_latency: self.max_latency = lat * 1.2
+        if device_bandwidth:
+            for tx, _rx in device_bandwidth.values():
+                if tx > self.max_bandwidth: self.max_bandwidth = tx * 1.2
+
+        now = time.monotonic()
+        if device_latencies:
+            for dev, lat in device_latencies.items():
+                self.stats.add_latency(dev, lat, now)
+        else:
+            self.stats.add_latency(None, latency, now)
+        self.stats.add_fps('fps', fps, now)
+        self.stats.prune(now)
+        self._cur_stats = {dev: self.stats.summary(dev, now) for dev in (device_latencies or {None: 0})}
+        self._fps_stats = self.stats.summary('fps', now)
         
-        bw_txt = bw_text_override if bw_text_override else f"{bandwidth:.1f} Mbps"
-        
-        point = PerformanceDataPoint(
-            latency=latency,
-            fps=fps,
-            bandwidth=bandwidth,
-            device_latencies=device_latencies or {},
-            latency_text=f"{latency:.0f} ms",
-            fps_text=f"{fps:.0f} FPS",
-            bandwidth_text=bw_txt,
-            users_count=users
-        )
-        self._history.append(point)
-        self._cur_latency_text = point.latency_text
-        self._cur_fps_text = point.fps_text
-        self._cur_bw_text = point.bandwidth_text
-        self.queue_draw()
+        self._history.append(time.time(), latency, fps, bandwidth, users, device_latencies, device_bandwidth, bw_text_override, resources)
+        self._invalidate_data()
+
+    @property
+    def in_replay(self) -> bool:
+        return self._replay is not None
+
+    def load_replay(self, replay: ReplayData):
+        """Shows a recorded session instead of the live stream, fully zoomed out"""
+        self._replay = replay
+        self._view = (replay.times[0], replay.times[-1]) if replay.times else None
+        self._replay_cache = None
+        self._invalidate_data()
+
+    def exit_replay(self):
+        self._replay = None
+        self._view = None
+        self._replay_cache = None
+        self._invalidate_data()
+
+    def _set_view(self, start, end):
+        first, last = self._replay.times[0], self._replay.times[-1]
+        span = min(end - start, last - first)
+        start = max(first, min(start, last - span))
+        self._view = (start, start + span)
+        self._invalidate_data()
+
+    def _x_to_time(self, x):
+        t0, t1 = self._view
+        cw = self.get_width() - 50
+        return t0 + (x - 40) / cw * (t1 - t0) if cw > 0 else t0
+
+    def _on_scroll(self, controller, dx, dy):
+        if self._replay is None:
+            # Live: step through the raw window and the summary levels
+            level = max(0, min(len(CHART_LEVELS), self._level + (1 if dy > 0 else -1)))
+            if level != self._level:
+                self._level = level
+                self._update_hover_index()
+                self._invalidate_data()
+            return True
+        if not self._view: return False
+        t0, t1 = self._view
+        # Zoom around the pointer
+        anchor = self._x_to_time(self._hover_x) if self._hover_x is not None else (t0 + t1) / 2
+        anchor = max(t0, min(t1, anchor))
+        span = max(REPLAY_MIN_SPAN, (t1 - t0) * 1.25 ** dy)
+        left = anchor - (anchor - t0) * span / max(t1 - t0, 1e-3)
+        self._set_view(left, left + span)
+        return True
+
+    def _on_drag_begin(self, gesture, x, y):
+        self._drag_view = self._view
+
+    def _on_drag_update(self, gesture, dx, dy):
+        if not self._replay or not self._drag_view: return
+        t0, t1 = self._drag_view
+        cw = self.get_width() - 50
+        if cw <= 0: return
+        shift = -dx / cw * (t1 - t0)
+        self._set_view(t0 + shift, t1 + shift)
+
+    def _on_pressed(self, gesture, n_press, x, y):
+        # Double click: back to the whole session
+        if self._replay and self._replay.times and n_press == 2:
+            self._set_view(self._replay.times[0], self._replay.times[-1])
 
     def _on_motion(self, controller, x, y):
         self._hover_x = x
@@ -124,7 +291,7 @@ class PerformanceChartWidget(Gtk.DrawingArea):
         self.queue_draw()
 
     def _update_hover_index(self) -> None:
-        if self._hover_x is None or not self._history:
+        if self._hover_x is None or not self._view_size()[0]:
             self._hover_index = None
             return
         width = self.get_width()
@@ -137,8 +304,8 @@ class PerformanceChartWidget(Gtk.DrawingArea):
         if self._hover_x < margin_left or self._hover_x > width - margin_right:
             self._hover_index = None
             return
-        num_points = len(self._history)
-        x_step = chart_width / max(CHART_MAX_HISTORY - 1, 1)
+        num_points, capacity = self._view_size()
+        x_step = chart_width / max(capacity - 1, 1)
         start_x = margin_left + chart_width - (num_points - 1) * x_step
         relative_x = self._hover_x - start_x
         index = round(relative_x / x_step) if x_step > 0 else 0
@@ -147,145 +314,456 @@ class PerformanceChartWidget(Gtk.DrawingArea):
 
     def _on_draw(self, area, cr, width, height):
         try:
-            cr.set_source_rgba(0.12, 0.12, 0.12, 1.0)
-            cr.rectangle(0, 0, width, height)
-            cr.fill()
             margin_left = 40
             margin_right = 10
             margin_top = 20
             margin_bottom = 30
             chart_width = width - margin_left - margin_right
             chart_height = height - margin_top - margin_bottom
+            geometry = (width, height, margin_left, margin_top, chart_width, chart_height)
+            scale = self.get_scale_factor()
+            # Background/grid only change with the size; series and legend with the data.
+            # Hover just repaints both surfaces and draws the tooltip on top.
+            self._paint_layer(cr, 'static', (width, height, scale), lambda c: self._draw_static(c, *geometry))
             if chart_width <= 0 or chart_height <= 0: return
-            cr.set_source_rgba(0.3, 0.3, 0.3, 0.3)
-            cr.set_line_width(1)
-            for i in range(4):
-                y = margin_top + (chart_height * i / 3)
-                cr.move_to(margin_left, y)
-                cr.line_to(margin_left + chart_width, y)
-                cr.stroke()
-            if not self._history:
-                cr.set_source_rgba(0.5, 0.5, 0.5, 1)
-                cr.set_font_size(14)
-                text = _("Waiting for data...")
-                extents = cr.text_extents(text)
-                cr.move_to(margin_left + (chart_width - extents.width)/2, margin_top + chart_height/2)
-                cr.show_text(text)
-                return
-            lat_vals = [p.latency for p in self._history]
-            fps_vals = [p.fps for p in self._history]
-            bw_vals = [p.bandwidth for p in self._history]
-            lat_norm = [v / max(1, self.max_latency) for v in lat_vals]
-            fps_norm = [v / max(1, self.max_fps) for v in fps_vals]
-            bw_norm = [v / max(1, self.max_bandwidth) for v in bw_vals]
-            self._draw_line(cr, chart_width, chart_height, margin_left, margin_top, bw_norm, (0.0, 0.6, 1.0, 1.0), fill=True)
-            self._draw_line(cr, chart_width, chart_height, margin_left, margin_top, fps_norm, (0.0, 0.8, 0.2, 1.0), fill=False)
-            active_devices = set()
-            for p in self._history:
-                active_devices.update(p.device_latencies.keys())
-            if not active_devices:
-                self._draw_line(cr, chart_width, chart_height, margin_left, margin_top, lat_norm, (1.0, 0.4, 0.0, 1.0))
-            else:
-                for dev_name in active_devices:
-                    dev_vals = []
-                    for p in self._history:
-                        val = p.device_latencies.get(dev_name, 0) 
-                        dev_vals.append(val / max(1, self.max_latency))
-                    color = self._get_device_color(dev_name)
-                    self._draw_line(cr, chart_width, chart_height, margin_left, margin_top, dev_vals, color, fill=False)
-            self._draw_legend(cr, width, height, margin_left, active_devices)
-            if self._hover_index is not None and 0 <= self._hover_index < len(self._history):
-                self._draw_tooltip(cr, width, height, margin_left, margin_top, chart_width, chart_height)
-            if self._history:
-                last_point = self._history[-1]
-                if last_point.users_count > 0:
-                    text = _("{} Active Devices").format(last_point.users_count)
-                    cr.set_font_size(14)
-                    ext = cr.text_extents(text)
-                    box_x = width - ext.width - 25
-                    box_y = margin_top + 5
-                    cr.set_source_rgba(0.2, 0.2, 0.2, 0.8)
-                    cr.rectangle(box_x - 5, box_y - 12, ext.width + 10, ext.height + 15)
-                    cr.fill()
-                    cr.set_source_rgba(1, 1, 1, 1)
-                    cr.move_to(box_x, box_y + ext.height)
-                    cr.show_text(text)
+            self._paint_layer(cr, 'data', (width, height, scale, self._data_version), lambda c: self._draw_data(c, *geometry))
+            if self._replay is not None:
+                self._draw_replay_overlay(cr, *geometry)
+            elif self._hover_index is not None and 0 <= self._hover_index < self._view_size()[0]:
+                self._draw_tooltip(cr, *geometry)
         except Exception:
             pass
 
-    def _draw_line(self, cr, w, h, mx, my, vals, color, fill=False):
-        if not vals: return
-        cr.set_source_rgba(*color)
+    def _paint_layer(self, cr, name, key, paint):
+        """Paints a cached surface, rendering it again only when key changes"""
+        if cairo is None:
+            paint(cr)
+            return
+        cached = self._layers.get(name)
+        if cached is None or cached[0] != key:
+            # Similar surfaces inherit the device scale, so this stays sharp on HiDPI
+            surface = cr.get_target().create_similar(cairo.CONTENT_COLOR_ALPHA, key[0], key[1])
+            paint(cairo.Context(surface))
+            cached = self._layers[name] = (key, surface)
+        cr.set_source_surface(cached[1], 0, 0)
+        cr.paint()
+
+    def _invalidate_data(self):
+        self._data_version += 1
+        self.queue_draw()
+
+    def _draw_static(self, cr, width, height, margin_left, margin_top, chart_width, chart_height):
+        cr.set_source_rgba(0.12, 0.12, 0.12, 1.0)
+        cr.rectangle(0, 0, width, height)
+        cr.fill()
+        if chart_width <= 0 or chart_height <= 0: return
+        cr.set_source_rgba(0.3, 0.3, 0.3, 0.3)
+        cr.set_line_width(1)
+        for i in range(4):
+            y = margin_top + (chart_height * i / 3)
+            cr.move_to(margin_left, y)
+            cr.line_to(margin_left + chart_width, y)
+            cr.stroke()
+
+    def _draw_data(self, cr, width, height, margin_left, margin_top, chart_width, chart_height):
+        if self._replay is not None:
+            self._draw_replay(cr, width, height, margin_left, margin_top, chart_width, chart_height)
+            return
+        if not len(self._history):
+            self._draw_placeholder(cr, _("Waiting for data..."), margin_left, margin_top, chart_width, chart_height)
+            return
+        if self._level:
+            self._draw_summary(cr, width, height, margin_left, margin_top, chart_width, chart_height)
+            return
+        h = self._history
+        geom = (chart_width, chart_height, margin_left, margin_top)
+        self._draw_line(cr, *geom, [v / max(1, self.max_bandwidth) for v in h.column('bandwidth')], (0.0, 0.6, 1.0, 1.0), fill=True)
+        self._draw_line(cr, *geom, [v / max(1, self.max_fps) for v in h.column('fps')], (0.0, 0.8, 0.2, 1.0), fill=False)
+        active_devices = h.devices('lat')
+        if not active_devices:
+            self._draw_line(cr, *geom, [v / max(1, self.max_latency) for v in h.column('latency')], (1.0, 0.4, 0.0, 1.0))
+        else:
+            for dev_name in active_devices:
+                dev_vals = [v / max(1, self.max_latency) for v in h.device_column('lat', dev_name)]
+                self._draw_line(cr, *geom, dev_vals, self._get_device_color(dev_name), fill=False)
+        # Per-guest upload (host -> guest), dashed in the guest's color
+        for dev_name in h.devices('tx'):
+            dev_vals = [v / max(1, self.max_bandwidth) for v in h.device_column('tx', dev_name)]
+            cr.set_dash([4, 3])
+            self._draw_line(cr, *geom, dev_vals, self._get_device_color(dev_name), fill=False)
+            cr.set_dash([])
+        self._draw_resources(cr, geom, lambda kind, group: h.column((kind, group)), h.groups(), CHART_MAX_HISTORY)
+        last_point = PerformanceDataPoint.from_history(h, -1)
+        self._draw_legend(cr, width, height, margin_left, active_devices, last_point)
+        self._draw_users_badge(cr, width, margin_top, last_point.users_count)
+
+    def _draw_resources(self, cr, geom, column, groups, capacity):
+        """CPU and GPU busy of the host and the watched process groups, on a fixed 0-100 % scale"""
+        for group in groups:
+            color = self._group_color(group)
+            for kind, dash in (('cpu', CPU_DASH), ('gpu', GPU_DASH)):
+                vals = column(kind, group)
+                if all(v != v for v in vals): continue
+                cr.set_dash(dash)
+                self._draw_line(cr, *geom, [v / 100 for v in vals], color, capacity=capacity)
+        cr.set_dash([])
+
+    def _draw_users_badge(self, cr, width, margin_top, users):
+        if users <= 0: return
+        text = _("{} Active Devices").format(users)
+        cr.set_font_size(14)
+        ext = cr.text_extents(text)
+        box_x = width - ext.width - 25
+        box_y = margin_top + 5
+        cr.set_source_rgba(0.2, 0.2, 0.2, 0.8)
+        cr.rectangle(box_x - 5, box_y - 12, ext.width + 10, ext.height + 15)
+        cr.fill()
+        cr.set_source_rgba(1, 1, 1, 1)
+        cr.move_to(box_x, box_y + ext.height)
+        cr.show_text(text)
+
+    def _view_size(self):
+        """(points shown, slots across the chart) for the live window"""
+        if self._level:
+            level = self._history.levels[self._level - 1]
+            return min(len(level), level.ring.capacity), level.ring.capacity
+        return len(self._history), CHART_MAX_HISTORY
+
+    def _draw_summary(self, cr, width, height, mx, my, cw, ch):
+        """Live window from a summary level: average lines over a min-max band"""
+        h = self._history
+        level = h.levels[self._level - 1]
+        geom = (cw, ch, mx, my)
+        cap = level.ring.capacity
+        norm = lambda values, vmax: [v / max(1, vmax) for v in values]
+        bw_color, fps_color, lat_color = (0.0, 0.6, 1.0, 1.0), (0.0, 0.8, 0.2, 1.0), (1.0, 0.4, 0.0, 1.0)
+        self._draw_line(cr, *geom, norm(level.column('avg', 'bandwidth'), self.max_bandwidth), bw_color, fill=True, capacity=cap)
+        self._draw_band(cr, *geom, norm(level.column('min', 'fps'), self.max_fps), norm(level.column('max', 'fps'), self.max_fps), fps_color, cap)
+        self._draw_line(cr, *geom, norm(level.column('avg', 'fps'), self.max_fps), fps_color, capacity=cap)
+        devices = h.devices('lat', level)
+        series = [(('lat', h.device_ids[d]), self._get_device_color(d)) for d in devices] or [('latency', lat_color)]
+        for key, color in series:
+            self._draw_band(cr, *geom, norm(level.column('min', key), self.max_latency), norm(level.column('max', key), self.max_latency), color, cap)
+            self._draw_line(cr, *geom, norm(level.column('avg', key), self.max_latency), color, capacity=cap)
+        cr.set_dash([4, 3])
+        for dev in h.devices('tx', level):
+            self._draw_line(cr, *geom, norm(level.column('avg', ('tx', h.device_ids[dev])), self.max_bandwidth), self._get_device_color(dev), capacity=cap)
+        cr.set_dash([])
+        self._draw_resources(cr, geom, lambda kind, group: level.column('avg', (kind, group)), h.groups(level), cap)
+        # Window length above the chart
+        cr.set_source_rgba(0.7, 0.7, 0.7, 1)
+        cr.set_font_size(10)
+        cr.move_to(mx, my - 6)
+        cr.show_text(CHART_WINDOW_LABELS[self._level] + " · " + _("avg, min–max"))
+        last_point = PerformanceDataPoint.from_history(h, -1)
+        self._draw_legend(cr, width, height, mx, h.devices('lat'), last_point)
+        self._draw_users_badge(cr, width, my, last_point.users_count)
+
+    def _draw_placeholder(self, cr, text, mx, my, cw, ch):
+        cr.set_source_rgba(0.5, 0.5, 0.5, 1)
+        cr.set_font_size(14)
+        extents = cr.text_extents(text)
+        cr.move_to(mx + (cw - extents.width)/2, my + ch/2)
+        cr.show_text(text)
+
+    def _replay_series(self, t0, t1, cw):
+        """Downsampled series, scales and averages of the visible range, cached per view"""
+        key = (t0, t1, cw)
+        if self._replay_cache and self._replay_cache[0] == key:
+            return self._replay_cache[1]
+        r = self._replay
+        buckets = max(10, cw // 2)
+        def mean(ts, vals):
+            lo, hi = bisect_left(ts, t0), bisect_right(ts, t1)
+            return sum(vals[lo:hi]) / (hi - lo) if hi > lo else None
+        view = {
+            'series': {k: minmax_downsample(ts, vals, t0, t1, buckets) for k, (ts, vals) in r.series.items()},
+            'devices': {d: minmax_downsample(ts, vals, t0, t1, buckets) for d, (ts, vals) in r.device_latencies.items()},
+            'device_tx': {d: minmax_downsample(ts, tx, t0, t1, buckets) for d, (ts, tx, _rx) in r.device_bandwidth.items()},
+            'avg': {k: mean(ts, vals) for k, (ts, vals) in r.series.items()},
+            'device_avg': {d: mean(ts, vals) for d, (ts, vals) in r.device_latencies.items()},
+            # Lines further apart than a bucket (or REPLAY_GAP) are not joined
+            'gap': max(REPLAY_GAP, 2 * (t1 - t0) / buckets),
+        }
+        view['devices'] = {d: v for d, v in view['devices'].items() if v[0]}
+        view['device_tx'] = {d: v for d, v in view['device_tx'].items() if v[0]}
+        peak = lambda *lists: max([v for ys in lists for v in ys] or [0])
+        view['max_latency'] = max(10.0, 1.2 * peak(view['series']['latency'][1], *(ys for _xs, ys in view['devices'].values())))
+        view['max_fps'] = max(30.0, 1.2 * peak(view['series']['fps'][1]))
+        view['max_bandwidth'] = max(1.0, 1.2 * peak(view['series']['bandwidth'][1], *(ys for _xs, ys in view['device_tx'].values())))
+        self._replay_cache = (key, view)
+        return view
+
+    def _draw_time_series(self, cr, xs, ys, t0, t1, mx, my, cw, ch, vmax, gap, color, fill=False):
+        if not xs: return
+        span = max(t1 - t0, 1e-3)
+        segments, current, prev = [], [], None
+        for t, v in zip(xs, ys):
+            if prev is not None and t - prev > gap:
+                segments.append(current)
+                current = []
+            current.append((mx + (t - t0) / span * cw, my + ch * (1 - min(v / vmax, 1.0))))
+            prev = t
+        segments.append(current)
+        cr.save()
+        cr.rectangle(mx, my, cw, ch)
+        cr.clip()
         cr.set_line_width(2)
-        x_step = w / max(CHART_MAX_HISTORY - 1, 1)
+        for seg in segments:
+            cr.set_source_rgba(*color)
+            cr.move_to(*seg[0])
+            for pt in seg[1:]: cr.line_to(*pt)
+            if len(seg) == 1: cr.line_to(seg[0][0] + 1, seg[0][1])
+            cr.stroke()
+            if fill and len(seg) > 1:
+                cr.set_source_rgba(color[0], color[1], color[2], 0.15)
+                cr.move_to(*seg[0])
+                for pt in seg[1:]: cr.line_to(*pt)
+                cr.line_to(seg[-1][0], my + ch)
+                cr.line_to(seg[0][0], my + ch)
+                cr.close_path()
+                cr.fill()
+        cr.restore()
+
+    def _draw_replay(self, cr, w, h, mx, my, cw, ch):
+        if not self._view:
+            self._draw_placeholder(cr, _("No samples in this session"), mx, my, cw, ch)
+            return
+        t0, t1 = self._view
+        view = self._replay_series(t0, t1, int(cw))
+        gap = view['gap']
+        lat_color, fps_color, bw_color = (1.0, 0.4, 0.0, 1.0), (0.0, 0.8, 0.2, 1.0), (0.0, 0.6, 1.0, 1.0)
+        self._draw_time_series(cr, *view['series']['bandwidth'], t0, t1, mx, my, cw, ch, view['max_bandwidth'], gap, bw_color, fill=True)
+        self._draw_time_series(cr, *view['series']['fps'], t0, t1, mx, my, cw, ch, view['max_fps'], gap, fps_color)
+        if not view['devices']:
+            self._draw_time_series(cr, *view['series']['latency'], t0, t1, mx, my, cw, ch, view['max_latency'], gap, lat_color)
+        for dev, (xs, ys) in view['devices'].items():
+            self._draw_time_series(cr, xs, ys, t0, t1, mx, my, cw, ch, view['max_latency'], gap, self._get_device_color(dev))
+        cr.set_dash([4, 3])
+        for dev, (xs, ys) in view['device_tx'].items():
+            self._draw_time_series(cr, xs, ys, t0, t1, mx, my, cw, ch, view['max_bandwidth'], gap, self._get_device_color(dev))
+        cr.set_dash([])
+
+        # Visible time range above the chart
+        cr.set_source_rgba(0.7, 0.7, 0.7, 1)
+        cr.set_font_size(10)
+        fmt = '%H:%M:%S' if t1 - t0 < 86400 else '%d/%m %H:%M'
+        left, right = datetime.fromtimestamp(t0).strftime(fmt), datetime.fromtimestamp(t1).strftime(fmt)
+        cr.move_to(mx, my - 6)
+        cr.show_text(left)
+        cr.move_to(mx + cw - cr.text_extents(right).width, my - 6)
+        cr.show_text(right)
+        span = t1 - t0
+        span_text = f"{span / 3600:.1f} h" if span >= 3600 else (f"{span / 60:.0f} min" if span >= 120 else f"{span:.0f} s")
+        cr.move_to(mx + (cw - cr.text_extents(span_text).width) / 2, my - 6)
+        cr.show_text(span_text)
+
+        # Legend: averages over the visible range
+        avg = view['avg']
+        fmt_avg = lambda v, unit: f"{v:.0f}{unit}" if v is not None else "--"
+        items = []
+        if view['devices']:
+            items += [(dev, "avg " + fmt_avg(view['device_avg'].get(dev), "ms"), self._get_device_color(dev)) for dev in view['devices']]
+        else:
+            items.append((_("Latency"), "avg " + fmt_avg(avg['latency'], " ms"), lat_color))
+        items.append(("FPS", "avg " + fmt_avg(avg['fps'], ""), fps_color))
+        items.append(("BW", "avg " + (f"{avg['bandwidth']:.1f} Mbps" if avg['bandwidth'] is not None else "--"), bw_color))
+        self._draw_legend_items(cr, w, h, mx, items)
+
+    def _draw_replay_overlay(self, cr, w, h, mx, my, cw, ch):
+        r = self._replay
+        if self._hover_x is None or not (mx <= self._hover_x <= mx + cw) or not r.times or not self._view: return
+        t0, t1 = self._view
+        # Scrub: nearest recorded sample
+        t = self._x_to_time(self._hover_x)
+        i = bisect_left(r.times, t)
+        if i > 0 and (i == len(r.times) or t - r.times[i - 1] < r.times[i] - t): i -= 1
+        ts = r.times[i]
+        hover_x = mx + (ts - t0) / max(t1 - t0, 1e-3) * cw
+        lines = [datetime.fromtimestamp(ts).strftime('%d/%m %H:%M:%S')]
+        for dev, (dts, vals) in r.device_latencies.items():
+            lat = value_at(dts, vals, ts)
+            if lat is not None: lines.append(f"{dev}: {lat:.0f} ms")
+            if dev in r.device_bandwidth:
+                bts, txs, rxs = r.device_bandwidth[dev]
+                tx, rx = value_at(bts, txs, ts), value_at(bts, rxs, ts)
+                if tx is not None: lines.append(f"  ↑ {tx:.1f}  ↓ {rx:.1f} Mbps")
+        if not r.device_latencies:
+            lat = value_at(*r.series['latency'], ts)
+            lines.append(f"Lat: {lat:.0f} ms" if lat is not None else "Lat: --")
+        fps, bw = value_at(*r.series['fps'], ts), value_at(*r.series['bandwidth'], ts)
+        lines.append(f"FPS: {fps:.0f} FPS" if fps is not None else "FPS: --")
+        lines.append(f"BW: {bw:.1f} Mbps" if bw is not None else "BW: --")
+        if r.users[i]: lines.append(_("{} Active Devices").format(r.users[i]))
+        self._draw_tooltip_box(cr, w, hover_x, my, ch, lines)
+
+    def _line_segments(self, w, h, mx, my, vals, capacity):
+        """Runs of points between missing (NaN) values"""
+        x_step = w / max(capacity - 1, 1)
         sx = mx + w - (len(vals) - 1) * x_step
-        for i, v in enumerate(vals): 
-            if i == 0:
-                cr.move_to(sx + i * x_step, my + h * (1 - v))
-            else:
-                cr.line_to(sx + i * x_step, my + h * (1 - v))
-        cr.stroke()
-        if fill:
-            cr.set_source_rgba(color[0], color[1], color[2], 0.15)
-            for i, v in enumerate(vals): 
-                if i == 0:
-                    cr.move_to(sx + i * x_step, my + h * (1 - v))
-                else:
-                    cr.line_to(sx + i * x_step, my + h * (1 - v))
-            cr.line_to(sx + (len(vals) - 1) * x_step, my + h)
-            cr.line_to(sx, my + h)
+        segments, current = [], []
+        for i, v in enumerate(vals):
+            if v != v:
+                if current: segments.append(current)
+                current = []
+                continue
+            current.append((sx + i * x_step, my + h * (1 - min(v, 1.0))))
+        if current: segments.append(current)
+        return segments
+
+    def _draw_line(self, cr, w, h, mx, my, vals, color, fill=False, capacity=CHART_MAX_HISTORY):
+        if not vals: return
+        cr.set_line_width(2)
+        for seg in self._line_segments(w, h, mx, my, vals, capacity):
+            cr.set_source_rgba(*color)
+            cr.move_to(*seg[0])
+            for pt in seg[1:]: cr.line_to(*pt)
+            if len(seg) == 1: cr.line_to(seg[0][0] + 1, seg[0][1])
+            cr.stroke()
+            if fill and len(seg) > 1:
+                cr.set_source_rgba(color[0], color[1], color[2], 0.15)
+                cr.move_to(*seg[0])
+                for pt in seg[1:]: cr.line_to(*pt)
+                cr.line_to(seg[-1][0], my + h)
+                cr.line_to(seg[0][0], my + h)
+                cr.close_path()
+                cr.fill()
+
+    def _draw_band(self, cr, w, h, mx, my, lows, highs, color, capacity):
+        cr.set_source_rgba(color[0], color[1], color[2], 0.18)
+        # lows/highs are missing in the same buckets
+        for low, high in zip(self._line_segments(w, h, mx, my, lows, capacity), self._line_segments(w, h, mx, my, highs, capacity)):
+            cr.move_to(*high[0])
+            for pt in high[1:]: cr.line_to(*pt)
+            for pt in reversed(low): cr.line_to(*pt)
             cr.close_path()
             cr.fill()
 
-    def _draw_legend(self, cr, w, h, margin_left, active_devices=None):
+    def _draw_legend_items(self, cr, w, h, margin_left, items):
+        """items: [(label, value text, color)]; items that don't fit start a new row above"""
         legend_y = h - 10
-        def draw_item(label, val_text, color, x_offset):
+        offset = 0
+        cr.set_font_size(11)
+        for label, val_text, color in items:
+            # Limpar nome para legenda
+            text = f"{label.split('(')[0].strip()}: {val_text}"
+            if offset and margin_left + offset + 10 + cr.text_extents(text).width > w:
+                legend_y -= 15
+                offset = 0
             cr.set_source_rgba(*color)
-            cr.arc(margin_left + x_offset, legend_y - 4, 4, 0, 2*3.14159)
+            cr.arc(margin_left + offset, legend_y - 4, 4, 0, 2*3.14159)
             cr.fill()
             cr.set_source_rgba(0.9, 0.9, 0.9, 1)
             cr.set_font_size(11)
-            cr.move_to(margin_left + x_offset + 10, legend_y)
-            # Limpar nome para legenda
-            clean_label = label.split('(')[0].strip()
-            text = f"{clean_label}: {val_text}"
+            cr.move_to(margin_left + offset + 10, legend_y)
             cr.show_text(text)
-            return cr.text_extents(text).width + 30
-        offset = 0
+            offset += cr.text_extents(text).width + 30
+
+    def _draw_legend(self, cr, w, h, margin_left, active_devices, last_point):
+        items = []
+        def p95_text(dev):
+            st = self._cur_stats.get(dev)
+            return f" (p95 {st.p95:.0f})" if st and st.samples >= 5 else ""
         if not active_devices:
-            offset += draw_item(_("Latency"), self._cur_latency_text, (1.0, 0.4, 0.0, 1.0), offset)
+            items.append((_("Latency"), last_point.latency_text + p95_text(None), (1.0, 0.4, 0.0, 1.0)))
         else:
-            last_point = self._history[-1] if self._history else None
             for dev in active_devices:
-                val = last_point.device_latencies.get(dev, 0) if last_point else 0
+                val = last_point.device_latencies.get(dev, 0)
                 color = self._get_device_color(dev)
-                offset += draw_item(dev, f"{val:.0f}ms", color, offset)
-        offset += draw_item("FPS", self._cur_fps_text, (0.0, 0.8, 0.2, 1.0), offset)
-        if offset > w - 100: 
-            legend_y -= 15
-            offset = 0
-        draw_item("BW", self._cur_bw_text, (0.0, 0.6, 1.0, 1.0), offset)
+                bw = last_point.device_bandwidth.get(dev)
+                text = f"{val:.0f}ms" + p95_text(dev) + (f" · {bw[0]:.1f} Mbps" if bw else "")
+                items.append((dev, text, color))
+        fps_text = last_point.fps_text
+        if self._fps_stats and self._fps_stats.fps_avg > 0:
+            fps_text += f" ({self._fps_stats.fps_stability * 100:.0f}%)"
+        items.append(("FPS", fps_text, (0.0, 0.8, 0.2, 1.0)))
+        items.append(("BW", last_point.bandwidth_text, (0.0, 0.6, 1.0, 1.0)))
+        for group in self._in_group_order(last_point.resources):
+            usage = last_point.resources[group]
+            text = f"CPU {usage['cpu']:.0f}%" + (f" · GPU {usage['gpu']:.0f}%" if 'gpu' in usage else "")
+            items.append((self._group_label(group), text, self._group_color(group)))
+        self._draw_legend_items(cr, w, h, margin_left, items)
+
+    def _stats_lines(self, dev):
+        """Window percentiles and jitter of a device for the tooltip"""
+        st = self._cur_stats.get(dev)
+        if not st or st.samples < 5: return []
+        return [f"  p50 {st.p50:.0f} · p95 {st.p95:.0f} · p99 {st.p99:.0f} ms",
+                f"  jitter {st.jitter:.1f} · σ {st.stddev:.1f} ms"]
 
     def _draw_tooltip(self, cr, w, h, mx, my, cw, ch):
-        point = list(self._history)[self._hover_index]
-        num_points = len(self._history)
-        x_step = cw / max(CHART_MAX_HISTORY - 1, 1)
+        num_points, capacity = self._view_size()
+        x_step = cw / max(capacity - 1, 1)
         start_x = mx + cw - (num_points - 1) * x_step
         hover_x = start_x + self._hover_index * x_step
-        cr.set_source_rgba(1, 1, 1, 0.4)
-        cr.set_line_width(1)
-        cr.move_to(hover_x, my)
-        cr.line_to(hover_x, my + ch)
-        cr.stroke()
+        if self._level:
+            self._draw_tooltip_box(cr, w, hover_x, my, ch, self._bucket_lines(self._hover_index))
+            return
+        # Only the hovered sample gets formatted
+        point = PerformanceDataPoint.from_history(self._history, self._hover_index)
         lines = []
         if point.device_latencies:
             for dev, lat in point.device_latencies.items():
                 lines.append(f"{dev}: {lat:.0f} ms")
+                if dev in point.device_bandwidth:
+                    tx, rx = point.device_bandwidth[dev]
+                    lines.append(f"  ↑ {tx:.1f}  ↓ {rx:.1f} Mbps")
+                lines += self._stats_lines(dev)
         else:
             lines.append(f"Lat: {point.latency_text}")
+            lines += self._stats_lines(None)
         lines.append(f"FPS: {point.fps_text}")
+        if self._fps_stats and self._fps_stats.fps_avg > 0:
+            fs = self._fps_stats
+            lines.append(f"  avg {fs.fps_avg:.0f} · 1% low {fs.fps_low:.0f} · {fs.fps_stability * 100:.0f}% steady")
         lines.append(f"BW: {point.bandwidth_text}")
-        box_width = 130
+        lines += self._resource_lines(point.resources)
+        self._draw_tooltip_box(cr, w, hover_x, my, ch, lines)
+
+    def _resource_lines(self, resources):
+        lines = []
+        for group in self._in_group_order(resources):
+            usage = resources[group]
+            text = f"{self._group_label(group)}: CPU {usage['cpu']:.0f}%"
+            if 'gpu' in usage: text += f" · GPU {usage['gpu']:.0f}%"
+            lines.append(text)
+            if group != 'host':
+                lines.append(f"  {usage.get('rss', 0):.0f} MB · " + _("{} threads").format(int(usage.get('threads', 0))) +
+                             f" · I/O {usage.get('read', 0):.1f}/{usage.get('write', 0):.1f} MB/s")
+        return lines
+
+    def _bucket_lines(self, index):
+        """Tooltip of one summary bucket: min / avg / max per series"""
+        h = self._history
+        level = h.levels[self._level - 1]
+        col = lambda kind, key: level.column(kind, key)[index]
+        start = col('t', None)
+        lines = [datetime.fromtimestamp(start).strftime('%H:%M:%S') + " – " +
+                 datetime.fromtimestamp(start + level.bucket).strftime('%H:%M:%S')]
+        def stat(label, key, unit, digits=0):
+            lo, avg, hi = col('min', key), col('avg', key), col('max', key)
+            if avg != avg: return
+            lines.append(f"{label}: {avg:.{digits}f} {unit}  ({lo:.{digits}f}–{hi:.{digits}f})")
+        devices = h.devices('lat', level)
+        for dev in devices:
+            stat(dev, ('lat', h.device_ids[dev]), "ms")
+        if not devices:
+            stat("Lat", 'latency', "ms")
+        stat("FPS", 'fps', "FPS")
+        stat("BW", 'bandwidth', "Mbps", 1)
+        for group in self._in_group_order(h.groups(level)):
+            stat(f"{self._group_label(group)} CPU", ('cpu', group), "%")
+            stat(f"{self._group_label(group)} GPU", ('gpu', group), "%")
+        return lines
+
+    def _draw_tooltip_box(self, cr, w, hover_x, my, ch, lines):
+        cr.set_source_rgba(1, 1, 1, 0.4)
+        cr.set_line_width(1)
+        cr.move_to(hover_x, my)
+        cr.line_to(hover_x, my + ch)
+        cr.stroke()
+        cr.set_font_size(10)
+        box_width = max([130] + [cr.text_extents(l).width + 16 for l in lines])
         box_height = 20 + (len(lines) * 14)
         tooltip_x = min(w - box_width - 10, max(10, hover_x + 10))
         tooltip_y = my + 10
@@ -300,6 +778,28 @@ class PerformanceChartWidget(Gtk.DrawingArea):
             cr.show_text(line)
             y_off += 14
 
+class GuestItem(GObject.Object):
+    """One guest in the monitor list, keyed by IP (session id when there is none)."""
+    __gtype_name__ = 'BigRemotePlayGuestItem'
+
+    key = GObject.Property(type=str, default='')
+    name = GObject.Property(type=str, default='')
+    # Name as shown in the chart, keeps the row's color in sync with its line
+    full_name = GObject.Property(type=str, default='')
+    ip = GObject.Property(type=str, default='')
+    session_id = GObject.Property(type=str, default='')
+    subtitle = GObject.Property(type=str, default='')
+    latency = GObject.Property(type=float, default=0.0)
+
+    def update(self, **values) -> bool:
+        """Sets only what changed (each change notifies the row); True if anything did"""
+        changed = False
+        for k, v in values.items():
+            if getattr(self.props, k) != v:
+                setattr(self.props, k, v)
+                changed = True
+        return changed
+
 class PerformanceMonitor(Gtk.Box):
     """
     Wrapper for performance chart.
@@ -309,7 +809,6 @@ class PerformanceMonitor(Gtk.Box):
     def __init__(self, sunshine=None):
         super().__init__(orientation=Gtk.Orientation.VERTICAL)
         self.sunshine = sunshine
-        self.hostname_cache = {}
         self.add_css_class('card')
         self.set_margin_top(12)
         self.set_margin_bottom(12)
@@ -325,6 +824,32 @@ class PerformanceMonitor(Gtk.Box):
         self._title_label.set_halign(Gtk.Align.START)
         self._title_label.set_hexpand(True)
         self._header.append(self._title_label)
+        self._live_title = _("Real-time Monitoring")
+        # Recorded sessions (replay) and the way back to live data
+        self._live_btn = Gtk.Button(label=_("Live"))
+        self._live_btn.add_css_class('flat')
+        self._live_btn.set_visible(False)
+        self._live_btn.connect('clicked', lambda b: self._exit_replay())
+        self._header.append(self._live_btn)
+        self._history_list = Gtk.ListBox()
+        self._history_list.set_selection_mode(Gtk.SelectionMode.NONE)
+        self._history_list.add_css_class('boxed-list')
+        history_scroll = Gtk.ScrolledWindow()
+        history_scroll.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+        history_scroll.set_propagate_natural_height(True)
+        history_scroll.set_max_content_height(360)
+        history_scroll.set_min_content_width(300)
+        history_scroll.set_child(self._history_list)
+        self._history_popover = Gtk.Popover()
+        self._history_popover.set_child(history_scroll)
+        self._history_popover.connect('show', lambda p: self._refresh_sessions())
+        self._history_btn = Gtk.MenuButton()
+        self._history_btn.set_child(create_icon_widget('document-open-recent-symbolic', size=16))
+        self._history_btn.add_css_class('flat')
+        self._history_btn.set_tooltip_text(_("Recorded sessions"))
+        self._history_btn.set_popover(self._history_popover)
+        self._history_btn.set_visible(METRICS_PATH.exists())
+        self._header.append(self._history_btn)
         self._status_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=6)
         self._status_icon = create_icon_widget("network-idle-symbolic", size=16)
         self._status_label = Gtk.Label(label=_("Disconnected"))
@@ -341,6 +866,10 @@ class PerformanceMonitor(Gtk.Box):
         self._details_frame.set_visible(False)
         self._details_list = Gtk.ListBox()
         self._details_list.add_css_class('boxed-list')
+        # Rows follow the model: only changed guests are touched on each update
+        self._guest_store = Gio.ListStore(item_type=GuestItem)
+        self._guest_items = {}
+        self._details_list.bind_model(self._guest_store, self._create_guest_row)
         self._details_frame.set_child(self._details_list)
         self.append(self._details_frame)
         self.chart = PerformanceChartWidget()
@@ -351,15 +880,26 @@ class PerformanceMonitor(Gtk.Box):
         self._target_bw = 10.0
         self._last_fps = 60.0
         self._last_bandwidth = 10.0
-        
-        # Cache para persistência de dispositivos
-        # Key: IP, Value: {'name': str, 'last_seen': float, 'last_latency': float}
-        self._known_devices = {} 
-        
-        self._data_queue = queue.Queue()
+
+        # API, sockets, pings and device persistence (no GTK, shared with the headless monitor)
+        self.collector = MetricsCollector(self.sunshine)
+        self.collector.on_update_needed = self._on_update_needed
+
+        # Latest sample for the UI; one idle callback per new value, older ones are dropped
+        self._mailbox = None
+        self._mailbox_lock = threading.Lock()
         self._worker_thread = None
         self._worker_running = False
         self._worker_event = threading.Event()
+        self._unsubscribe_events = None
+        # Opt-in (config 'record_metrics'), created on start_monitoring
+        self._recorder = None
+        # Threshold rules (config 'alert_rules'), loaded on start_monitoring
+        self._alerts = None
+        self._alert_stats = None
+        self._logger = None
+        # Set by the worker; False when conntrack is not readable
+        self._guest_bw_available = True
         
     def set_target_fps(self, fps):
         """Sets the expected FPS for idle display"""
@@ -384,14 +924,143 @@ class PerformanceMonitor(Gtk.Box):
     def start_monitoring(self):
         if self.update_timer_active: return
         self.update_timer_active = True
-        GLib.timeout_add(100, self._process_data_queue)
+        self._start_recording()
+        self._start_alerts()
         self._start_worker_thread()
+        if self.sunshine and self._unsubscribe_events is None:
+            self._unsubscribe_events = self.sunshine.events.subscribe(self._on_sunshine_event)
         self.update_stats(0, 0, 0, [])
 
     def stop_monitoring(self): 
         if not self.update_timer_active: return
         self.update_timer_active = False
+        if self._unsubscribe_events:
+            self._unsubscribe_events()
+            self._unsubscribe_events = None
         self._stop_worker_thread()
+        if self._recorder: self._recorder.end_session()
+        if self._alerts: self._alerts.reset()
+
+    def _start_recording(self):
+        """Starts a recorded session when enabled in the preferences"""
+        try:
+            from utils.config import Config
+            config = Config()
+            if not config.get('record_metrics', False):
+                return
+            if self._recorder is None:
+                self._recorder = MetricsRecorder(retention_days=config.get('metrics_retention_days', 14))
+            self._recorder.start_session('host' if self.sunshine else 'guest')
+            self._history_btn.set_visible(True)
+        except Exception as e:
+            print(f"Error starting metrics recorder: {e}")
+            self._recorder = None
+
+    def _start_alerts(self):
+        try:
+            from utils.config import Config
+            config = Config()
+            # Default rules when the config has none
+            self._alerts = AlertEngine(config.get('alert_rules')) if config.get('alerts_enabled', True) else None
+            # Worker-owned, the chart's stats belong to the main loop
+            self._alert_stats = StreamStats(window=CHART_MAX_HISTORY)
+        except Exception as e:
+            print(f"Error loading alert rules: {e}")
+            self._alerts = None
+
+    def _check_alerts(self, sample, latency, fps, bandwidth, device_latencies):
+        """Worker side, on measured values only (0 = not measured, skipped); events go to the main loop"""
+        stats = self._alert_stats
+        for dev, lat in device_latencies.items():
+            stats.add_latency(dev, lat)
+        if not device_latencies and latency: stats.add_latency(None, latency)
+        stats.prune()
+        guest_stats = {dev: stats.summary(dev) for dev in stats.guests()}
+        values = metric_values(latency, fps, bandwidth, device_latencies, sample.device_bandwidth, sample.resources, guest_stats)
+        context = {'target_fps': self._target_fps, 'target_bandwidth': self._target_bw}
+        for event in self._alerts.evaluate(values, context, sample.timestamp):
+            GLib.idle_add(self._on_alert, event)
+
+    def _on_alert(self, event):
+        """Session log entry, plus a toast (or a desktop notification when the window is in the background)"""
+        if self._logger is None: self._logger = Logger()
+        if event.state == 'firing': self._logger.warning(f"Alert: {event.message}")
+        else: self._logger.info(f"Alert resolved: {event.message}")
+        window = self.get_root()
+        app = window.get_application() if hasattr(window, 'get_application') else None
+        notification_id = f"alert-{event.key}"
+        if event.state != 'firing':
+            if app: app.withdraw_notification(notification_id)
+        elif app and not window.is_active():
+            notification = Gio.Notification.new(_("Big Remote Play"))
+            notification.set_body(event.message)
+            app.send_notification(notification_id, notification)
+        elif hasattr(window, 'show_toast'):
+            window.show_toast(f"⚠ {event.message}")
+        return False
+
+    def _with_recorder(self, fn):
+        """fn(recorder) on the live recorder, or on a temporary one when not recording"""
+        recorder = self._recorder or MetricsRecorder()
+        try:
+            return fn(recorder)
+        finally:
+            if recorder is not self._recorder: recorder.close()
+
+    def _refresh_sessions(self):
+        def worker():
+            try: sessions = self._with_recorder(lambda r: r.sessions())
+            except Exception as e:
+                print(f"Error listing recorded sessions: {e}")
+                sessions = []
+            GLib.idle_add(self._fill_sessions, sessions)
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _fill_sessions(self, sessions):
+        while (row := self._history_list.get_first_child()):
+            self._history_list.remove(row)
+        sessions = [s for s in sessions if s['samples']]
+        if not sessions:
+            row = Adw.ActionRow(title=_("No recorded sessions"))
+            row.set_subtitle(_("Enable recording in Preferences → Advanced"))
+            self._history_list.append(row)
+            return False
+        for s in sessions:
+            title = datetime.fromtimestamp(s['started']).strftime('%d/%m/%Y %H:%M')
+            minutes = ((s['last'] or s['started']) - (s['first'] or s['started'])) / 60
+            row = Adw.ActionRow(title=title)
+            row.set_subtitle(f"{_('Host') if s['source'] == 'host' else _('Guest')} · {minutes:.0f} min · " + _("{} samples").format(s['samples']))
+            row.set_activatable(True)
+            row.connect('activated', lambda r, sid=s['id'], t=title: self._load_session(sid, t))
+            self._history_list.append(row)
+        return False
+
+    def _load_session(self, session_id, title):
+        self._history_popover.popdown()
+        def worker():
+            try:
+                samples = self._with_recorder(lambda r: r.query(session=session_id))
+                GLib.idle_add(self._show_replay, ReplayData.from_samples(samples, title))
+            except Exception as e:
+                print(f"Error loading recorded session: {e}")
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _show_replay(self, replay):
+        self.chart.load_replay(replay)
+        self._title_label.set_label(_("Replay") + f" · {replay.title}")
+        self._live_btn.set_visible(True)
+        return False
+
+    def _exit_replay(self):
+        self.chart.exit_replay()
+        self._title_label.set_label(self._live_title)
+        self._live_btn.set_visible(False)
+
+    def _on_sunshine_event(self, event):
+        """Session changes in the log trigger a sample right away instead of on the next tick"""
+        from host.sunshine_events import SESSION_STARTED, SESSION_ENDED, CLIENT_CONNECTED, CLIENT_DISCONNECTED
+        if event.kind in (SESSION_STARTED, SESSION_ENDED, CLIENT_CONNECTED, CLIENT_DISCONNECTED):
+            self._worker_event.set()
 
     def _start_worker_thread(self):
         if self._worker_running: return
@@ -407,83 +1076,59 @@ class PerformanceMonitor(Gtk.Box):
     def _stop_worker_thread(self):
         self._worker_running = False
         self._worker_event.set()
+        # Abort in-flight API requests instead of waiting for their timeout
+        self.collector.cancel()
         if self._worker_thread and self._worker_thread.is_alive():
             self._worker_thread.join(timeout=2.0)
 
     def _worker_loop(self):
-        time.sleep(1)
+        self._worker_event.wait(1)
+        self._worker_event.clear()
+        interval, previous = MONITOR_INTERVAL_ACTIVE, None
         while self._worker_running:
             try:
-                if not self._worker_running: break
-                self._fetch_and_process_data()
-                for _ in range(10): # ~1 segundo de pausa
-                    if not self._worker_running or self._worker_event.wait(timeout=0.1):
-                        break
+                sample = self._fetch_and_process_data()
+                interval = self._next_interval(interval, previous, sample)
+                if sample: previous = sample
+                # Set by stop, a Sunshine session event or a resolved hostname (wake early)
+                self._worker_event.wait(timeout=interval)
+                self._worker_event.clear()
             except Exception:
                 time.sleep(2)
+        self.collector.close()
 
-    def _process_data_queue(self):
-        if not self.update_timer_active: return False
-        try:
-            processed_count = 0
-            while not self._data_queue.empty() and processed_count < 10:
-                try:
-                    data = self._data_queue.get_nowait()
-                    if len(data) == 6:
-                        latency, fps, bandwidth, sessions, device_latencies, bw_text = data
-                    else:
-                        latency, fps, bandwidth, sessions, device_latencies = data
-                        bw_text = None
-                        
-                    self.update_stats(latency, fps, bandwidth, sessions, device_latencies, bw_text)
-                    processed_count += 1
-                except queue.Empty:
-                    break
-        except Exception:
-            pass
-        return True
+    def _next_interval(self, interval, previous, sample):
+        """Back to 1 s when guests are connected or the numbers moved, otherwise back off"""
+        if sample is None:
+            return min(MONITOR_INTERVAL_IDLE, interval * MONITOR_BACKOFF)
+        latency, fps, bandwidth, sessions = sample[:4]
+        if sessions: return MONITOR_INTERVAL_ACTIVE
+        if previous is not None:
+            changed = lambda a, b: abs(a - b) > 0.1 * max(abs(a), abs(b), 1.0)
+            p_latency, p_fps, p_bandwidth, p_sessions = previous[:4]
+            if len(p_sessions) != len(sessions) or changed(latency, p_latency) or changed(fps, p_fps) or changed(bandwidth, p_bandwidth):
+                return MONITOR_INTERVAL_ACTIVE
+        return min(MONITOR_INTERVAL_IDLE, interval * MONITOR_BACKOFF)
+
+    def _post_sample(self, data):
+        """Worker side of the mailbox: schedules the UI update only if none is pending"""
+        with self._mailbox_lock:
+            pending = self._mailbox is not None
+            self._mailbox = data
+        if not pending:
+            GLib.idle_add(self._deliver_sample)
+
+    def _deliver_sample(self):
+        with self._mailbox_lock:
+            data, self._mailbox = self._mailbox, None
+        if data is not None and self.update_timer_active:
+            self.update_stats(*data)
+        return False
+
+    def _on_update_needed(self):
+        # New hostname: sample again now instead of on the next tick
+        if self._worker_running: self._worker_event.set()
 
-    def _get_auth(self):
-        try:
-            paths = [
-                Path.home() / '.config' / 'big-remoteplay' / 'sunshine' / 'sunshine.conf',
-                Path.home() / '.config' / 'sunshine' / 'sunshine.conf',
-                Path('/etc') / 'sunshine' / 'sunshine.conf'
-            ]
-            for p in paths:
-                if p.exists():
-                    user, pw = "", ""
-                    with open(p, 'r') as f:
-                        content = f.read()
-                        user_match = re.search(r'^sunshine_user\s*=\s*(.+)', content, re.MULTILINE)
-                        pw_match = re.search(r'^sunshine_password\s*=\s*(.+)', content, re.MULTILINE)
-                        if user_match: user = user_match.group(1).strip()
-                        if pw_match: pw = pw_match.group(1).strip()
-                    if user and pw: return (user, pw)
-        except Exception:
-            pass
-        return None
-
-    def _resolve_hostname(self, ip):
-        """Resolves hostname with caching to avoid lag"""
-        if not ip or ip in ['0.0.0.0']: return None
-        if ip in ['127.0.0.1', '::1', 'localhost']: return "Localhost"
-        if ip in self.hostname_cache:
-            return self.hostname_cache[ip]
-            
-        try:
-            # Short timeout
-            socket.setdefaulttimeout(0.5)
-            hostname = socket.gethostbyaddr(ip)[0]
-            # Remove domain part if looks like a local domain
-            if '.local' in hostname: hostname = hostname.split('.')[0]
-            self.hostname_cache[ip] = hostname
-            return hostname
-        except:
-            # Cache failure too to avoid retrying constantly
-            self.hostname_cache[ip] = None
-            return None
-            
     def _disconnect_session(self, session_id, ip):
         # We need at least an IP or session_id to try something
         if not ip and not session_id: return
@@ -491,7 +1136,7 @@ class PerformanceMonitor(Gtk.Box):
         self.set_sensitive(False)
         def do_disconnect():
             success = False
-            auth = self._get_auth()
+            auth = self.collector.get_auth()
             
             # METHOD 1: System Level Kill (Radical & Definitive)
             # We prefer this because Sunshine API seems to crash/kill other sessions
@@ -527,239 +1172,25 @@ class PerformanceMonitor(Gtk.Box):
         self.set_sensitive(True)
         if success:
              # Force immediate update
-             self._process_data_queue()
+             self._worker_event.set()
         else:
              # Show error (optional, toast would be better but we are inside widget)
              pass
 
-    def _ping_host(self, ip):
-        # Allow pinging localhost or ::1 for local testing
-        if not ip or ip in ['', 'Unknown IP', '0.0.0.0']: return 0.0
-        try:
-            import platform
-            system = platform.system()
-            # FORÇAR LOCALE C para garantir ponto decimal e mensagem em inglês
-            env = os.environ.copy()
-            env["LC_ALL"] = "C"
-            
-            if system == "Linux": cmd = ["ping", "-c", "1", "-W", "1", "-n", ip]
-            elif system == "Darwin": cmd = ["ping", "-c", "1", "-t", "1", "-n", ip]
-            elif system == "Windows": cmd = ["ping", "-n", "1", "-w", "1000", ip]
-            else: cmd = ["ping", "-c", "1", "-n", ip]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=1.5, env=env)
-            
-            if result.returncode == 0:
-                # Regex robusto para tempo=1.23, time=1.23, ttl... time=1.23
-                match = re.search(r'(?:time|tempo|ttl)[=<]([\d\.,]+)\s*ms', result.stdout, re.IGNORECASE)
-                if match:
-                    val_str = match.group(1).replace(',', '.')
-                    return float(val_str)
-                # Fallback simples
-                match_fallback = re.search(r'([\d\.,]+)\s*ms', result.stdout)
-                if match_fallback:
-                    val_str = match_fallback.group(1).replace(',', '.')
-                    return float(val_str)
-            return 0.0
-        except Exception:
-            return 0.0
-
-    def _detect_sessions_via_ss(self):
-        """Retorna um Dicionário {ip: dados} para facilitar busca"""
-        found_sessions = {}
-        try:
-            sunshine_ports = ['47984', '47989', '48010', '47998', '47999', '48000', '48002', '47990', '48001']
-            cmd = ["ss", "-tun", "-a"]
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=5)
-            if result.returncode != 0: return {}
-            
-            for line in result.stdout.splitlines():
-                if 'ESTAB' in line or 'UNCONN' in line:
-                    for port in sunshine_ports:
-                        if f":{port}" in line:
-                            parts = line.split()
-                            if len(parts) >= 5:
-                                last_part = parts[-1]
-                                # Regex mais permissivo para pegar IP
-                                ip_match = re.search(r'(\d+\.\d+\.\d+\.\d+)', last_part)
-                                if ip_match:
-                                    ip = ip_match.group(1)
-                                    if ip == '0.0.0.0': continue
-                                    # Allow localhost for testing (127.0.0.1)
-                                    
-                                    if ip not in found_sessions:
-                                        found_sessions[ip] = {'ip': ip, 'name': _('Guest'), 'latency': 0, 'fps': 60}
-                            break
-        except Exception:
-            pass
-        return found_sessions
-
     def _fetch_and_process_data(self):
         try:
-            auth = self._get_auth()
-            api_stats = {}
-            api_sessions_list = []
-            
-            # 1. Tentar pegar dados oficiais da API
-            if self.sunshine:
-                try:
-                    api_stats = self.sunshine.get_performance_stats(auth=auth)
-                    api_sessions_list = self.sunshine.get_active_sessions(auth=auth)
-                except Exception:
-                    pass
+            sample = self.collector.collect()
+            self._guest_bw_available = sample.guest_bandwidth_available
+            latency_avg, fps, bandwidth = sample.latency, sample.fps, sample.bandwidth
+            device_latencies = sample.device_latencies
 
-            def safe_float(v):
-                try: return float(v)
-                except: return 0.0
-                
-            # Métricas Globais
-            latency_avg = safe_float(api_stats.get('average_latency', 0))
-            fps = safe_float(api_stats.get('fps', 0))
-            bandwidth = safe_float(api_stats.get('bitrate', 0)) / 1000.0
-
-            # 2. Pegar dados do SS (Sistema Operacional)
-            ss_sessions_dict = self._detect_sessions_via_ss()
-
-            # 3. Mesclar API com SS para garantir IPs
-            # Normalizar lista da API
-            normalized_api_sessions = []
-            if api_sessions_list:
-                for s in api_sessions_list:
-                    if not isinstance(s, dict): continue
-                    # Normalizar chaves
-                    s_ip = s.get('ip') or s.get('clientAddress') or ''
-                    s_name = s.get('name') or s.get('clientName') or _('Guest')
-                    
-                    # Se API não tem IP, tenta achar no SS
-                    if not s_ip and ss_sessions_dict:
-                        # Pega o primeiro IP disponível do SS como "chute" se só tiver 1 convidado
-                        if len(ss_sessions_dict) == 1:
-                            s_ip = list(ss_sessions_dict.keys())[0]
-                    
-                    # Try to resolve hostname if name is generic
-                    if s_name == _('Guest') or s_name == 'Unknown':
-                         if s_ip:
-                             resolved = self._resolve_hostname(s_ip)
-                             if resolved: s_name = resolved
-                    
-                    normalized_api_sessions.append({'ip': s_ip, 'name': s_name, 'source': 'api', 'id': s.get('id')})
-
-            # Adicionar sessões do SS que não estão na API
-            current_cycle_ips = set()
-            
-            # Adicionar da API
-            for s in normalized_api_sessions:
-                if s['ip']: current_cycle_ips.add(s['ip'])
-            
-            # Adicionar do SS (se não estiver na API)
-            for ip, data in ss_sessions_dict.items():
-                if ip not in current_cycle_ips:
-                    # Resolve hostname for SS sessions too
-                    hname = self._resolve_hostname(ip) or _('Guest')
-                    normalized_api_sessions.append({'ip': ip, 'name': hname, 'source': 'ss', 'id': None})
-                    current_cycle_ips.add(ip)
-
-            # 4. ATUALIZAR LISTA DE DISPOSITIVOS CONHECIDOS (Persistência)
-            # Se um IP apareceu agora, atualizamos o timestamp.
-            # Se não apareceu agora, mantemos ele na lista se ele responder ao ping.
-            
-            now = time.time()
-            
-            # Inserir novos ou atualizar existentes detectados agora
-            for s in normalized_api_sessions:
-                ip = s['ip']
-                name = s['name']
-                if not ip: continue
-                
-                # Se já conhecemos, preservar nome se for "Guest" agora
-                if ip in self._known_devices:
-                    if name == _('Guest') and self._known_devices[ip]['name'] != _('Guest'):
-                        name = self._known_devices[ip]['name']
-                
-                self._known_devices[ip] = {
-                    'ip': ip,
-                    'name': name,
-                    'last_seen': now,
-                    'status': 'active'
-                }
-
-            # 5. PING E LIMPEZA
-            # Vamos iterar sobre TODOS os dispositivos conhecidos, não só os ativos
-            final_display_list = []
-            device_latencies = {}
-            
-            active_sessions_count = 0
-            
-            ips_to_remove = []
-            
-            for ip, data in self._known_devices.items():
-                # Verificar se está "ativo" neste ciclo (veio da API ou SS)
-                is_active_cycle = ip in current_cycle_ips
-                
-                # SEMPRE PINGAR para ter dados no gráfico
-                # Isso resolve o problema de dados faltando
-                lat = self._ping_host(ip)
-                
-                # Lógica de Persistência:
-                # Se pingou > 0: Mantém na lista como 'Online'
-                # Se pingou 0:
-                #    Se estava ativo no ciclo (API disse que ta lá), mantém (pode ser firewall bloqueando ping)
-                #    Se NÃO estava ativo no ciclo, marca para remoção (timeout)
-                
-                if lat > 0:
-                    data['last_latency'] = lat
-                    data['last_seen'] = now # Renovamos "visto" se ping responde
-                else:
-                    # Se falhou ping, usa ultimo conhecido ou 0
-                    lat = data.get('last_latency', 0)
-                
-                # Definir nome de exibição
-                display_name = data['name']
-                if ip not in display_name:
-                    display_name = f"{display_name} ({ip})"
-                
-                # Adicionar sufixo se estiver apenas em "modo ping" (sem stream ativo)
-                if not is_active_cycle and lat > 0:
-                    # Opcional: Indicar que está idle, mas o usuário pediu PERPÉTUO
-                    pass 
-                
-                # Se não temos sinal de vida (nem API, nem SS, nem Ping) por X tempo, remover
-                if not is_active_cycle and lat == 0 and (now - data['last_seen'] > 30): # 30 segundos tolerância
-                    ips_to_remove.append(ip)
-                    continue
-
-                # Preparar objeto para a UI
-                session_obj = {
-                    'ip': ip,
-                    'name': display_name,
-                    'latency': lat,
-                    'id': None 
-                }
-                
-                # Find matching session to get ID
-                for s in normalized_api_sessions:
-                    if s['ip'] == ip:
-                        session_obj['id'] = s.get('id')
-                        break
-                
-                # Find ID from api list if ip matches
-                
-                if is_active_cycle:
-                    active_sessions_count += 1
-                
-                final_display_list.append(session_obj)
-                
-                # Adicionar ao gráfico se tiver latência
-                if lat > 0:
-                    device_latencies[display_name] = lat
-
-            # Limpar antigos
-            for ip in ips_to_remove:
-                del self._known_devices[ip]
-
-            # Calcular médias para linha geral
-            if not latency_avg and device_latencies:
-                latency_avg = sum(device_latencies.values()) / len(device_latencies)
+            # Gravar valores medidos (antes dos valores de exibição abaixo)
+            if self._recorder:
+                try: self._recorder.record(latency_avg, fps, bandwidth, len(sample.sessions), device_latencies, sample.device_bandwidth, sample.timestamp)
+                except Exception: pass
+            if self._alerts:
+                try: self._check_alerts(sample, latency_avg, fps, bandwidth, device_latencies)
+                except Exception as e: print(f"Error checking alerts: {e}")
 
             # Manter FPS/BW estáveis
             if fps == 0: fps = self._last_fps if self._last_fps > 0 else self._target_fps 
@@ -777,18 +1208,20 @@ class PerformanceMonitor(Gtk.Box):
                      bw_txt_override = f"{bandwidth:.1f} Mbps (Unlim)"
 
             # Enviar para UI
-            self._data_queue.put((latency_avg, fps, bandwidth, final_display_list, device_latencies, bw_txt_override))
+            data = (latency_avg, fps, bandwidth, sample.sessions, device_latencies, bw_txt_override, sample.device_bandwidth, sample.resources)
+            self._post_sample(data)
+            return data
             
         except Exception:
-            pass
+            return None
 
-    def update_stats(self, latency, fps, bandwidth, sessions=None, device_latencies=None, bw_text=None):
+    def update_stats(self, latency, fps, bandwidth, sessions=None, device_latencies=None, bw_text=None, device_bandwidth=None, resources=None):
         try:
             if not self.update_timer_active: return
             sessions, device_latencies = sessions or [], device_latencies or {}
             
             # O gráfico recebe device_latencies, que contém TODOS que responderam ao ping
-            self.chart.add_data_point(latency, fps, bandwidth, users=len(sessions), device_latencies=device_latencies, bw_text_override=bw_text)
+            self.chart.add_data_point(latency, fps, bandwidth, users=len(sessions), device_latencies=device_latencies, bw_text_override=bw_text, device_bandwidth=device_bandwidth, resources=resources)
             
             if len(sessions) > 0:
                 if len(sessions) == 1:
@@ -808,65 +1241,81 @@ class PerformanceMonitor(Gtk.Box):
             pass
 
     def _update_guest_list(self, sessions):
-        while child := self._details_list.get_first_child():
-            self._details_list.remove(child)
+        seen = set()
         for s in sessions:
-            row = Adw.ActionRow()
             full_name = s.get('name', _('Guest'))
-            ip = s.get('ip', 'Unknown IP')
-            latency = s.get('latency', 0)
-            
+            ip = s.get('ip', '')
             # Separar Nome e IP para visual mais limpo
-            if '(' in full_name:
-                name_part = full_name.split('(')[0].strip()
+            name_part = full_name.split('(')[0].strip() if '(' in full_name else full_name
+            subtitle = f"IP: {ip or 'Unknown IP'}"
+            if 'tx_mbps' in s:
+                subtitle += f"  ↑ {s['tx_mbps']:.1f}  ↓ {s['rx_mbps']:.1f} Mbps"
+            elif not self._guest_bw_available:
+                subtitle += "  · " + _("per-guest bandwidth unavailable (needs conntrack access)")
+            values = {'name': name_part, 'full_name': full_name, 'ip': ip or '', 'session_id': str(s.get('id') or ''),
+                      'subtitle': subtitle, 'latency': float(s.get('latency', 0) or 0)}
+            key = ip or values['session_id'] or full_name
+            if key in seen: continue
+            seen.add(key)
+            item = self._guest_items.get(key)
+            if item is None:
+                item = self._guest_items[key] = GuestItem(key=key)
+                item.update(**values)
+                self._guest_store.append(item)
             else:
-                name_part = full_name
-                
-            row.set_title(name_part)
-            row.set_subtitle(f"IP: {ip}")
-            
-            ping_lbl = Gtk.Label(label=f"{latency:.0f} ms")
-            if latency <= 0:
-                ping_lbl.set_label("-- ms")
-                ping_lbl.add_css_class('error')
-            elif latency < 15: ping_lbl.add_css_class('success')
-            elif latency < 50: ping_lbl.add_css_class('warning')
-            else: ping_lbl.add_css_class('error')
-            
-            if hasattr(self.chart, '_get_device_color'):
-                try:
-                    # Usa o nome completo para garantir a mesma cor do gráfico
-                    color = self.chart._get_device_color(full_name)
-                    da = Gtk.DrawingArea()
-                    da.set_content_width(24)
-                    da.set_content_height(24)
-                    da.set_valign(Gtk.Align.CENTER)
-                    def draw_indicator(area, cr, width, height, color=color):
-                        cr.set_source_rgba(*color)
-                        cr.arc(width/2, height/2, 5, 0, 2 * 3.14159)
-                        cr.fill()
-                    da.set_draw_func(draw_indicator)
-                    row.add_prefix(da)
-                except: pass
-            
-            row.add_suffix(ping_lbl)
-            
-            # Disconnect button (If we have an ID or IP)
-            if s.get('id') or s.get('ip'):
-                disc_btn = Gtk.Button()
-                disc_btn.set_icon_name("network-offline-symbolic") 
-                disc_btn.add_css_class("flat")
-                disc_btn.add_css_class("destructive-action")
-                disc_btn.set_tooltip_text(_("Disconnect this specific guest (Admin)")) 
-                disc_btn.set_valign(Gtk.Align.CENTER)
-                disc_btn.connect("clicked", lambda b, sid=s.get('id'), sip=s.get('ip'): self._disconnect_session(sid, sip))
-                row.add_suffix(disc_btn)
-                
-            self._details_list.append(row)
+                item.update(**values)
+        for key in [k for k in self._guest_items if k not in seen]:
+            found, position = self._guest_store.find(self._guest_items.pop(key))
+            if found: self._guest_store.remove(position)
+
+    def _create_guest_row(self, item):
+        row = Adw.ActionRow()
+        # Usa o nome completo para garantir a mesma cor do gráfico
+        da = Gtk.DrawingArea()
+        da.set_content_width(24)
+        da.set_content_height(24)
+        da.set_valign(Gtk.Align.CENTER)
+        def draw_indicator(area, cr, width, height):
+            cr.set_source_rgba(*self.chart._get_device_color(item.props.full_name))
+            cr.arc(width/2, height/2, 5, 0, 2 * 3.14159)
+            cr.fill()
+        da.set_draw_func(draw_indicator)
+        row.add_prefix(da)
+        ping_lbl = Gtk.Label()
+        row.add_suffix(ping_lbl)
+        # Disconnect button (If we have an ID or IP)
+        disc_btn = Gtk.Button()
+        disc_btn.set_icon_name("network-offline-symbolic") 
+        disc_btn.add_css_class("flat")
+        disc_btn.add_css_class("destructive-action")
+        disc_btn.set_tooltip_text(_("Disconnect this specific guest (Admin)")) 
+        disc_btn.set_valign(Gtk.Align.CENTER)
+        # Reads the item on click, so it always targets the current session
+        disc_btn.connect("clicked", lambda b: self._disconnect_session(item.props.session_id or None, item.props.ip or None))
+        row.add_suffix(disc_btn)
+
+        def sync(obj, pspec):
+            # GParamSpec names use dashes (full-name)
+            prop = pspec.name.replace('-', '_') if pspec else None
+            if prop in (None, 'name'): row.set_title(item.props.name)
+            if prop in (None, 'subtitle'): row.set_subtitle(item.props.subtitle)
+            if prop in (None, 'latency'):
+                latency = item.props.latency
+                ping_lbl.set_label(f"{latency:.0f} ms" if latency > 0 else _("unmeasured"))
+                css = None if latency <= 0 else ('error' if latency >= 50 else ('success' if latency < 15 else 'warning'))
+                for c in ('success', 'warning', 'error'):
+                    if c == css: ping_lbl.add_css_class(c)
+                    else: ping_lbl.remove_css_class(c)
+            if prop in (None, 'session_id', 'ip'): disc_btn.set_visible(bool(item.props.session_id or item.props.ip))
+            if prop in (None, 'full_name'): da.queue_draw()
+        item.connect('notify', sync)
+        sync(item, None)
+        return row
 
     def set_connection_status(self, name, status, conn=True):
-        if conn: self._title_label.set_label(_("Connected to {}").format(name))
-        else: self._title_label.set_label(_("Real-time Monitoring"))
+        self._live_title = _("Connected to {}").format(name) if conn else _("Real-time Monitoring")
+        # A replay keeps its own title until the user goes back to live
+        if not self.chart.in_replay: self._title_label.set_label(self._live_title)
         self._status_label.set_label(status)
         if conn:
             set_icon(self._status_icon, "network-transmit-receive-symbolic")
@@ -152,8 +152,37 @@ class PreferencesWindow(Adw.PreferencesWindow):
         verbose_row.connect('notify::active', self.on_verbose_toggled)
         clear_btn.connect('clicked', self.on_clear_logs_clicked)
         
+        # Metrics group
+        metrics_group = Adw.PreferencesGroup()
+        metrics_group.set_title(_('Métricas'))
+        
+        record_row = Adw.SwitchRow()
+        record_row.set_title(_('Gravar Métricas de Desempenho'))
+        record_row.set_subtitle(_('Salvar latência, FPS e banda de cada sessão para análise posterior'))
+        record_row.set_active(self.config.get('record_metrics', False))
+        record_row.connect('notify::active', self.on_record_metrics_toggled)
+        metrics_group.add(record_row)
+        
+        export_row = Adw.ActionRow()
+        export_row.set_title(_('Exportar Métricas'))
+        export_row.set_subtitle(_('Últimos {} dias').format(self.config.get('metrics_retention_days', 14)))
+        for fmt in ('csv', 'json'):
+            btn = Gtk.Button(label=fmt.upper())
+            btn.set_valign(Gtk.Align.CENTER)
+            btn.connect('clicked', self.on_export_metrics_clicked, fmt)
+            export_row.add_suffix(btn)
+        metrics_group.add(export_row)
+        
+        alerts_row = Adw.SwitchRow()
+        alerts_row.set_title(_('Alertas de Desempenho'))
+        alerts_row.set_subtitle(_('Avisar quando latência, FPS ou carga do host passarem dos limites (regras em config.json)'))
+        alerts_row.set_active(self.config.get('alerts_enabled', True))
+        alerts_row.connect('notify::active', self.on_alerts_toggled)
+        metrics_group.add(alerts_row)
+        
         advanced_page.add(paths_group)
         advanced_page.add(logs_group)
+        advanced_page.add(metrics_group)
         
 
         
@@ -193,6 +222,36 @@ class PreferencesWindow(Adw.PreferencesWindow):
         self.logger.set_verbose(enabled)
         self.logger.info(f"Verbose logging {'enabled' if enabled else 'disabled'}")
         
+    def on_record_metrics_toggled(self, row, param):
+        # Takes effect the next time monitoring starts
+        self.config.set('record_metrics', row.get_active())
+
+    def on_alerts_toggled(self, row, param):
+        # Takes effect the next time monitoring starts
+        self.config.set('alerts_enabled', row.get_active())
+
+    def on_export_metrics_clicked(self, button, fmt):
+        dialog = Gtk.FileDialog(title=_('Exportar Métricas'))
+        dialog.set_initial_name(f"big-remoteplay-metrics.{fmt}")
+        def on_save_finish(source, result):
+            try:
+                file_handle = dialog.save_finish(result)
+                if not file_handle: return
+                from utils.metrics_recorder import MetricsRecorder
+                recorder = MetricsRecorder(retention_days=self.config.get('metrics_retention_days', 14))
+                try:
+                    export = recorder.export_csv if fmt == 'csv' else recorder.export_json
+                    count = export(file_handle.get_path())
+                finally:
+                    recorder.close()
+                self.add_toast(Adw.Toast.new(_("{} amostras exportadas").format(count)))
+            except GLib.Error:
+                pass # Cancelled
+            except Exception as e:
+                print(f"Error exporting metrics: {e}")
+                self.add_toast(Adw.Toast.new(_("Erro ao exportar: {}").format(e)))
+        dialog.save(self, None, on_save_finish)
+
     def on_clear_logs_clicked(self, button):
         self.logger.clear_old_logs()
         diag = Adw.MessageDialog(heading=_("Logs Limpos"), body=_("Arquivos de log antigos foram removidos."))
@@ -14,44 +14,45 @@ from utils.i18n import _
 from utils.icons import create_icon_widget
 import socket
 from utils.system_check import SystemCheck
+from host.sunshine_config import SunshineConfigFile
 
 class SunshineConfigManager:
     def __init__(self):
         self.config_dir = Path.home() / '.config' / 'big-remoteplay' / 'sunshine'
         self.config_file = self.config_dir / 'sunshine.conf'
         self.config_dir.mkdir(parents=True, exist_ok=True)
+        self.conf = SunshineConfigFile(self.config_file)
         self.config = {}
         self.load()
 
     def load(self):
-        self.config = {}
-        if self.config_file.exists():
-            try:
-                with open(self.config_file, 'r') as f:
-                    for line in f:
-                        line = line.strip()
-                        if not line or line.startswith('#'): continue
-                        if '=' in line:
-                            parts = line.split('=', 1)
-                            if len(parts) == 2:
-                                self.config[parts[0].strip()] = parts[1].strip()
-            except Exception as e:
-                print(f"Error loading Sunshine config: {e}")
+        self.config = self.conf.load()
 
     def save(self):
         try:
-            with open(self.config_file, 'w') as f:
-                for key, value in self.config.items():
-                    f.write(f"{key} = {value}\n")
+            with self.conf.transaction():
+                # Keys cleared in self.config are removed from the file too
+                removed = set(self.conf.values()) - set(self.config)
+                self.conf.update({**self.config, **dict.fromkeys(removed)})
         except Exception as e:
             print(f"Error saving Sunshine config: {e}")
 
     def get(self, key, default=None):
-        return self.config.get(key, str(default))
+        return self.conf.get(key, str(default))
 
     def set(self, key, value):
+        """Stores a value; the file is only rewritten when it changed. Returns the changed keys."""
+        try:
+            changed = self.conf.set(key, value)
+        except Exception as e:
+            print(f"Error saving Sunshine config: {e}")
+            return set()
         self.config[key] = str(value)
-        self.save()
+        return changed
+
+    def batch(self):
+        """Context manager grouping several set() calls into one write"""
+        return self.conf.transaction()
 
 
 class SunshinePreferencesPage(Adw.PreferencesPage):
@@ -0,0 +1,179 @@
+"""
+Threshold alerts with hysteresis on live session metrics
+"""
+
+import operator
+import time
+from typing import NamedTuple
+
+OPERATORS = {'>': operator.gt, '>=': operator.ge, '<': operator.lt, '<=': operator.le}
+# Default clear level: this far back on the safe side of the threshold
+HYSTERESIS = 0.1
+
+# Config 'alert_rules'; 'of' scales the threshold by a context value (e.g. the target FPS)
+DEFAULT_RULES = [
+    {'name': "High latency", 'metric': 'latency_p95', 'op': '>', 'threshold': 40, 'for': 10},
+    {'name': "Low FPS", 'metric': 'fps', 'op': '<', 'threshold': 0.8, 'of': 'target_fps', 'for': 10},
+    {'name': "Host CPU saturated", 'metric': 'host_cpu', 'op': '>', 'threshold': 90, 'for': 15},
+    {'name': "GPU saturated", 'metric': 'game_gpu', 'op': '>', 'threshold': 95, 'for': 15},
+]
+
+UNITS = {'latency': 'ms', 'latency_p95': 'ms', 'jitter': 'ms', 'fps': 'FPS', 'bandwidth': 'Mbps', 'guest_tx': 'Mbps'}
+LABELS = {'latency_p95': 'p95 latency', 'fps': 'FPS', 'guest_tx': 'upload'}
+
+
+class AlertEvent(NamedTuple):
+    """A rule starting ('firing') or stopping ('resolved') for one subject."""
+    rule: str
+    state: str
+    subject: str     # Guest name, None for host-wide metrics
+    metric: str
+    value: float
+    threshold: float
+    timestamp: float
+
+    @property
+    def key(self) -> str:
+        return f"{self.rule}:{self.subject or ''}"
+
+    @property
+    def message(self) -> str:
+        unit = UNITS.get(self.metric, '%')
+        num = lambda v: f"{v:.0f}" if abs(v) >= 10 else f"{v:.1f}"
+        who = f"{self.subject.split(' (')[0]}: " if self.subject else ""
+        what = f"{who}{LABELS.get(self.metric, self.metric.replace('_', ' '))} {num(self.value)} {unit}"
+        if self.state == 'resolved':
+            return f"{self.rule} — {what} (OK)"
+        return f"{self.rule} — {what} (limit {num(self.threshold)} {unit})"
+
+    def to_dict(self) -> dict:
+        return {'timestamp': round(self.timestamp, 3), 'alert': self.rule, 'state': self.state, 'subject': self.subject,
+                'metric': self.metric, 'value': round(self.value, 2), 'threshold': round(self.threshold, 2)}
+
+
+class AlertRule:
+    """
+    One rule: metric op threshold, held for `for` seconds to fire and back
+    past `clear` (default: threshold moved HYSTERESIS towards the safe side)
+    for `clear_for` seconds to resolve.
+    """
+
+    def __init__(self, name: str, metric: str, op: str, threshold: float, hold: float = 0.0,
+                 clear: float = None, clear_for: float = None, of: str = None):
+        if op not in OPERATORS: raise ValueError(f"Unknown operator: {op}")
+        self.name = name
+        self.metric = metric
+        self.op = op
+        self.threshold = float(threshold)
+        self.hold = float(hold)
+        self.clear = None if clear is None else float(clear)
+        self.clear_for = self.hold if clear_for is None else float(clear_for)
+        self.of = of
+        # subject -> [firing, since (the opposite state held since), last value, fire limit]
+        self.states = {}
+
+    @classmethod
+    def from_config(cls, spec: dict):
+        return cls(spec.get('name') or spec['metric'], spec['metric'], spec.get('op', '>'), spec['threshold'],
+                   spec.get('for', 0), spec.get('clear'), spec.get('clear_for'), spec.get('of'))
+
+    def limits(self, context: dict):
+        """(fire threshold, clear threshold), None when a relative rule lacks its context value"""
+        scale = 1.0
+        if self.of:
+            scale = context.get(self.of)
+            if not scale: return None
+        fire = self.threshold * scale
+        if self.clear is not None:
+            return fire, self.clear * scale
+        above = self.op in ('>', '>=')
+        return fire, fire * (1 - HYSTERESIS if above else 1 + HYSTERESIS)
+
+    def update(self, subject, value, limits, now):
+        """AlertEvent when the subject changes state; O(1)"""
+        fire, clear = limits
+        state = self.states.get(subject)
+        if state is None:
+            state = self.states[subject] = [False, None, value, fire]
+        state[2], state[3] = value, fire
+        firing, since = state[0], state[1]
+        # Once firing, still bad until the value is back past the clear level
+        breach = OPERATORS[self.op](value, clear if firing else fire)
+        if breach != firing:
+            if since is None:
+                state[1] = since = now
+            if now - since >= (self.hold if not firing else self.clear_for):
+                state[0], state[1] = breach, None
+                return AlertEvent(self.name, 'firing' if breach else 'resolved', subject, self.metric, value, fire, now)
+        else:
+            state[1] = None
+        return None
+
+    def forget(self, subject, now):
+        """Subject gone (guest left): resolves it if firing"""
+        state = self.states.pop(subject, None)
+        if state and state[0]:
+            return AlertEvent(self.name, 'resolved', subject, self.metric, state[2], state[3], now)
+        return None
+
+
+class AlertEngine:
+    """
+    Evaluates rules on each sample; values is {metric: {subject: value}},
+    subject None for host-wide metrics. Work per sample is constant per
+    rule and subject, no history is kept.
+    """
+
+    def __init__(self, rules=None):
+        self.rules = []
+        for spec in DEFAULT_RULES if rules is None else rules:
+            try:
+                self.rules.append(spec if isinstance(spec, AlertRule) else AlertRule.from_config(spec))
+            except (KeyError, ValueError, TypeError) as e:
+                print(f"Invalid alert rule {spec}: {e}")
+
+    def evaluate(self, values: dict, context: dict = None, now: float = None) -> list:
+        now = time.time() if now is None else now
+        context = context or {}
+        events = []
+        for rule in self.rules:
+            subjects = values.get(rule.metric, {})
+            limits = rule.limits(context)
+            for subject in [s for s in rule.states if s not in subjects or limits is None]:
+                event = rule.forget(subject, now)
+                if event: events.append(event)
+            if limits is None: continue
+            for subject, value in subjects.items():
+                if value is None or value != value: continue
+                event = rule.update(subject, value, limits, now)
+                if event: events.append(event)
+        return events
+
+    def firing(self) -> list:
+        return [(rule.name, subject) for rule in self.rules for subject, state in rule.states.items() if state[0]]
+
+    def reset(self):
+        for rule in self.rules:
+            rule.states.clear()
+
+
+def metric_values(latency, fps, bandwidth, device_latencies=None, device_bandwidth=None,
+                  resources=None, guest_stats=None) -> dict:
+    """
+    Alert inputs from one monitor sample. guest_stats: {guest or None: GuestStats}
+    (StreamStats summaries) for the windowed latency metrics.
+    """
+    # 0 = not measured (e.g. no FPS from the API): no value, so a firing rule resolves
+    values = {'fps': {None: fps} if fps else {}, 'bandwidth': {None: bandwidth} if bandwidth else {}}
+    values['latency'] = dict(device_latencies) if device_latencies else ({None: latency} if latency else {})
+    p95, jitter = {}, {}
+    for guest, st in (guest_stats or {}).items():
+        if st.samples >= 5:
+            p95[guest] = st.p95
+            jitter[guest] = st.jitter
+    values['latency_p95'], values['jitter'] = p95, jitter
+    values['guest_tx'] = {guest: tx for guest, (tx, _rx) in (device_bandwidth or {}).items()}
+    for group, usage in (resources or {}).items():
+        values[f'{group}_cpu'] = {None: usage.cpu}
+        if usage.gpu is not None: values[f'{group}_gpu'] = {None: usage.gpu}
+    return values
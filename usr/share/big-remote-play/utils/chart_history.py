@@ -0,0 +1,217 @@
+"""
+Columnar ring buffers for chart history, with coarser summary levels
+"""
+
+import math
+from array import array
+
+NAN = float('nan')
+# Series summarized by the coarser levels, besides the per-device ones
+SUMMARY_SERIES = ('latency', 'fps', 'bandwidth')
+# Per process group columns: ResourceUsage field -> column kind
+RESOURCE_FIELDS = {'cpu': 'cpu', 'gpu': 'gpu', 'rss': 'rss', 'threads': 'thr', 'read': 'rd', 'write': 'wr'}
+# Kinds kept in the summary levels
+SUMMARY_KINDS = ('lat', 'tx', 'cpu', 'gpu')
+
+
+class ColumnRing:
+    """
+    Fixed-capacity table of float columns sharing one write position.
+    Columns are array('d'); a column added later is back-filled with NaN.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.columns = {}
+        self._head = 0 # Next slot to write
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def _new_column(self):
+        return array('d', [NAN]) * self.capacity
+
+    def push(self, row: dict):
+        for key in row.keys() - self.columns.keys():
+            self.columns[key] = self._new_column()
+        head = self._head
+        for key, col in self.columns.items():
+            col[head] = row.get(key, NAN)
+        self._head = (head + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def index(self, i: int) -> int:
+        """Storage slot of chronological index i (negative counts from the newest)"""
+        if i < 0: i += self._count
+        if not 0 <= i < self._count: raise IndexError(i)
+        return (self._head - self._count + i) % self.capacity
+
+    def get(self, key, i: int) -> float:
+        col = self.columns.get(key)
+        return col[self.index(i)] if col is not None else NAN
+
+    def column(self, key) -> list:
+        """Chronological values (NaN where missing)"""
+        col = self.columns.get(key)
+        if col is None: return [NAN] * self._count
+        start = (self._head - self._count) % self.capacity
+        if start + self._count <= self.capacity:
+            return col[start:start + self._count].tolist()
+        return col[start:].tolist() + col[:self._head].tolist()
+
+    def drop_empty(self, keys):
+        """Frees columns among keys with no value left in the window"""
+        for key in keys:
+            col = self.columns.get(key)
+            if col is not None and all(v != v for v in col):
+                del self.columns[key]
+
+
+class SummaryLevel:
+    """min/max/avg per fixed time bucket, for up to capacity buckets"""
+
+    def __init__(self, bucket: float, capacity: int):
+        self.bucket = bucket
+        self.ring = ColumnRing(capacity)
+        self._index = None
+        self._acc = {}
+
+    def _row(self) -> dict:
+        row = {'t': self._index * self.bucket}
+        for key, (lo, hi, total, n) in self._acc.items():
+            row[('min', key)] = lo
+            row[('max', key)] = hi
+            row[('avg', key)] = total / n
+        return row
+
+    def add(self, t: float, values: dict):
+        index = int(t // self.bucket)
+        if self._index is not None and index != self._index:
+            self.ring.push(self._row())
+            # Empty buckets keep the time axis regular
+            for missing in range(self._index + 1, min(index, self._index + 1 + self.ring.capacity)):
+                self.ring.push({'t': missing * self.bucket})
+            self.ring.drop_empty([k for k in self.ring.columns if k != 't'])
+            self._acc = {}
+        self._index = index
+        for key, v in values.items():
+            if v != v: continue
+            acc = self._acc.get(key)
+            if acc is None:
+                self._acc[key] = [v, v, v, 1]
+            else:
+                if v < acc[0]: acc[0] = v
+                if v > acc[1]: acc[1] = v
+                acc[2] += v
+                acc[3] += 1
+
+    def __len__(self):
+        return len(self.ring) + (1 if self._index is not None else 0)
+
+    def column(self, kind: str, key) -> list:
+        """Chronological min/max/avg of key, the bucket in progress last"""
+        values = self.ring.column((kind, key) if kind != 't' else 't')
+        if self._index is not None:
+            values.append(self._row().get((kind, key) if kind != 't' else 't', NAN))
+        return values[-self.ring.capacity:]
+
+
+class ChartHistory:
+    """
+    Chart samples as columns instead of per-point objects.
+
+    Devices get a stable integer id so their columns are keyed by
+    ('lat'|'tx'|'rx', id); process groups (host resources) by
+    (RESOURCE_FIELDS kind, group name). levels is a list of (bucket seconds, buckets)
+    summaries fed from the same samples, for windows much longer than
+    the raw ring at the same drawing cost.
+    """
+
+    def __init__(self, capacity: int, levels=()):
+        self.raw = ColumnRing(capacity)
+        self.levels = [SummaryLevel(bucket, count) for bucket, count in levels]
+        self.device_ids = {}
+        self.device_names = []
+        self.bw_overrides = [None] * capacity
+
+    def __len__(self):
+        return len(self.raw)
+
+    def device_id(self, name: str) -> int:
+        i = self.device_ids.get(name)
+        if i is None:
+            i = self.device_ids[name] = len(self.device_names)
+            self.device_names.append(name)
+        return i
+
+    def append(self, t: float, latency: float, fps: float, bandwidth: float, users: int = 0,
+               device_latencies: dict = None, device_bandwidth: dict = None, bw_override: str = None,
+               resources: dict = None):
+        row = {'t': t, 'latency': latency, 'fps': fps, 'bandwidth': bandwidth, 'users': users}
+        for name, lat in (device_latencies or {}).items():
+            row[('lat', self.device_id(name))] = lat
+        for name, (tx, rx) in (device_bandwidth or {}).items():
+            i = self.device_id(name)
+            row[('tx', i)] = tx
+            row[('rx', i)] = rx
+        for group, usage in (resources or {}).items():
+            for field, kind in RESOURCE_FIELDS.items():
+                value = getattr(usage, field)
+                if value is not None: row[(kind, group)] = value
+        self.bw_overrides[self.raw._head] = bw_override
+        wrapped = len(self.raw) == self.raw.capacity
+        self.raw.push(row)
+        if wrapped and self.raw._head == 0:
+            # Once per lap: forget devices that left the window
+            self.raw.drop_empty([k for k in self.raw.columns if isinstance(k, tuple)])
+        summary = {k: v for k, v in row.items() if k in SUMMARY_SERIES or (isinstance(k, tuple) and k[0] in SUMMARY_KINDS)}
+        for level in self.levels:
+            level.add(t, summary)
+
+    def devices(self, kind: str = 'lat', level: SummaryLevel = None) -> list:
+        """Names of devices with a kind column in the raw window (or in a level)"""
+        if level is None:
+            ids = [k[1] for k in self.raw.columns if isinstance(k, tuple) and k[0] == kind]
+        else:
+            ids = {k[1][1] for k in level.ring.columns if isinstance(k, tuple) and isinstance(k[1], tuple) and k[1][0] == kind}
+            ids |= {k[1] for k in level._acc if isinstance(k, tuple) and k[0] == kind}
+        return [self.device_names[i] for i in sorted(ids)]
+
+    def groups(self, level: SummaryLevel = None) -> list:
+        """Process groups with a CPU column in the raw window (or in a level)"""
+        if level is None:
+            return [k[1] for k in self.raw.columns if isinstance(k, tuple) and k[0] == 'cpu']
+        groups = [k[1][1] for k in level.ring.columns if isinstance(k, tuple) and k[0] == 'avg' and k[1][0] == 'cpu']
+        return groups + [k[1] for k in level._acc if isinstance(k, tuple) and k[0] == 'cpu' and k[1] not in groups]
+
+    def column(self, key) -> list:
+        return self.raw.column(key)
+
+    def device_column(self, kind: str, name: str) -> list:
+        i = self.device_ids.get(name)
+        return self.raw.column((kind, i)) if i is not None else [NAN] * len(self.raw)
+
+    def point(self, i: int) -> dict:
+        """Raw values of one sample (chronological index), for formatting on demand"""
+        slot = self.raw.index(i)
+        values = {key: col[slot] for key, col in self.raw.columns.items()}
+        device_latencies, device_bandwidth, resources = {}, {}, {}
+        kinds = {kind: field for field, kind in RESOURCE_FIELDS.items()}
+        for key, v in values.items():
+            if not isinstance(key, tuple) or v != v: continue
+            kind, dev = key
+            if kind == 'lat':
+                device_latencies[self.device_names[dev]] = v
+            elif kind == 'tx':
+                device_bandwidth[self.device_names[dev]] = (v, values.get(('rx', dev), 0.0))
+            elif kind in kinds:
+                resources.setdefault(dev, {})[kinds[kind]] = v
+        return {
+            't': values['t'], 'latency': values['latency'], 'fps': values['fps'], 'bandwidth': values['bandwidth'],
+            'users': int(values['users']) if not math.isnan(values['users']) else 0,
+            'device_latencies': device_latencies, 'device_bandwidth': device_bandwidth,
+            'bw_override': self.bw_overrides[slot],
+            # {group: {'cpu', 'rss', ...}}
+            'resources': resources,
+        }
@@ -6,6 +6,8 @@ import json
 import os
 from pathlib import Path
 
+from utils.alerts import DEFAULT_RULES as DEFAULT_ALERT_RULES
+
 class Config:
     """Configuration manager"""
     
@@ -50,6 +52,10 @@ class Config:
         """Returns default configuration"""
         return {
             'theme': 'auto',
+            'record_metrics': False,
+            'metrics_retention_days': 14,
+            'alerts_enabled': True,
+            'alert_rules': [dict(rule) for rule in DEFAULT_ALERT_RULES],
             'network': {
                 'upnp': True,
                 'ipv6': True,
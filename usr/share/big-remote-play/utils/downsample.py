@@ -0,0 +1,42 @@
+"""
+Peak-preserving downsampling for long time series
+"""
+
+from bisect import bisect_left, bisect_right
+
+
+def minmax_downsample(xs, ys, start: float, end: float, buckets: int):
+    """
+    Points of xs/ys (xs sorted) inside [start, end] reduced to at most
+    2 * buckets + 2: each time bucket keeps its minimum and maximum, in time
+    order, so spikes stay visible at any zoom level. The first and last
+    points are always kept, with one neighbour on each side, so lines start,
+    end and reach the edges at the real values. Returns (xs, ys) lists.
+    """
+    lo = max(0, bisect_left(xs, start) - 1)
+    hi = min(len(xs), bisect_right(xs, end) + 1)
+    if hi - lo <= 2 * buckets or end <= start:
+        return list(xs[lo:hi]), list(ys[lo:hi])
+    out_x, out_y = [], []
+    width = (end - start) / buckets
+    i = lo
+    for b in range(1, buckets + 1):
+        j = bisect_right(xs, start + b * width, i, hi) if b < buckets else hi
+        if j > i:
+            seg = ys[i:j]
+            imin = min(range(len(seg)), key=seg.__getitem__)
+            imax = max(range(len(seg)), key=seg.__getitem__)
+            keep = {imin, imax}
+            if i == lo: keep.add(0)
+            if j == hi: keep.add(len(seg) - 1)
+            for k in sorted(keep):
+                out_x.append(xs[i + k])
+                out_y.append(seg[k])
+        i = j
+    return out_x, out_y
+
+
+def value_at(xs, ys, x):
+    """ys at exactly x, None when the series has no point there"""
+    i = bisect_left(xs, x)
+    return ys[i] if i < len(xs) and xs[i] == x else None
@@ -0,0 +1,112 @@
+"""
+Per-guest bandwidth from conntrack byte counters
+"""
+
+import re
+import time
+
+CONNTRACK_PATH = '/proc/net/nf_conntrack'
+CONNTRACK_ACCT_PATH = '/proc/sys/net/netfilter/nf_conntrack_acct'
+CONNTRACK_FIELD_RE = re.compile(r'(\w+)=(\S+)')
+
+
+def _parse_conntrack_line(line: str):
+    """
+    Returns (proto, (src, dst, sport, dport, bytes), (src, dst, sport, dport, bytes))
+    for the original and reply direction, or None without byte counters.
+    """
+    parts = line.split()
+    if len(parts) < 4: return None
+    proto = parts[2]
+    tuples, current = [], {}
+    for key, value in CONNTRACK_FIELD_RE.findall(line):
+        if key == 'src' and 'src' in current:
+            tuples.append(current)
+            current = {}
+        current[key] = value
+    tuples.append(current)
+    if len(tuples) < 2 or 'bytes' not in tuples[0] or 'bytes' not in tuples[1]: return None
+    try:
+        return proto, *[(t['src'], t['dst'], int(t.get('sport', 0)), int(t.get('dport', 0)), int(t['bytes'])) for t in tuples[:2]]
+    except (KeyError, ValueError):
+        return None
+
+
+def read_conntrack_flows(ports) -> dict:
+    """
+    {(proto, guest_ip, guest_port, host_port): (tx_bytes, rx_bytes)} for flows
+    touching the given host ports. tx is host -> guest. Needs a readable
+    nf_conntrack with accounting (net.netfilter.nf_conntrack_acct=1);
+    returns None otherwise.
+    """
+    ports = set(ports)
+    flows = {}
+    has_bytes = False
+    with open(CONNTRACK_PATH, 'r') as f:
+        for line in f:
+            parsed = _parse_conntrack_line(line)
+            if parsed is None: continue
+            has_bytes = True
+            proto, orig, reply = parsed
+            src, dst, sport, dport, orig_bytes = orig
+            if dport in ports:
+                # Guest opened the flow: original direction is guest -> host
+                flows[(proto, src, sport, dport)] = (reply[4], orig_bytes)
+            elif sport in ports:
+                flows[(proto, dst, dport, sport)] = (orig_bytes, reply[4])
+    if not has_bytes and not flows:
+        # Either no traffic at all or accounting disabled; tell them apart by the sysctl
+        try:
+            with open(CONNTRACK_ACCT_PATH) as f:
+                if f.read().strip() != '1': return None
+        except OSError:
+            return None
+    return flows
+
+
+class GuestBandwidthMeter:
+    """
+    Turns cumulative per-flow conntrack byte counters into per-guest Mbps.
+
+    conntrack covers Sunshine's UDP video/audio streams, but it needs a
+    readable /proc/net/nf_conntrack (usually root only) with accounting;
+    without it available turns False and sample() returns nothing. Socket
+    byte counters are no substitute: they only cover the TCP control/TLS
+    connections. Counters are tracked per flow, so flows that start, end or
+    get recreated between samples don't show up as spikes or negative rates.
+    """
+
+    def __init__(self, ports=()):
+        self.ports = set(ports)
+        self.available = True
+        self._last = {}
+        self._last_time = None
+
+    def sample(self) -> dict:
+        """
+        Returns {guest_ip: (tx_mbps, rx_mbps)} since the previous sample.
+        The first call only sets the baseline.
+        """
+        if not self.available: return {}
+        try:
+            flows = read_conntrack_flows(self.ports)
+        except OSError:
+            flows = None
+        if flows is None:
+            # Not readable or no accounting, don't retry every cycle
+            self.available = False
+            return {}
+        now = time.monotonic()
+        rates = {}
+        if self._last_time is not None and now > self._last_time:
+            dt = now - self._last_time
+            for key, (tx, rx) in flows.items():
+                prev = self._last.get(key)
+                # New flow: everything it carried happened since the last sample
+                ptx, prx = prev if prev and prev[0] <= tx and prev[1] <= rx else (0, 0)
+                ip = key[1]
+                gtx, grx = rates.get(ip, (0.0, 0.0))
+                rates[ip] = (gtx + (tx - ptx) * 8 / dt / 1e6, grx + (rx - prx) * 8 / dt / 1e6)
+        self._last = flows
+        self._last_time = now
+        return rates
@@ -0,0 +1,118 @@
+"""
+Concurrent in-process round-trip time prober
+"""
+
+import asyncio
+import errno
+import ipaddress
+import os
+import socket
+import struct
+import time
+
+ICMP_ECHO_REQUEST = {socket.AF_INET: 8, socket.AF_INET6: 128}
+ICMP_ECHO_REPLY = {socket.AF_INET: 0, socket.AF_INET6: 129}
+ICMP_PROTO = {socket.AF_INET: socket.IPPROTO_ICMP, socket.AF_INET6: socket.IPPROTO_ICMPV6}
+
+
+def _checksum(data: bytes) -> int:
+    if len(data) % 2: data += b'\0'
+    total = sum(struct.unpack(f'!{len(data) // 2}H', data))
+    total = (total >> 16) + (total & 0xffff)
+    total += total >> 16
+    return ~total & 0xffff
+
+
+class LatencyProber:
+    """
+    Measures RTT to many hosts at once from one event loop.
+
+    Uses unprivileged ICMP echo (SOCK_DGRAM ping sockets, allowed by
+    net.ipv4.ping_group_range). There is no fallback: Moonlight guests don't
+    listen on any port to time a TCP connect against, and closed-port probes
+    depend on ICMP errors that firewalled guests don't send. Without ping
+    sockets, or without an echo reply, the RTT is None (unmeasured), never
+    0. All targets share a single deadline, so slow or dead hosts don't add up.
+    """
+
+    def __init__(self, timeout: float = 1.0):
+        self.timeout = timeout
+        self._seq = 0
+        # Per address family, None until the first attempt
+        self._icmp_allowed = {}
+
+    def probe(self, targets, timeout: float = None) -> dict:
+        """
+        Blocking: returns {target: rtt_ms}, None for hosts that weren't
+        measured. Call it from a worker thread, not the GTK main loop.
+        """
+        targets = [t for t in dict.fromkeys(targets) if t]
+        if not targets: return {}
+        try:
+            return asyncio.run(self.aprobe(targets, timeout))
+        except Exception as e:
+            print(f"Latency probe error: {e}")
+            return dict.fromkeys(targets)
+
+    async def aprobe(self, targets, timeout: float = None) -> dict:
+        timeout = self.timeout if timeout is None else timeout
+        targets = list(dict.fromkeys(targets))
+        tasks = {t: asyncio.ensure_future(self._probe_one(t)) for t in targets}
+        done, pending = await asyncio.wait(tasks.values(), timeout=timeout)
+        for task in pending: task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        results = {}
+        for t, task in tasks.items():
+            rtt = None
+            if task in done and not task.cancelled() and task.exception() is None:
+                rtt = task.result()
+            results[t] = rtt
+        return results
+
+    async def _probe_one(self, target: str) -> float:
+        try:
+            ip = ipaddress.ip_address(target.split('%', 1)[0])
+            family = socket.AF_INET6 if ip.version == 6 else socket.AF_INET
+        except ValueError:
+            return None
+        if not self._icmp_allowed.get(family, True): return None
+        try:
+            return await self._icmp_probe(target, family)
+        except PermissionError:
+            self._icmp_allowed[family] = False
+        except OSError as e:
+            if e.errno in (errno.EACCES, errno.EPROTONOSUPPORT, errno.EAFNOSUPPORT):
+                self._icmp_allowed[family] = False
+        return None
+
+    def _next_seq(self) -> int:
+        self._seq = (self._seq + 1) & 0xffff
+        return self._seq
+
+    async def _icmp_probe(self, target: str, family) -> float:
+        loop = asyncio.get_running_loop()
+        sock = socket.socket(family, socket.SOCK_DGRAM, ICMP_PROTO[family])
+        self._icmp_allowed[family] = True
+        try:
+            sock.setblocking(False)
+            # Connected, so the kernel only hands us replies from this host
+            # (the echo id is replaced by the socket's own port). A datagram
+            # connect doesn't block; loop.sock_connect would resolve the
+            # address for IPPROTO_ICMP, which getaddrinfo rejects
+            sock.connect((target, 0))
+            seq = self._next_seq()
+            token = os.urandom(8)
+            header = struct.pack('!BBHHH', ICMP_ECHO_REQUEST[family], 0, 0, 0, seq)
+            if family == socket.AF_INET:
+                header = struct.pack('!BBHHH', ICMP_ECHO_REQUEST[family], 0, _checksum(header + token), 0, seq)
+            start = time.perf_counter_ns()
+            await loop.sock_sendall(sock, header + token)
+            while True:
+                data = await loop.sock_recv(sock, 512)
+                if len(data) < 8: continue
+                kind, _code, _csum, _ident, reply_seq = struct.unpack('!BBHHH', data[:8])
+                if kind == ICMP_ECHO_REPLY[family] and reply_seq == seq and data[8:16] == token:
+                    return (time.perf_counter_ns() - start) / 1e6
+        finally:
+            sock.close()
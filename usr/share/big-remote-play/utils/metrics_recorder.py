@@ -0,0 +1,259 @@
+"""
+Persistent performance metrics (SQLite time series)
+"""
+
+import csv
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import NamedTuple
+
+DEFAULT_PATH = Path.home() / '.config' / 'big-remoteplay' / 'metrics.db'
+DEFAULT_RETENTION_DAYS = 14
+# ~1 sample/s: a bit over a week of continuous streaming
+DEFAULT_MAX_SAMPLES = 1_000_000
+# Buffered rows are committed together, one fsync per batch
+FLUSH_INTERVAL = 10.0
+FLUSH_ROWS = 60
+PRUNE_INTERVAL = 3600.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    started INTEGER NOT NULL,
+    ended INTEGER
+);
+CREATE TABLE IF NOT EXISTS devices (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS samples (
+    session INTEGER NOT NULL,
+    ts INTEGER NOT NULL,
+    latency REAL,
+    fps REAL,
+    bandwidth REAL,
+    users INTEGER,
+    PRIMARY KEY (session, ts)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS samples_ts ON samples (ts);
+CREATE TABLE IF NOT EXISTS device_samples (
+    session INTEGER NOT NULL,
+    ts INTEGER NOT NULL,
+    device INTEGER NOT NULL,
+    latency REAL,
+    tx REAL,
+    rx REAL,
+    PRIMARY KEY (session, ts, device)
+) WITHOUT ROWID;
+"""
+
+
+class MetricSample(NamedTuple):
+    """One recorded sample; timestamp in seconds since the epoch, 0 = not measured."""
+    timestamp: float
+    latency: float
+    fps: float
+    bandwidth: float
+    users: int
+    device_latencies: dict
+    device_bandwidth: dict
+
+
+def _ms(t) -> int:
+    return int(round(t * 1000))
+
+
+class MetricsRecorder:
+    """
+    Append-only recorder for PerformanceMonitor samples.
+
+    Timestamps are integer milliseconds and device names are stored once,
+    so a sample costs a few dozen bytes. Writes are buffered and committed
+    in batches (WAL, synchronous=NORMAL); old data is dropped by age and by
+    total sample count. Safe to use from the worker and UI threads.
+    """
+
+    def __init__(self, path=None, retention_days: float = DEFAULT_RETENTION_DAYS, max_samples: int = DEFAULT_MAX_SAMPLES):
+        self.path = Path(path) if path else DEFAULT_PATH
+        self.retention_days = retention_days
+        self.max_samples = max_samples
+        self.session_id = None
+        self._lock = threading.Lock()
+        self._pending = []
+        self._pending_devices = []
+        self._device_ids = {}
+        self._last_flush = time.monotonic()
+        self._last_prune = 0.0
+        self._db = None
+
+    def _connect(self):
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('PRAGMA synchronous=NORMAL')
+            self._db.executescript(SCHEMA)
+            self._device_ids = dict((name, i) for i, name in self._db.execute('SELECT id, name FROM devices'))
+        return self._db
+
+    def start_session(self, source: str = 'host') -> int:
+        """Opens a new session; samples recorded afterwards belong to it"""
+        with self._lock:
+            db = self._connect()
+            if self.session_id is not None:
+                self._end_session_locked()
+            with db:
+                cur = db.execute('INSERT INTO sessions (source, started) VALUES (?, ?)', (source, _ms(time.time())))
+            self.session_id = cur.lastrowid
+            self._prune_locked()
+            return self.session_id
+
+    def end_session(self):
+        with self._lock:
+            if self._db is not None and self.session_id is not None:
+                self._end_session_locked()
+
+    def _end_session_locked(self):
+        self._flush_locked()
+        with self._db:
+            self._db.execute('UPDATE sessions SET ended = ? WHERE id = ?', (_ms(time.time()), self.session_id))
+        self.session_id = None
+
+    def record(self, latency: float, fps: float, bandwidth: float, users: int = 0,
+               device_latencies: dict = None, device_bandwidth: dict = None, timestamp: float = None):
+        """Buffers one sample; a no-op outside a session"""
+        with self._lock:
+            if self.session_id is None: return
+            ts = _ms(time.time() if timestamp is None else timestamp)
+            self._pending.append((self.session_id, ts, latency or 0.0, fps or 0.0, bandwidth or 0.0, users or 0))
+            device_latencies, device_bandwidth = device_latencies or {}, device_bandwidth or {}
+            for name in set(device_latencies) | set(device_bandwidth):
+                tx, rx = device_bandwidth.get(name, (0.0, 0.0))
+                self._pending_devices.append((self.session_id, ts, name, device_latencies.get(name, 0.0), tx, rx))
+            if len(self._pending) >= FLUSH_ROWS or time.monotonic() - self._last_flush >= FLUSH_INTERVAL:
+                self._flush_locked()
+            if time.monotonic() - self._last_prune >= PRUNE_INTERVAL:
+                self._prune_locked()
+
+    def flush(self):
+        with self._lock:
+            if self._db is not None: self._flush_locked()
+
+    def _device_id(self, name: str) -> int:
+        i = self._device_ids.get(name)
+        if i is None:
+            self._db.execute('INSERT OR IGNORE INTO devices (name) VALUES (?)', (name,))
+            i = self._device_ids[name] = self._db.execute('SELECT id FROM devices WHERE name = ?', (name,)).fetchone()[0]
+        return i
+
+    def _flush_locked(self):
+        self._last_flush = time.monotonic()
+        if not self._pending and not self._pending_devices: return
+        try:
+            with self._db:
+                self._db.executemany('INSERT OR REPLACE INTO samples VALUES (?, ?, ?, ?, ?, ?)', self._pending)
+                self._db.executemany('INSERT OR REPLACE INTO device_samples VALUES (?, ?, ?, ?, ?, ?)',
+                                     [(s, ts, self._device_id(name), lat, tx, rx) for s, ts, name, lat, tx, rx in self._pending_devices])
+        except sqlite3.Error as e:
+            print(f"Error writing metrics: {e}")
+            self._device_ids = dict((name, i) for i, name in self._db.execute('SELECT id, name FROM devices'))
+        self._pending, self._pending_devices = [], []
+
+    def _prune_locked(self):
+        self._last_prune = time.monotonic()
+        try:
+            with self._db:
+                if self.retention_days:
+                    cutoff = _ms(time.time() - self.retention_days * 86400)
+                else:
+                    cutoff = None
+                if self.max_samples:
+                    row = self._db.execute('SELECT ts FROM samples ORDER BY ts DESC LIMIT 1 OFFSET ?', (self.max_samples,)).fetchone()
+                    if row: cutoff = max(cutoff or 0, row[0] + 1)
+                if cutoff is None: return
+                self._db.execute('DELETE FROM samples WHERE ts < ?', (cutoff,))
+                self._db.execute('DELETE FROM device_samples WHERE ts < ?', (cutoff,))
+                self._db.execute('DELETE FROM sessions WHERE id != ? AND coalesce(ended, started) < ? '
+                                 'AND NOT EXISTS (SELECT 1 FROM samples WHERE samples.session = sessions.id)',
+                                 (self.session_id or -1, cutoff))
+        except sqlite3.Error as e:
+            print(f"Error pruning metrics: {e}")
+
+    def close(self):
+        with self._lock:
+            if self._db is None: return
+            if self.session_id is not None:
+                self._end_session_locked()
+            self._db.close()
+            self._db = None
+
+    def sessions(self, start: float = None, end: float = None) -> list:
+        """Sessions overlapping [start, end], newest first"""
+        with self._lock:
+            db = self._connect()
+            self._flush_locked()
+            rows = db.execute(
+                'SELECT s.id, s.source, s.started, s.ended, count(m.ts), min(m.ts), max(m.ts) '
+                'FROM sessions s LEFT JOIN samples m ON m.session = s.id '
+                'WHERE coalesce(s.ended, ?) >= ? AND s.started <= ? '
+                'GROUP BY s.id ORDER BY s.started DESC',
+                (_ms(time.time()), _ms(start or 0), _ms(end if end is not None else time.time() + 86400))).fetchall()
+        return [{'id': i, 'source': src, 'started': started / 1000, 'ended': ended / 1000 if ended else None,
+                 'samples': n, 'first': first / 1000 if first else None, 'last': last / 1000 if last else None}
+                for i, src, started, ended, n, first, last in rows]
+
+    def query(self, start: float = None, end: float = None, session: int = None) -> list:
+        """MetricSample list for a time range and/or session, oldest first"""
+        cond, args = [], []
+        if start is not None: cond.append('ts >= ?'); args.append(_ms(start))
+        if end is not None: cond.append('ts <= ?'); args.append(_ms(end))
+        if session is not None: cond.append('session = ?'); args.append(session)
+        where = ('WHERE ' + ' AND '.join(cond)) if cond else ''
+        with self._lock:
+            db = self._connect()
+            self._flush_locked()
+            rows = db.execute(f'SELECT session, ts, latency, fps, bandwidth, users FROM samples {where} ORDER BY ts, session', args).fetchall()
+            names = dict((i, name) for name, i in self._device_ids.items())
+            devices = {}
+            for s, ts, dev, lat, tx, rx in db.execute(f'SELECT session, ts, device, latency, tx, rx FROM device_samples {where}', args):
+                devices.setdefault((s, ts), []).append((names.get(dev, str(dev)), lat, tx, rx))
+        result = []
+        for s, ts, lat, fps, bw, users in rows:
+            dev_lat, dev_bw = {}, {}
+            for name, dlat, tx, rx in devices.get((s, ts), ()):
+                if dlat: dev_lat[name] = dlat
+                if tx or rx: dev_bw[name] = (tx, rx)
+            result.append(MetricSample(ts / 1000, lat, fps, bw, users, dev_lat, dev_bw))
+        return result
+
+    def export_csv(self, path, start: float = None, end: float = None, session: int = None) -> int:
+        """One row per sample plus a latency/tx/rx column per device; returns the row count"""
+        samples = self.query(start, end, session)
+        devices = sorted({d for s in samples for d in list(s.device_latencies) + list(s.device_bandwidth)})
+        with open(path, 'w', newline='') as f:
+            w = csv.writer(f)
+            w.writerow(['timestamp', 'latency_ms', 'fps', 'bandwidth_mbps', 'users'] +
+                       [f'{d} {col}' for d in devices for col in ('latency_ms', 'tx_mbps', 'rx_mbps')])
+            for s in samples:
+                row = [datetime.fromtimestamp(s.timestamp).isoformat(timespec='milliseconds'),
+                       f'{s.latency:.2f}', f'{s.fps:.1f}', f'{s.bandwidth:.2f}', s.users]
+                for d in devices:
+                    tx, rx = s.device_bandwidth.get(d, (None, None))
+                    lat = s.device_latencies.get(d)
+                    row += ['' if lat is None else f'{lat:.2f}', '' if tx is None else f'{tx:.2f}', '' if rx is None else f'{rx:.2f}']
+                w.writerow(row)
+        return len(samples)
+
+    def export_json(self, path, start: float = None, end: float = None, session: int = None) -> int:
+        samples = self.query(start, end, session)
+        with open(path, 'w') as f:
+            json.dump([{'timestamp': s.timestamp, 'latency_ms': s.latency, 'fps': s.fps, 'bandwidth_mbps': s.bandwidth,
+                        'users': s.users, 'device_latencies': s.device_latencies,
+                        'device_bandwidth': {d: {'tx_mbps': tx, 'rx_mbps': rx} for d, (tx, rx) in s.device_bandwidth.items()}}
+                       for s in samples], f, indent=1)
+        return len(samples)
@@ -9,6 +9,7 @@ from typing import List, Dict
 from utils.i18n import _
 
 from utils.logger import Logger
+from utils.resolver import get_resolver
 
 class NetworkDiscovery:
     """Sunshine host discovery on network"""
@@ -144,16 +145,13 @@ class NetworkDiscovery:
             subprocess.run(['ping', '-6', '-c', '1', '-W', '1', 'ff02::1%lo'], capture_output=True, timeout=1) 
         except: pass
 
+        resolver = get_resolver()
         def check(ip):
             if self.check_sunshine_port(ip):
-                try: 
-                    # Try to resolve name, but don't fail if it takes too long
-                    name = socket.gethostbyaddr(ip)[0]
-                except: 
-                    name = ip
-                
+                # Don't wait for reverse DNS here: the host list fills the name in when it arrives
+                name = resolver.lookup(ip.split('%')[0])
                 # User reported Moonlight CLI on Linux prefers raw IP without brackets
-                return {'name': _("Host ({})").format(ip), 'ip': ip, 'port': 47989, 'status': 'online'}
+                return {'name': name or _("Host ({})").format(ip), 'ip': ip, 'port': 47989, 'status': 'online', 'resolved': bool(name)}
             return None
 
         with ThreadPoolExecutor(max_workers=100) as ex:
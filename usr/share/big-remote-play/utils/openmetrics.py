@@ -0,0 +1,113 @@
+"""
+Prometheus / OpenMetrics text exposition of monitor samples
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PREFIX = 'bigremoteplay'
+PROMETHEUS_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+OPENMETRICS_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels: dict) -> str:
+    if not labels: return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + '}'
+
+
+def format_metrics(sample, openmetrics: bool = False) -> str:
+    """
+    Exposition text for a collector MetricsSample (None = no sample yet).
+    Units follow the Prometheus conventions: seconds and bytes per second.
+    """
+    families = []
+    def family(name, help_text, values):
+        families.append((f'{PREFIX}_{name}', help_text, values))
+    if sample is not None:
+        guests = [({'ip': s['ip'], 'name': s['name'].split(' (')[0]}, s) for s in sample.sessions]
+        family('sample_timestamp_seconds', "Time of the last collection", [({}, sample.timestamp)])
+        family('latency_seconds', "Average stream latency (0 = not measured)", [({}, sample.latency / 1000)])
+        family('fps', "Streamed frames per second (0 = not measured)", [({}, sample.fps)])
+        family('bandwidth_bytes_per_second', "Total stream bandwidth", [({}, sample.bandwidth * 125000)])
+        family('guests', "Known guests (streaming or answering pings)", [({}, len(sample.sessions))])
+        family('active_sessions', "Guests seen by the Sunshine API or its sockets", [({}, sample.active)])
+        family('guest_latency_seconds', "Round-trip time to the guest", [(l, s['latency'] / 1000) for l, s in guests if s.get('latency')])
+        family('guest_transmit_bytes_per_second', "Bandwidth sent to the guest",
+               [(l, s['tx_mbps'] * 125000) for l, s in guests if s.get('tx_mbps') is not None])
+        family('guest_receive_bytes_per_second', "Bandwidth received from the guest",
+               [(l, s['rx_mbps'] * 125000) for l, s in guests if s.get('rx_mbps') is not None])
+        host = sample.resources.get('host')
+        if host:
+            family('host_cpu_percent', "CPU busy on the whole machine", [({}, host.cpu)])
+        groups = [({'group': name}, r) for name, r in sample.resources.items() if name != 'host']
+        family('process_cpu_percent', "CPU of the process group, % of the whole machine", [(l, r.cpu) for l, r in groups])
+        family('process_resident_bytes', "Resident memory of the process group", [(l, r.rss * 1048576) for l, r in groups])
+        family('process_threads', "Threads in the process group", [(l, r.threads) for l, r in groups])
+        family('process_count', "Processes in the group", [(l, r.processes) for l, r in groups])
+        family('process_read_bytes_per_second', "Storage reads of the process group", [(l, r.read * 1048576) for l, r in groups])
+        family('process_write_bytes_per_second', "Storage writes of the process group", [(l, r.write * 1048576) for l, r in groups])
+        family('process_gpu_busy_percent', "Busiest GPU engine used by the process group (DRM fdinfo)",
+               [(l, r.gpu) for l, r in groups if r.gpu is not None])
+    lines = []
+    for name, help_text, values in families:
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} gauge')
+        for labels, value in values:
+            lines.append(f'{name}{_labels(labels)} {value!r}')
+    if openmetrics:
+        lines.append('# EOF')
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsServer:
+    """
+    Serves the latest sample on http://host:port/metrics from a daemon
+    thread. Scrapes only format what update() stored; they never trigger
+    a collection.
+    """
+
+    def __init__(self, port: int, host: str = '127.0.0.1'):
+        self._sample = None
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                openmetrics = 'application/openmetrics-text' in self.headers.get('Accept', '')
+                body = format_metrics(server.sample(), openmetrics).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', OPENMETRICS_TYPE if openmetrics else PROMETHEUS_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.address = self.httpd.server_address
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='MetricsServer', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def update(self, sample):
+        with self._lock:
+            self._sample = sample
+
+    def sample(self):
+        with self._lock:
+            return self._sample
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,230 @@
+"""
+CPU, memory, thread, I/O and GPU usage of process trees, from /proc
+"""
+
+import os
+import time
+from typing import NamedTuple
+
+CLK_TCK = os.sysconf('SC_CLK_TCK')
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+NCPU = os.cpu_count() or 1
+# Group members (children, session) are looked up again this often (s)
+MEMBERS_SCAN_INTERVAL = 5.0
+# Same for each process' DRM file descriptors; their fdinfo is read every sample
+DRM_SCAN_INTERVAL = 10.0
+
+
+class ResourceUsage(NamedTuple):
+    """Usage of one process group between two samples."""
+    cpu: float       # % of the whole machine (100 = every core busy)
+    rss: float       # MB, summed over the processes
+    threads: int
+    processes: int
+    read: float      # Storage I/O, MB/s
+    write: float
+    gpu: float       # Busiest DRM engine %, None when the driver has no fdinfo stats
+
+
+def _read(path) -> str:
+    with open(path, 'r') as f:
+        return f.read()
+
+
+def _stat_fields(pid):
+    """Fields of /proc/pid/stat after the command name (state = index 0)"""
+    data = _read(f'/proc/{pid}/stat')
+    return data[data.rindex(')') + 2:].split()
+
+
+def host_cpu_times() -> tuple:
+    """(busy, total) jiffies of the whole machine"""
+    values = [int(v) for v in _read('/proc/stat').split('\n', 1)[0].split()[1:9]]
+    idle = values[3] + values[4]
+    return sum(values) - idle, sum(values)
+
+
+class ProcessSampler:
+    """
+    Resource usage of named process groups.
+
+    A group is a callable returning root PIDs; its members are the roots,
+    their descendants and anything left in their sessions (games launched
+    with start_new_session keep running after the launcher exits). CPU,
+    I/O and GPU are rates between two sample() calls, so the first call
+    reports 0 for them. GPU busy comes from DRM fdinfo (drm-engine-* ns or
+    drm-cycles-* counters), which amdgpu, i915, xe, msm and others expose.
+    """
+
+    def __init__(self):
+        self.groups = {}
+        self._members = {}
+        self._members_at = 0.0
+        self._roots = {}
+        # (pid, starttime) -> (cpu ticks, read bytes, write bytes)
+        self._prev = {}
+        # (pdev, client id, engine) -> (busy, total)
+        self._prev_gpu = {}
+        # pid -> (scanned at, [fd])
+        self._drm_fds = {}
+        self._prev_time = None
+        self._prev_host = None
+
+    def track(self, name: str, pids):
+        """pids: callable returning the group's root PIDs (may be empty)"""
+        self.groups[name] = pids
+        self._members_at = 0.0
+
+    def untrack(self, name: str):
+        self.groups.pop(name, None)
+        self._members.pop(name, None)
+
+    def _scan_members(self, roots: dict) -> dict:
+        parents, sessions = {}, {}
+        for entry in os.listdir('/proc'):
+            if not entry.isdigit(): continue
+            try:
+                fields = _stat_fields(entry)
+            except (OSError, ValueError):
+                continue
+            pid = int(entry)
+            parents[pid] = int(fields[1])
+            sessions[pid] = int(fields[3])
+        members = {}
+        for name, group_roots in roots.items():
+            found = set()
+            for pid, ppid in parents.items():
+                if pid in group_roots or sessions[pid] in group_roots:
+                    found.add(pid)
+                    continue
+                # Descendant that started its own session
+                seen = 0
+                while ppid > 1 and seen < 64:
+                    if ppid in group_roots:
+                        found.add(pid)
+                        break
+                    ppid = parents.get(ppid, 0)
+                    seen += 1
+            members[name] = found
+        return members
+
+    def _drm_fd_list(self, pid, now):
+        cached = self._drm_fds.get(pid)
+        if cached and now - cached[0] < DRM_SCAN_INTERVAL:
+            return cached[1]
+        fds = []
+        try:
+            for fd in os.listdir(f'/proc/{pid}/fd'):
+                try:
+                    if os.readlink(f'/proc/{pid}/fd/{fd}').startswith('/dev/dri/'): fds.append(fd)
+                except OSError: pass
+        except OSError:
+            pass
+        self._drm_fds[pid] = (now, fds)
+        return fds
+
+    def _gpu_counters(self, pids, now) -> dict:
+        """{(pdev, client, engine): (busy, total)}; total is None for ns counters"""
+        counters = {}
+        for pid in pids:
+            for fd in self._drm_fd_list(pid, now):
+                try: text = _read(f'/proc/{pid}/fdinfo/{fd}')
+                except OSError: continue
+                info = {}
+                for line in text.splitlines():
+                    key, _sep, value = line.partition(':')
+                    info[key] = value.strip()
+                client = (info.get('drm-pdev', ''), info.get('drm-client-id'))
+                if client[1] is None: continue
+                for key, value in info.items():
+                    try:
+                        if key.startswith('drm-engine-') and not key.startswith('drm-engine-capacity-'):
+                            counters[client + (key[11:],)] = (int(value.split()[0]), None)
+                        elif key.startswith('drm-cycles-'):
+                            total = info.get('drm-total-cycles-' + key[11:])
+                            if total: counters[client + (key[11:],)] = (int(value), int(total))
+                    except ValueError:
+                        pass
+        return counters
+
+    def sample(self) -> dict:
+        """{'host': ResourceUsage (only cpu set), group: ResourceUsage} for groups with live processes"""
+        now = time.monotonic()
+        dt = now - self._prev_time if self._prev_time else 0.0
+        result = {}
+        try:
+            busy, total = host_cpu_times()
+            if self._prev_host and total > self._prev_host[1]:
+                cpu = (busy - self._prev_host[0]) / (total - self._prev_host[1]) * 100
+                result['host'] = ResourceUsage(cpu, None, None, None, None, None, None)
+            self._prev_host = (busy, total)
+        except (OSError, ValueError, IndexError):
+            pass
+
+        roots = {}
+        for name, pids in self.groups.items():
+            try: roots[name] = {int(p) for p in pids() if p}
+            except Exception: roots[name] = set()
+        if roots != self._roots or now - self._members_at >= MEMBERS_SCAN_INTERVAL:
+            self._members = self._scan_members({n: r for n, r in roots.items() if r})
+            self._members_at = now
+            self._roots = roots
+
+        prev, self._prev = self._prev, {}
+        prev_gpu, self._prev_gpu = self._prev_gpu, {}
+        for name, pids in self._members.items():
+            ticks = rss = threads = processes = 0
+            read = write = 0
+            alive = []
+            for pid in pids:
+                try:
+                    fields = _stat_fields(pid)
+                except (OSError, ValueError):
+                    continue
+                alive.append(pid)
+                key = (pid, fields[19])
+                cpu_ticks = int(fields[11]) + int(fields[12])
+                io = (0, 0)
+                try:
+                    values = dict(line.split(': ') for line in _read(f'/proc/{pid}/io').splitlines())
+                    io = (int(values['read_bytes']), int(values['write_bytes']))
+                except (OSError, ValueError, KeyError):
+                    pass
+                self._prev[key] = (cpu_ticks,) + io
+                last = prev.get(key)
+                if last:
+                    ticks += cpu_ticks - last[0]
+                    if io != (0, 0):
+                        read += max(0, io[0] - last[1])
+                        write += max(0, io[1] - last[2])
+                rss += int(fields[21])
+                threads += int(fields[17])
+                processes += 1
+            if not processes: continue
+            gpu = None
+            counters = self._gpu_counters(alive, now)
+            if counters:
+                self._prev_gpu.update(counters)
+                engines = {}
+                for key, (value, cycles_total) in counters.items():
+                    last = prev_gpu.get(key)
+                    if not last: continue
+                    if cycles_total is None:
+                        share = (value - last[0]) / (dt * 1e9) if dt > 0 else 0.0
+                    else:
+                        share = (value - last[0]) / (cycles_total - last[1]) if cycles_total > last[1] else 0.0
+                    engines[key[2]] = engines.get(key[2], 0.0) + max(0.0, share)
+                gpu = min(100.0, max(engines.values(), default=0.0) * 100)
+            result[name] = ResourceUsage(
+                cpu=ticks / CLK_TCK / dt / NCPU * 100 if dt > 0 else 0.0,
+                rss=rss * PAGE_SIZE / 1048576,
+                threads=threads,
+                processes=processes,
+                read=read / dt / 1048576 if dt > 0 else 0.0,
+                write=write / dt / 1048576 if dt > 0 else 0.0,
+                gpu=gpu,
+            )
+        for pid in [p for p in self._drm_fds if not any(p in m for m in self._members.values())]:
+            del self._drm_fds[pid]
+        self._prev_time = now
+        return result
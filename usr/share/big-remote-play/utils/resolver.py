@@ -0,0 +1,101 @@
+"""
+Non-blocking reverse DNS with a TTL cache, shared by the whole app
+"""
+
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+POSITIVE_TTL = 600.0
+# Failures are retried, but not every monitor cycle
+NEGATIVE_TTL = 60.0
+
+
+def short_hostname(hostname: str) -> str:
+    """'deck.local' -> 'deck'; other names are kept whole"""
+    return hostname.split('.')[0] if '.local' in hostname else hostname
+
+
+class HostnameResolver:
+    """
+    Reverse lookups on a small worker pool.
+
+    lookup() never blocks: it returns the cached name (None while unknown)
+    and starts a resolution in the background; callbacks run on the pool
+    thread when the name arrives. Concurrent lookups of one address share
+    a single query. Names are cached for ttl seconds, failures for
+    negative_ttl; expired names are still returned while refreshing, and
+    dropped once they are another ttl old.
+    """
+
+    def __init__(self, workers: int = 4, ttl: float = POSITIVE_TTL, negative_ttl: float = NEGATIVE_TTL):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='resolver')
+        self._lock = threading.Lock()
+        # ip -> (name or None, expiry)
+        self._cache = {}
+        # ip -> [callbacks] while a query is running
+        self._pending = {}
+
+    def cached(self, ip: str):
+        """(found, name): found is False when ip is not cached or expired"""
+        with self._lock:
+            entry = self._cache.get(ip)
+            if entry and entry[1] > time.monotonic():
+                return True, entry[0]
+        return False, None
+
+    def lookup(self, ip: str, callback=None):
+        """Cached name or None; callback(ip, name) is called if a query had to run"""
+        if not ip: return None
+        with self._lock:
+            entry = self._cache.get(ip)
+            if entry and entry[1] > time.monotonic():
+                return entry[0]
+            stale = entry[0] if entry else None
+            waiting = self._pending.get(ip)
+            if waiting is not None:
+                if callback: waiting.append(callback)
+                return stale
+            self._pending[ip] = [callback] if callback else []
+        self._pool.submit(self._resolve, ip)
+        # An expired name is still better than nothing until the new answer comes
+        return stale
+
+    def _resolve(self, ip: str):
+        try:
+            host, _port = socket.getnameinfo((ip, 0), socket.NI_NAMEREQD)
+            name = short_hostname(host)
+        except (OSError, UnicodeError):
+            name = None
+        with self._lock:
+            now = time.monotonic()
+            ttl = self.ttl if name else self.negative_ttl
+            # Every scanned or seen address gets an entry, drop the long expired ones
+            for old in [k for k, (_n, expiry) in self._cache.items() if expiry + self.ttl < now]:
+                del self._cache[old]
+            self._cache[ip] = (name, now + ttl)
+            callbacks = self._pending.pop(ip, [])
+        for cb in callbacks:
+            try: cb(ip, name)
+            except Exception as e: print(f"Resolver callback error: {e}")
+
+    def invalidate(self, ip: str = None):
+        with self._lock:
+            if ip is None: self._cache.clear()
+            else: self._cache.pop(ip, None)
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_resolver() -> HostnameResolver:
+    """Process-wide resolver, so every view shares one cache"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = HostnameResolver()
+        return _shared
@@ -0,0 +1,180 @@
+"""
+Socket listing straight from the kernel (netlink sock_diag, /proc fallback)
+"""
+
+import ipaddress
+import os
+import socket
+import struct
+from typing import NamedTuple
+
+NETLINK_SOCK_DIAG = 4
+SOCK_DIAG_BY_FAMILY = 20
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+NLM_F_REQUEST = 0x1
+NLM_F_DUMP = 0x300
+
+INET_DIAG_REQ_BYTECODE = 1
+INET_DIAG_INFO = 2
+INET_DIAG_BC_S_GE = 2
+INET_DIAG_BC_S_LE = 3
+
+TCP_ESTABLISHED = 1
+TCP_CLOSE = 7
+TCP_LISTEN = 10
+TCP_STATES = {
+    1: 'ESTABLISHED', 2: 'SYN_SENT', 3: 'SYN_RECV', 4: 'FIN_WAIT1', 5: 'FIN_WAIT2', 6: 'TIME_WAIT',
+    7: 'CLOSE', 8: 'CLOSE_WAIT', 9: 'LAST_ACK', 10: 'LISTEN', 11: 'CLOSING',
+}
+
+NLMSGHDR = struct.Struct('=IHHII')
+# inet_diag_sockid: ports are big endian, the rest native
+SOCKID_PORTS = struct.Struct('>HH16s16s')
+SOCKID_TAIL = struct.Struct('=I8s')
+# inet_diag_req_v2 head: family, protocol, ext, pad, states
+REQ_HEAD = struct.Struct('=BBBxI')
+# inet_diag_msg head: family, state, timer, retrans; tail: expires, rqueue, wqueue, uid, inode
+MSG_HEAD = struct.Struct('=BBBB')
+MSG_TAIL = struct.Struct('=IIIII')
+INET_DIAG_MSG_SIZE = MSG_HEAD.size + SOCKID_PORTS.size + SOCKID_TAIL.size + MSG_TAIL.size
+RTATTR = struct.Struct('=HH')
+# tcp_info fields we read (offsets in struct tcp_info)
+TCP_INFO_RTT_OFFSET = 68
+TCP_INFO_BYTES_ACKED_OFFSET = 120
+TCP_INFO_BYTES_RECEIVED_OFFSET = 128
+
+PROTOCOLS = {'tcp': socket.IPPROTO_TCP, 'udp': socket.IPPROTO_UDP}
+
+
+class SocketInfo(NamedTuple):
+    """One socket; bytes and rtt are 0 where the kernel has no TCP info."""
+    protocol: str
+    local_ip: str
+    local_port: int
+    remote_ip: str
+    remote_port: int
+    state: str
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    rtt_ms: float = 0.0
+    inode: int = 0
+
+
+def _normalize_ip(raw: bytes, family: int) -> str:
+    if family == socket.AF_INET:
+        return socket.inet_ntop(socket.AF_INET, raw[:4])
+    ip = ipaddress.IPv6Address(raw[:16])
+    # Dual-stack sockets show IPv4 peers as ::ffff:a.b.c.d
+    return str(ip.ipv4_mapped) if ip.ipv4_mapped else str(ip)
+
+
+def _port_filter(low: int, high: int) -> bytes:
+    """inet_diag bytecode: sport >= low && sport <= high"""
+    # Each comparison is two 4-byte ops (the second carries the port);
+    # jumping 4 bytes past the end rejects the socket
+    return (struct.pack('=BBH', INET_DIAG_BC_S_GE, 8, 20) + struct.pack('=BBH', 0, 0, low) +
+            struct.pack('=BBH', INET_DIAG_BC_S_LE, 8, 12) + struct.pack('=BBH', 0, 0, high))
+
+
+def _netlink_query(family: int, protocol: int, states: int, low: int, high: int) -> list:
+    bytecode = _port_filter(low, high)
+    attr = RTATTR.pack(RTATTR.size + len(bytecode), INET_DIAG_REQ_BYTECODE) + bytecode
+    ext = 1 << (INET_DIAG_INFO - 1) if protocol == socket.IPPROTO_TCP else 0
+    req = REQ_HEAD.pack(family, protocol, ext, states) + SOCKID_PORTS.pack(0, 0, b'', b'') + SOCKID_TAIL.pack(0, b'\xff' * 8)
+    payload = req + attr
+    msg = NLMSGHDR.pack(NLMSGHDR.size + len(payload), SOCK_DIAG_BY_FAMILY, NLM_F_REQUEST | NLM_F_DUMP, 1, 0) + payload
+
+    name = 'tcp' if protocol == socket.IPPROTO_TCP else 'udp'
+    results = []
+    with socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_SOCK_DIAG) as nl:
+        nl.settimeout(1.0)
+        nl.sendto(msg, (0, 0))
+        while True:
+            data = nl.recv(65536)
+            offset = 0
+            while offset + NLMSGHDR.size <= len(data):
+                length, msg_type, _flags, _seq, _pid = NLMSGHDR.unpack_from(data, offset)
+                if length < NLMSGHDR.size: return results
+                if msg_type == NLMSG_DONE:
+                    return results
+                if msg_type == NLMSG_ERROR:
+                    err = struct.unpack_from('=i', data, offset + NLMSGHDR.size)[0]
+                    raise OSError(-err, os.strerror(-err))
+                if msg_type == SOCK_DIAG_BY_FAMILY:
+                    results.append(_parse_diag_msg(data, offset + NLMSGHDR.size, offset + length, family, name))
+                offset += (length + 3) & ~3
+
+
+def _parse_diag_msg(data: bytes, start: int, end: int, family: int, name: str) -> SocketInfo:
+    _fam, state, _timer, _retrans = MSG_HEAD.unpack_from(data, start)
+    sport, dport, src, dst = SOCKID_PORTS.unpack_from(data, start + MSG_HEAD.size)
+    inode = MSG_TAIL.unpack_from(data, start + MSG_HEAD.size + SOCKID_PORTS.size + SOCKID_TAIL.size)[4]
+    sent = received = 0
+    rtt = 0.0
+    pos = start + INET_DIAG_MSG_SIZE
+    while pos + RTATTR.size <= end:
+        attr_len, attr_type = RTATTR.unpack_from(data, pos)
+        if attr_len < RTATTR.size: break
+        if attr_type == INET_DIAG_INFO:
+            info = data[pos + RTATTR.size:pos + attr_len]
+            if len(info) >= TCP_INFO_RTT_OFFSET + 4:
+                rtt = struct.unpack_from('=I', info, TCP_INFO_RTT_OFFSET)[0] / 1000.0
+            # Older kernels have a shorter tcp_info
+            if len(info) >= TCP_INFO_BYTES_RECEIVED_OFFSET + 8:
+                sent = struct.unpack_from('=Q', info, TCP_INFO_BYTES_ACKED_OFFSET)[0]
+                received = struct.unpack_from('=Q', info, TCP_INFO_BYTES_RECEIVED_OFFSET)[0]
+        pos += (attr_len + 3) & ~3
+    return SocketInfo(name, _normalize_ip(src, family), sport, _normalize_ip(dst, family), dport,
+                      TCP_STATES.get(state, str(state)), sent, received, rtt, inode)
+
+
+def _proc_ip(hex_ip: str) -> str:
+    raw = bytes.fromhex(hex_ip)
+    # /proc prints each 32-bit word in host byte order
+    words = b''.join(raw[i:i + 4][::-1] for i in range(0, len(raw), 4)) if struct.pack('=I', 1)[0] == 1 else raw
+    return _normalize_ip(words, socket.AF_INET if len(raw) == 4 else socket.AF_INET6)
+
+
+def _proc_query(name: str, states: int, ports: set) -> list:
+    results = []
+    for suffix in ('', '6'):
+        try:
+            with open(f'/proc/net/{name}{suffix}', 'r') as f:
+                next(f, None)
+                for line in f:
+                    parts = line.split()
+                    if len(parts) < 10: continue
+                    local, remote, state = parts[1], parts[2], int(parts[3], 16)
+                    lport = int(local.rsplit(':', 1)[1], 16)
+                    if lport not in ports or not (states >> state) & 1: continue
+                    rhost, rport = remote.rsplit(':', 1)
+                    results.append(SocketInfo(name, _proc_ip(local.rsplit(':', 1)[0]), lport, _proc_ip(rhost), int(rport, 16),
+                                              TCP_STATES.get(state, str(state)), inode=int(parts[9])))
+        except OSError:
+            continue
+    return results
+
+
+def query_sockets(ports, protocols=('tcp', 'udp'), states: int = 1 << TCP_ESTABLISHED) -> list:
+    """
+    Sockets whose local port is in ports, for IPv4 and IPv6.
+
+    The port range is filtered by the kernel (inet_diag bytecode), so only
+    matching sockets are copied to user space; /proc/net/* is parsed when
+    netlink sock_diag is not available. states is a bit mask of TCP states
+    (UDP sockets with a peer are ESTABLISHED).
+    """
+    ports = set(ports)
+    if not ports: return []
+    low, high = min(ports), max(ports)
+    results = []
+    for name in protocols:
+        try:
+            found = []
+            for family in (socket.AF_INET, socket.AF_INET6):
+                found += _netlink_query(family, PROTOCOLS[name], states, low, high)
+        except (OSError, AttributeError):
+            found = _proc_query(name, states, ports)
+        results += [s for s in found if s.local_port in ports]
+    return results
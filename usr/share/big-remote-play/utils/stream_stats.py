@@ -0,0 +1,194 @@
+"""
+Constant-memory streaming statistics for latency and FPS
+"""
+
+import math
+import time
+from dataclasses import dataclass
+
+
+def log_edges(low: float, high: float, count: int) -> list:
+    """count + 1 geometrically spaced bucket edges from low to high"""
+    factor = (high / low) ** (1.0 / count)
+    return [low * factor ** i for i in range(count + 1)]
+
+
+# 0.1 ms .. 5 s, ~12% wide buckets: percentiles within a few percent of the truth
+LATENCY_EDGES = log_edges(0.1, 5000.0, 96)
+# 0 .. 360 FPS in 2 FPS steps
+FPS_EDGES = [float(i) for i in range(0, 362, 2)]
+
+
+class SlidingHistogram:
+    """
+    Fixed-bucket histogram over a sliding time window.
+
+    The window is split into slots; each slot keeps its own counts (plus sum
+    and sum of squares for mean/variance) and the oldest slot is subtracted
+    when time moves past it. Memory is slots * buckets, whatever the rate.
+    """
+
+    def __init__(self, edges: list, window: float = 60.0, slots: int = 12):
+        self.edges = edges
+        self.window = window
+        self.slot_len = window / slots
+        n = len(edges) + 1 # Plus underflow/overflow buckets
+        self._slots = [[0] * n for _ in range(slots)]
+        self._slot_stats = [[0, 0.0, 0.0] for _ in range(slots)]
+        self._totals = [0] * n
+        self.count = 0
+        self._sum = 0.0
+        self._sumsq = 0.0
+        self._slot_index = None
+
+    def _bucket(self, value: float) -> int:
+        # Binary search, edges are sorted
+        lo, hi = 0, len(self.edges)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.edges[mid] <= value: lo = mid + 1
+            else: hi = mid
+        return lo
+
+    def _advance(self, now: float):
+        index = int(now // self.slot_len)
+        if self._slot_index is None:
+            self._slot_index = index
+            return
+        steps = min(index - self._slot_index, len(self._slots))
+        for i in range(1, steps + 1):
+            pos = (self._slot_index + i) % len(self._slots)
+            slot, stats = self._slots[pos], self._slot_stats[pos]
+            for b, c in enumerate(slot):
+                if c:
+                    self._totals[b] -= c
+                    slot[b] = 0
+            self.count -= stats[0]
+            self._sum -= stats[1]
+            self._sumsq -= stats[2]
+            stats[:] = [0, 0.0, 0.0]
+        if index > self._slot_index:
+            self._slot_index = index
+
+    def add(self, value: float, now: float = None):
+        self._advance(time.monotonic() if now is None else now)
+        b = self._bucket(value)
+        pos = self._slot_index % len(self._slots)
+        self._slots[pos][b] += 1
+        self._totals[b] += 1
+        stats = self._slot_stats[pos]
+        stats[0] += 1; stats[1] += value; stats[2] += value * value
+        self.count += 1
+        self._sum += value
+        self._sumsq += value * value
+
+    def expire(self, now: float = None):
+        """Drops samples that left the window without adding one"""
+        self._advance(time.monotonic() if now is None else now)
+
+    def quantile(self, q: float) -> float:
+        """Interpolated within the bucket; 0.0 when empty"""
+        if self.count <= 0: return 0.0
+        target = q * self.count
+        seen = 0
+        for b, c in enumerate(self._totals):
+            if not c: continue
+            if seen + c >= target:
+                low = self.edges[b - 1] if b > 0 else 0.0
+                high = self.edges[b] if b < len(self.edges) else self.edges[-1]
+                return low + (high - low) * ((target - seen) / c)
+            seen += c
+        return self.edges[-1]
+
+    def mean(self) -> float:
+        return self._sum / self.count if self.count > 0 else 0.0
+
+    def stddev(self) -> float:
+        if self.count < 2: return 0.0
+        m = self.mean()
+        return math.sqrt(max(0.0, self._sumsq / self.count - m * m))
+
+
+@dataclass
+class GuestStats:
+    """Windowed summary for one guest (0 where there is no data)."""
+    samples: int = 0
+    p50: float = 0.0
+    p95: float = 0.0
+    p99: float = 0.0
+    jitter: float = 0.0        # RFC 3550 smoothed |delta RTT| (ms)
+    stddev: float = 0.0        # RTT standard deviation over the window (ms)
+    fps_avg: float = 0.0
+    fps_low: float = 0.0       # 1st percentile FPS ("1% low")
+    fps_stability: float = 0.0 # 1 - coefficient of variation, 1.0 = perfectly steady
+
+
+class _Series:
+    def __init__(self, window: float):
+        self.latency = SlidingHistogram(LATENCY_EDGES, window)
+        self.fps = SlidingHistogram(FPS_EDGES, window)
+        self.jitter = 0.0
+        self.last_rtt = None
+        self.last_seen = 0.0
+
+
+class StreamStats:
+    """
+    Per-guest latency percentiles, jitter and FPS stability over a sliding
+    window, in constant memory per guest.
+    """
+
+    def __init__(self, window: float = 60.0):
+        self.window = window
+        self._series = {}
+
+    def _get(self, guest) -> _Series:
+        s = self._series.get(guest)
+        if s is None:
+            s = self._series[guest] = _Series(self.window)
+        return s
+
+    def add_latency(self, guest, ms: float, now: float = None):
+        if ms is None or ms <= 0: return
+        now = time.monotonic() if now is None else now
+        s = self._get(guest)
+        s.latency.add(ms, now)
+        if s.last_rtt is not None:
+            s.jitter += (abs(ms - s.last_rtt) - s.jitter) / 16.0
+        s.last_rtt = ms
+        s.last_seen = now
+
+    def add_fps(self, guest, fps: float, now: float = None):
+        if fps is None or fps <= 0: return
+        now = time.monotonic() if now is None else now
+        s = self._get(guest)
+        s.fps.add(fps, now)
+        s.last_seen = now
+
+    def summary(self, guest, now: float = None) -> GuestStats:
+        s = self._series.get(guest)
+        if s is None: return GuestStats()
+        now = time.monotonic() if now is None else now
+        s.latency.expire(now)
+        s.fps.expire(now)
+        fps_avg = s.fps.mean()
+        return GuestStats(
+            samples=s.latency.count,
+            p50=s.latency.quantile(0.50),
+            p95=s.latency.quantile(0.95),
+            p99=s.latency.quantile(0.99),
+            jitter=s.jitter,
+            stddev=s.latency.stddev(),
+            fps_avg=fps_avg,
+            fps_low=s.fps.quantile(0.01),
+            fps_stability=max(0.0, 1.0 - s.fps.stddev() / fps_avg) if fps_avg > 0 else 0.0,
+        )
+
+    def prune(self, now: float = None):
+        """Forgets guests without samples for a whole window"""
+        now = time.monotonic() if now is None else now
+        for guest in [g for g, s in self._series.items() if now - s.last_seen > self.window]:
+            del self._series[guest]
+
+    def guests(self) -> list:
+        return list(self._series)